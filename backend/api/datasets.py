@@ -0,0 +1,40 @@
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from ..core.state import datasets_store
+from ..services.data.compression import DecompressedSizeError
+from ..services.data.loaders import is_supported, spool_upload
+from .execution import run_compute
+
+
+async def register_upload(file: UploadFile) -> Dict[str, Any]:
+    """Spool ``file`` to disk and add it to the dataset registry.
+
+    Registration may decompress and scan the whole file, so it runs on the compute pool.
+    """
+    spooled = await spool_upload(file)
+    try:
+        return await run_compute(datasets_store.register, spooled, file.filename)
+    except DecompressedSizeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def resolve_dataset(
+    file: Optional[UploadFile],
+    dataset_id: Optional[str],
+    unsupported_detail: str = "Unsupported file format",
+) -> Dict[str, Any]:
+    """Return the registry entry for ``dataset_id``, or spool and register ``file``."""
+    entry = datasets_store.get(dataset_id) if dataset_id else None
+    if entry is not None:
+        return entry
+    if file is None:
+        if dataset_id:
+            raise HTTPException(status_code=404, detail="Dataset not found or expired. Please upload the file again.")
+        raise HTTPException(status_code=400, detail="Please provide a file or a dataset_id")
+    if not is_supported(file.filename):
+        raise HTTPException(status_code=400, detail=unsupported_detail)
+    return await register_upload(file)
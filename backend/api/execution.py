@@ -0,0 +1,22 @@
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+from ..core.workers import PoolSaturated, WorkerPool, compute_pool, render_pool
+
+
+async def _offload(pool: WorkerPool, fn: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return await pool.run(fn, *args)
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def run_compute(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a parsing/fitting stage on the compute pool; 503 when it is saturated."""
+    return await _offload(compute_pool, fn, *args)
+
+
+async def run_render(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a rendering/report stage on the render pool; 503 when it is saturated."""
+    return await _offload(render_pool, fn, *args)
@@ -1,43 +1,763 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from typing import Optional
-import pandas as pd
+import asyncio
 import numpy as np
 import json
-import io
-import base64
+import time
 import uuid
+from urllib.parse import quote
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import PolynomialFeatures
-import matplotlib.pyplot as plt
 
 from ...schemas.analysis import ManualDataInput
 from ...services.ml.sklearn_fluent import req_details
-from ...core.state import models_store
+from ...services.ml.batch import fit_families, plan_batch, rank_key
+from ...services.ml.families import FAMILIES, CurveModel
+from ...services.ml.polynomial import ExpansionTooWide, design_nbytes, plan_expansion
+from ...services.ml.regularized import REGULARIZATION_METHODS, describe, regularized_solver, solve_regularized
+from ...services.ml.stepwise import SELECTION_CRITERIA, SELECTION_METHODS, compact_fit, forward_stepwise
+from ...services.ml.chunked import (
+    MAX_CV_FOLDS, FitInputError, cv_scores, fit_chunks, linear_model, single_feature_stats, split_stats,
+)
+from ...services.ml.intervals import CONFIDENCE_METHODS, coefficient_intervals, family_sum_intervals, power_sum_intervals, row_intervals
+from ...services.data.loaders import is_csv
+from ...services.data.sampling import SAMPLE_STRATEGIES, sample_chunk_rows, sample_csv_rows, sample_frame
+from ...services.data.sanitize import sanitize_numeric
+from ...services.plotting.analysis_plots import PLOT_FORMATS, manual_plot
+from ...services.plotting.series import manual_series, model_series, series_options
+from ...utils.features import format_functions
+from ..datasets import resolve_dataset
+from ..execution import run_compute, run_render
+from ...core.state import model_nbytes, models_store, datasets_store, fit_jobs, results_cache
+from ...core.settings import (
+    BATCH_MAX_SPECS,
+    BOOTSTRAP_MAX_SAMPLES,
+    BOOTSTRAP_SAMPLES,
+    COMPUTE_WORKERS,
+    POLY_DESIGN_MAX_BYTES,
+    PLOT_SAMPLE_ROWS,
+    POLY_MAX_DEGREE,
+    PREVIEW_REFINE_MAX_WAIT_SECONDS,
+    PREVIEW_SAMPLE_ROWS,
+    SATURATED_RETRY_AFTER_SECONDS,
+    SELECTION_MAX_TERMS,
+    STREAMING_FIT_MIN_BYTES,
+    STREAMING_PLOT_ROWS,
+)
 
 router = APIRouter()
 
+FIT_MODES = ("auto", "memory", "streaming")
+
+
+def _check_expansion(n_features: int, degree: int) -> None:
+    """Refuse up front a degree whose expansion cannot fit the term budget."""
+    if degree > 1:
+        try:
+            plan_expansion(n_features, degree)
+        except ExpansionTooWide as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+def _check_cv_folds(cv_folds: Optional[int]) -> int:
+    folds = int(cv_folds or 0)
+    if folds and not 2 <= folds <= MAX_CV_FOLDS:
+        raise HTTPException(status_code=400, detail=f"cv_folds must be 0 (off) or between 2 and {MAX_CV_FOLDS}")
+    return folds
+
+
+def _cv_summary(folds: int, means, stds):
+    """k-fold R^2 per target, in percent like ``accuracies``."""
+    return {
+        "folds": folds,
+        "mean_r2": [round(m * 100, 2) for m in means],
+        "std_r2": [round(s * 100, 2) for s in stds],
+    }
+
+
+def _degree_cv(details):
+    """k-fold R^2 of every degree the single-feature search tried, in percent."""
+    cv = details["cv"]
+    return {
+        "folds": cv["folds"],
+        "selected_degree": details["degree"],
+        "selected_family": details["family"],
+        "candidates": [
+            {
+                **({"degree": c["degree"]} if "degree" in c else {"family": c["family"]}),
+                "mean_r2": round(c["mean_r2"] * 100, 2),
+                "std_r2": round(c["std_r2"] * 100, 2),
+            }
+            for c in cv["candidates"]
+        ],
+    }
+
+
+def _family_ranking(details):
+    """Every model family the single-feature search scored, best first, in percent."""
+    return [
+        {**{k: c[k] for k in ("family", "degree") if k in c}, "r2": round(c["r2"] * 100, 2) if np.isfinite(c["r2"]) else None}
+        for c in details["families"]
+    ]
+
+
+def _select_terms(fit, poly, feature_names, selection):
+    """Forward stepwise selection over the fitted design's terms.
+
+    Replaces the statistics, coefficients and scores in ``fit`` with those of
+    the compact model and returns ``(poly, feature_names, block)``: an expansion
+    producing only the selected terms from the raw X, their names and the
+    response block describing the selection path.
+    """
+    chosen = forward_stepwise(fit["train_stats"], fit["test_stats"], selection["max_terms"], selection["criterion"])
+    if not chosen["selected"]:
+        raise HTTPException(status_code=400, detail="Not enough rows or independent terms to select a model.")
+    compact, train, test, coef, intercept, accuracies, holdout = compact_fit(fit["train_stats"], fit["test_stats"], poly, chosen["selected"])
+    fit.update({
+        "train_stats": train, "test_stats": test,
+        "coef": coef, "intercept": intercept, "accuracies": accuracies, "holdout": holdout,
+    })
+    if fit.get("folds"):
+        fit["cv"] = cv_scores([fold.subset(chosen["selected"]) for fold in fit["folds"]])
+    if fit.get("groups"):
+        fit["groups"] = [group.subset(sorted(chosen["selected"])) for group in fit["groups"]]
+
+    path = []
+    for step in chosen["path"]:
+        entry = {"term": feature_names[step["feature"]], "train_r2": [round(r * 100, 2) for r in step["train_r2"]]}
+        if "holdout_r2" in step:
+            entry["holdout_r2"] = [round(r * 100, 2) for r in step["holdout_r2"]]
+        else:
+            entry["bic"] = round(step["bic"], 4)
+        path.append(entry)
+    block = {
+        "method": selection["method"],
+        "criterion": chosen["criterion"],
+        "candidates": len(feature_names),
+        "selected": [feature_names[i] for i in chosen["selected"]],
+        "path": path,
+    }
+    return compact, [feature_names[i] for i in sorted(chosen["selected"])], block
+
+
+def _result_key(entry, x_cols, y_cols, deg_val: int, fit_mode: str, *options):
+    return (entry["dataset_id"], tuple(x_cols), tuple(y_cols), deg_val, fit_mode) + options
+
+
+def _cache_result(key, response) -> None:
+    """Keep a finished response; the model it describes remembers the key so updates can drop it."""
+    stored = models_store.get(response["model"].get("model_id"))
+    if stored is not None:
+        stored["result_key"] = key
+    results_cache.put(key, response, nbytes=len(json.dumps(response)))
+
+
+def _plot_sample(X_base, Y, rows: int = PLOT_SAMPLE_ROWS):
+    """Evenly spaced rows of the base features and targets, kept with a stored model for its plots."""
+    Y = Y.reshape(len(Y), -1)
+    if len(Y) > rows:
+        idx = np.unique(np.linspace(0, len(Y) - 1, rows).astype(np.int64))
+        X_base, Y = X_base[idx], Y[idx]
+    return {"X": np.asarray(X_base, dtype=float), "Y": np.asarray(Y, dtype=float)}
+
+
+def _link_plots(response):
+    """Point the response at the on-demand plots of its stored model, one per target."""
+    model_id = response["model"]["model_id"]
+    response["plots"] = [
+        {"target": t, "url": f"/models/{model_id}/plot?target={quote(t, safe='')}"}
+        for t in response["model"]["target_names"]
+    ]
+    return response
+
+
+def _plot_data_options(enabled, points, method):
+    """Validated ``(points, method)`` for ``plot_data`` series, or None when they are off."""
+    try:
+        options = series_options(points, method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return options if enabled else None
+
+
+async def _with_plot_data(response, options):
+    """The response with downsampled chart series of its stored model, when they were asked for."""
+    stored = models_store.get(response["model"].get("model_id"))
+    if options is None or stored is None:
+        return response
+    parts = {k: stored[k] for k in ("plot", "linear", "poly", "targets", "feature_names", "base_feature_names", "accuracies")}
+    return {**response, "plot_data": await run_compute(model_series, parts, *options)}
+
+
+def _fit_streaming(
+    entry, x_cols, y_cols, deg_val: int, cv_folds: int = 0,
+    regularization: Optional[str] = None, alpha: Optional[float] = None, selection=None, confidence=None,
+):
+    """Fit from row chunks streamed off disk; plots are drawn from a sample of rows."""
+    try:
+        fit = fit_chunks(
+            lambda: datasets_store.iter_columns(entry, x_cols + y_cols), x_cols, y_cols, deg_val,
+            STREAMING_PLOT_ROWS, cv_folds, degree_search=not (regularization or selection),
+            bootstrap=bool(confidence) and confidence["method"] == "bootstrap",
+        )
+    except FitInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    kept_x = fit["x_columns"]
+    sanitization = {"ignored_x_columns": fit["ignored_x_columns"], "dropped_rows": int(fit["dropped_rows"])}
+
+    if fit["single_feature"]:
+        details = fit["details"]
+        response = {
+            "success": True,
+            "functions": [details['function'].replace('f(x): ', '')],
+            "accuracies": [round(float(details['accuracy']) * 100, 2)],
+            "data_points": int(fit["rows"]),
+            "dataset_id": entry["dataset_id"],
+            "fit_mode": "streaming",
+            "x_columns": kept_x,
+            "y_columns": y_cols,
+            "sanitization": sanitization,
+            "model": {
+                "coefficients": [details['coefficients']],
+                "intercepts": [details['intercept']],
+                "is_polynomial": details['is_polynomial'],
+                "degree": details['degree'],
+                "family": details['family'],
+                "feature_names": kept_x,
+                "target_names": y_cols,
+                "multi_output": False,
+            },
+            "families": _family_ranking(details),
+        }
+        if "cv" in details:
+            response["cv"] = _degree_cv(details)
+        if confidence and details["is_polynomial"]:
+            groups = fit.get("groups") or [fit["power_sums"]]
+            response["intervals"] = _intervals_block(power_sum_intervals(groups, details["degree"], *fit["scaling"], confidence))
+        elif confidence:
+            groups = fit.get("family_groups") or [fit["family_sums"]]
+            response["intervals"] = _intervals_block(family_sum_intervals(groups, details["family"], confidence))
+        return _store_single_feature(response, details, {"X": fit["sample_X"], "Y": fit["sample_Y"]}, fit["single_stats"])
+
+    poly, feature_names = fit["poly"], fit["feature_names"]
+    use_poly = poly is not None
+    pruned_terms = poly.pruned_terms if use_poly else 0
+    if regularization:
+        coef, intercept, accuracies, holdout, reg_info = solve_regularized(fit["train_stats"], fit["test_stats"], regularization, alpha)
+        fit.update({"coef": coef, "intercept": intercept, "accuracies": accuracies, "holdout": holdout})
+        if cv_folds:
+            fit["cv"] = cv_scores(fit["folds"], regularized_solver(regularization, np.array(reg_info["alphas"])))
+    if selection:
+        poly, feature_names, selection_block = _select_terms(fit, poly, feature_names, selection)
+    lr = linear_model(fit["coef"], fit["intercept"])
+    coef = lr.coef_
+    intercepts = lr.intercept_.tolist()
+    accuracies = fit["accuracies"]
+
+    model_id = str(uuid.uuid4())
+    stored = {
+        "linear": lr,
+        "poly": poly,
+        "feature_names": feature_names,
+        "base_feature_names": kept_x,
+        "use_poly": use_poly,
+        "targets": y_cols,
+        "train_stats": fit["train_stats"],
+        "test_stats": fit["test_stats"],
+        "regularization": {"method": regularization, "alpha": alpha} if regularization else None,
+        "accuracies": [float(a) for a in accuracies],
+        "plot": {"X": fit["sample_X"], "Y": fit["sample_Y"]},
+        "updates": 1,
+    }
+    models_store.put(model_id, stored, nbytes=model_nbytes(stored))
+
+    response = {
+        "success": True,
+        "functions": format_functions(y_cols, feature_names, coef, intercepts),
+        "accuracies": [round(a * 100, 2) for a in accuracies],
+        "accuracy_source": "holdout" if fit["holdout"] else "in_sample",
+        "data_points": int(fit["rows"]),
+        "dataset_id": entry["dataset_id"],
+        "fit_mode": "streaming",
+        "x_columns": kept_x,
+        "y_columns": y_cols,
+        "sanitization": sanitization,
+        "model": {
+            "coefficients": coef.tolist(),
+            "intercepts": intercepts,
+            "is_polynomial": use_poly,
+            "degree": deg_val if use_poly else 1,
+            "pruned_terms": pruned_terms,
+            "feature_names": feature_names,
+            "target_names": y_cols,
+            "multi_output": len(y_cols) > 1,
+            "model_id": model_id,
+        }
+    }
+    if regularization:
+        response["regularization"] = describe(reg_info)
+    if selection:
+        response["selection"] = selection_block
+    if "cv" in fit:
+        response["cv"] = _cv_summary(cv_folds, *fit["cv"])
+    if confidence:
+        full = fit["train_stats"] + fit["test_stats"]
+        response["intervals"] = _intervals_block(coefficient_intervals(full, fit.get("groups"), confidence))
+    return response
+
+
+def _least_squares(X, Y, y_cols, use_poly: bool):
+    """Ordinary least squares on the expanded design; accuracies are in-sample R^2."""
+    if len(X) > 200 and use_poly:
+        X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
+        lr = LinearRegression()
+        lr.fit(X_train, Y_train)
+        Y_pred = lr.predict(X_test)
+        accuracies = []
+        coef = lr.coef_
+        if coef.ndim == 1:
+            coef = coef.reshape(1, -1)
+        intercepts = lr.intercept_.tolist() if hasattr(lr.intercept_, 'tolist') else [float(lr.intercept_)]
+        if len(y_cols) == 1:
+            accuracies = [float(lr.score(X_test, Y_test))]
+        else:
+            for t in range(len(y_cols)):
+                y_true = Y_test[:, t]
+                y_hat = Y_pred[:, t]
+                ss_res = float(np.sum((y_true - y_hat) ** 2))
+                ss_tot = float(np.sum((y_true - np.mean(y_true)) ** 2))
+                r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
+                accuracies.append(r2)
+        lr.fit(X, Y)
+        Y_pred = lr.predict(X)
+    else:
+        lr = LinearRegression()
+        lr.fit(X, Y)
+        Y_pred = lr.predict(X)
+
+    accuracies = []
+    coef = lr.coef_
+    if coef.ndim == 1:
+        coef = coef.reshape(1, -1)
+    intercepts = lr.intercept_.tolist() if hasattr(lr.intercept_, 'tolist') else [float(lr.intercept_)]
+
+    if len(y_cols) == 1:
+        accuracies = [float(lr.score(X, Y))]
+    else:
+        for t in range(len(y_cols)):
+            y_true = Y[:, t]
+            y_hat = Y_pred[:, t]
+            ss_res = float(np.sum((y_true - y_hat) ** 2))
+            ss_tot = float(np.sum((y_true - np.mean(y_true)) ** 2))
+            r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
+            accuracies.append(r2)
+    return lr, Y_pred, coef, intercepts, accuracies
+
+
+def _complete_rows(frame, x_cols, y_cols):
+    """Sanitize ``frame`` and keep the rows with every usable column present.
+
+    Returns ``(work, kept_x, ignored_x, dropped_rows)``; X columns without any
+    numeric value are ignored.
+    """
+    work, valid_counts = sanitize_numeric(frame)
+
+    kept_x = [c for c in x_cols if valid_counts[c] > 0]
+    ignored_x = [c for c in x_cols if c not in kept_x]
+    if not kept_x:
+        raise HTTPException(status_code=400, detail="No valid numeric X columns after sanitization. Please select different columns.")
+
+    for yc in y_cols:
+        if valid_counts[yc] == 0:
+            raise HTTPException(status_code=400, detail=f"Target column '{yc}' has no valid numeric values after sanitization.")
+
+    before_rows = len(work)
+    work = work.dropna(subset=kept_x + y_cols)
+    dropped_rows = before_rows - len(work)
+    if len(work) < 2:
+        raise HTTPException(status_code=400, detail="Not enough valid rows after sanitization to fit a model.")
+    return work, kept_x, ignored_x, dropped_rows
+
+
+def _design_fits_memory(entry, x_cols, y_cols, deg_val: int) -> bool:
+    """Whether the expanded design of an in-memory fit stays within POLY_DESIGN_MAX_BYTES.
+
+    The row count is the parsed frame's or, for CSVs not parsed yet, their
+    line count; other formats load the columns the memory fit would load anyway.
+    """
+    if deg_val <= 1:
+        return True
+    columns = x_cols + y_cols
+    if is_csv(entry["format_name"]) and not datasets_store.has_columns(entry, columns):
+        rows = max(int(entry.get("lines", 0)) - 1, 0)
+    else:
+        rows = len(datasets_store.load_columns(entry, columns))
+    return design_nbytes(rows, len(x_cols), deg_val) <= POLY_DESIGN_MAX_BYTES
+
+
+def _fit_memory(
+    entry, x_cols, y_cols, deg_val: int, cv_folds: int = 0,
+    regularization: Optional[str] = None, alpha: Optional[float] = None, selection=None, confidence=None,
+):
+    # Only the selected columns are parsed, then converted to float64 in one pass
+    frame = datasets_store.load_columns(entry, x_cols + y_cols)
+    return _fit_frame(frame, entry, x_cols, y_cols, deg_val, cv_folds, regularization, alpha, selection, confidence)
+
+
+def _fit_frame(
+    frame, entry, x_cols, y_cols, deg_val: int, cv_folds: int = 0,
+    regularization: Optional[str] = None, alpha: Optional[float] = None, selection=None, confidence=None,
+    fit_mode: str = "memory",
+):
+    """Fit the rows of ``frame``: the whole dataset, or a preview's sample of it."""
+    work, kept_x, ignored_x, dropped_rows = _complete_rows(frame, x_cols, y_cols)
+
+    X_base = work[kept_x].to_numpy()
+    Y = work[y_cols].to_numpy()
+    if Y.ndim == 1:
+        Y = Y.reshape(-1)
+
+    use_poly = deg_val > 1
+    if use_poly:
+        poly = plan_expansion(len(kept_x), deg_val)
+        X = poly.transform(X_base)
+        feature_names = poly.feature_names(kept_x)
+    else:
+        poly = None
+        X = X_base
+        feature_names = kept_x
+    pruned_terms = poly.pruned_terms if use_poly else 0
+
+    single_feature_single_target = (
+        X_base.shape[1] == 1 and len(y_cols) == 1 and not use_poly and not regularization and not selection
+    )
+
+    if single_feature_single_target:
+        x_data = X_base[:, 0].tolist()
+        y_data = Y[:, 0].tolist() if Y.ndim == 2 else Y.tolist()
+        details = req_details(x_data, y_data, cv_folds, confidence)
+        if 'error' in details:
+            raise HTTPException(status_code=400, detail=details['error'])
+
+        response = {
+            "success": True,
+            "functions": [details['function'].replace('f(x): ', '')],
+            "accuracies": [round(float(details['accuracy']) * 100, 2)],
+            "data_points": len(x_data),
+            "dataset_id": entry["dataset_id"],
+            "fit_mode": fit_mode,
+            "x_columns": kept_x,
+            "y_columns": y_cols,
+            "sanitization": {"ignored_x_columns": ignored_x, "dropped_rows": int(dropped_rows)},
+            "model": {
+                "coefficients": [details['coefficients']],
+                "intercepts": [details['intercept']],
+                "is_polynomial": details['is_polynomial'],
+                "degree": details['degree'],
+                "family": details['family'],
+                "feature_names": kept_x,
+                "target_names": y_cols,
+                "multi_output": False,
+            },
+            "families": _family_ranking(details),
+        }
+        if "cv" in details:
+            response["cv"] = _degree_cv(details)
+        if "intervals" in details:
+            response["intervals"] = _intervals_block(details["intervals"])
+        single_stats = single_feature_stats(X_base[:, 0], np.asarray(y_data, dtype=float), details)
+        return _store_single_feature(response, details, _plot_sample(X_base, Y), single_stats)
+
+    # Sufficient statistics let /models/{model_id}/partial-fit add rows later
+    train_stats, test_stats, folds = split_stats(X, Y.reshape(len(Y), -1), cv_folds=cv_folds)
+    if selection:
+        fit = {"train_stats": train_stats, "test_stats": test_stats, "folds": folds}
+        poly, compact_names, selection_block = _select_terms(fit, poly, feature_names, selection)
+        X = X[:, [feature_names.index(name) for name in compact_names]]
+        feature_names = compact_names
+        train_stats, test_stats, accuracies = fit["train_stats"], fit["test_stats"], fit["accuracies"]
+        lr = linear_model(fit["coef"], fit["intercept"])
+        coef, intercepts = lr.coef_, lr.intercept_.tolist()
+    elif regularization:
+        coef, intercept, accuracies, _, reg_info = solve_regularized(train_stats, test_stats, regularization, alpha)
+        lr = linear_model(coef, intercept)
+        intercepts = lr.intercept_.tolist()
+    else:
+        lr, _, coef, intercepts, accuracies = _least_squares(X, Y, y_cols, use_poly)
+    model_id = str(uuid.uuid4())
+    stored = {
+        "linear": lr,
+        "poly": poly,
+        "feature_names": feature_names,
+        "base_feature_names": kept_x,
+        "use_poly": use_poly,
+        "targets": y_cols,
+        "train_stats": train_stats,
+        "test_stats": test_stats,
+        "regularization": {"method": regularization, "alpha": alpha} if regularization else None,
+        "accuracies": [float(a) for a in accuracies],
+        "plot": _plot_sample(X_base, Y),
+        "updates": 1,
+    }
+    models_store.put(model_id, stored, nbytes=model_nbytes(stored))
+
+    response = {
+        "success": True,
+        "functions": format_functions(y_cols, feature_names, coef, intercepts),
+        "accuracies": [round(a * 100, 2) for a in accuracies],
+        "data_points": int(X.shape[0]),
+        "dataset_id": entry["dataset_id"],
+        "fit_mode": fit_mode,
+        "x_columns": kept_x,
+        "y_columns": y_cols,
+        "sanitization": {"ignored_x_columns": ignored_x, "dropped_rows": int(dropped_rows)},
+        "model": {
+            "coefficients": coef.tolist(),
+            "intercepts": intercepts,
+            "is_polynomial": use_poly,
+            "degree": deg_val if use_poly else 1,
+            "pruned_terms": pruned_terms,
+            "feature_names": feature_names,
+            "target_names": y_cols,
+            "multi_output": len(y_cols) > 1,
+            "model_id": model_id,
+        }
+    }
+    if regularization:
+        response["regularization"] = describe(reg_info)
+    if selection:
+        response["selection"] = selection_block
+        if "cv" in fit:
+            response["cv"] = _cv_summary(cv_folds, *fit["cv"])
+    elif folds:
+        solve = regularized_solver(regularization, np.array(reg_info["alphas"])) if regularization else None
+        response["cv"] = _cv_summary(cv_folds, *cv_scores(folds, solve))
+    if confidence:
+        try:
+            response["intervals"] = _intervals_block(row_intervals(X, Y.reshape(len(Y), -1), confidence))
+        except FitInputError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return response
+
+
+def _preview_sample(entry, columns, n_rows: int, strategy: str):
+    """A row sample and the dataset's row count, or ``(None, rows)`` when the
+    dataset is small enough to fit whole. CSVs not parsed yet are sampled by
+    seeking (or, compressed, in one streamed pass), with the row count
+    estimated from their line count."""
+    if is_csv(entry["format_name"]) and not datasets_store.has_columns(entry, columns):
+        total = max(int(entry.get("lines", 0)) - 1, 0)
+        if total <= n_rows:
+            return None, total
+        if entry.get("compression"):
+            chunks = datasets_store.iter_columns(entry, columns)
+            sample = sample_chunk_rows(chunks, total, n_rows, strategy, entry["dataset_id"])
+        else:
+            with datasets_store.reading(entry):
+                sample = sample_csv_rows(entry, columns, n_rows, strategy)
+        if sample is not None:
+            return sample, total
+    frame = datasets_store.load_columns(entry, columns)
+    if len(frame) <= n_rows:
+        return None, len(frame)
+    return sample_frame(frame, n_rows, strategy, entry["dataset_id"]), len(frame)
+
+
+def _intervals_block(intervals):
+    """``[lower, upper]`` and the standard error of every coefficient and intercept, for the response."""
+    block = {
+        "method": intervals["method"],
+        "level": intervals["level"],
+        "coefficients": np.stack([intervals["coef_lower"], intervals["coef_upper"]], axis=-1).tolist(),
+        "intercepts": np.stack([intervals["intercept_lower"], intervals["intercept_upper"]], axis=-1).tolist(),
+        "standard_errors": {
+            "coefficients": np.asarray(intervals["coef_se"]).tolist(),
+            "intercepts": np.asarray(intervals["intercept_se"]).tolist(),
+        },
+    }
+    for key in ("dof", "samples", "groups"):
+        if key in intervals:
+            block[key] = intervals[key]
+    return block
+
+
+def _confidence_options(method, level, samples):
+    """Validated ``confidence`` options for ``intervals``, or None when intervals are off."""
+    method = (method or "none").lower()
+    if method not in ("none",) + CONFIDENCE_METHODS:
+        raise HTTPException(status_code=400, detail="confidence must be one of: none, " + ", ".join(CONFIDENCE_METHODS))
+    level = 0.95 if level is None else float(level)
+    if not 0.0 < level < 1.0:
+        raise HTTPException(status_code=400, detail="confidence_level must be between 0 and 1")
+    if samples is not None and not 10 <= samples <= BOOTSTRAP_MAX_SAMPLES:
+        raise HTTPException(status_code=400, detail=f"bootstrap_samples must be between 10 and {BOOTSTRAP_MAX_SAMPLES}")
+    if method == "none":
+        return None
+    return {"method": method, "level": level, "samples": int(samples or BOOTSTRAP_SAMPLES)}
+
+
+def _fit_preview(
+    entry, x_cols, y_cols, deg_val: int, n_rows: int, strategy: str, cv_folds: int = 0,
+    regularization: Optional[str] = None, alpha: Optional[float] = None, selection=None, confidence=None,
+):
+    """The full fit's model and response format, fitted on a sample of rows.
+
+    Least-squares previews report analytic confidence intervals on the
+    coefficients even when none were asked for. Returns None when the sample
+    would be the whole dataset, so the caller fits it normally.
+    """
+    frame, total_rows = _preview_sample(entry, x_cols + y_cols, n_rows, strategy)
+    if frame is None:
+        return None
+    if confidence is None and not regularization:
+        confidence = _confidence_options("analytic", None, None)
+    response = _fit_frame(
+        frame, entry, x_cols, y_cols, deg_val, cv_folds, regularization, alpha, selection, confidence, fit_mode="preview",
+    )
+    response["preview"] = {
+        "strategy": strategy,
+        "sample_rows": int(len(frame)),
+        "total_rows": int(total_rows),
+        "status": "running",
+        "status_url": f"/models/{response['model']['model_id']}/fit-status",
+    }
+    return response
+
+
+def _single_feature_model(model):
+    """Stored model for a single-feature response, rebuilt from its reported coefficients."""
+    degree = int(model["degree"]) if model["is_polynomial"] else 1
+    poly = plan_expansion(1, degree) if degree > 1 else None
+    if model.get("family") in FAMILIES:
+        linear = CurveModel(model["family"], model["coefficients"][0][0], model["intercepts"][0])
+    else:
+        linear = linear_model(np.array(model["coefficients"]), np.array(model["intercepts"]))
+    return {
+        "linear": linear,
+        "poly": poly,
+        "feature_names": poly.feature_names(model["feature_names"]) if poly is not None else model["feature_names"],
+        "base_feature_names": model["feature_names"],
+        "use_poly": poly is not None,
+        "targets": model["target_names"],
+        "updates": 1,
+    }
+
+
+def _store_single_feature(response, details, plot, single_stats=None):
+    """Store the model of a single-feature response, with its plot sample, under a new model_id.
+
+    ``single_stats`` (see ``single_feature_stats``) lets partial fits add rows to it.
+    """
+    model_id = str(uuid.uuid4())
+    stored = {
+        **_single_feature_model(response["model"]),
+        "accuracies": [float(details['accuracy'])],
+        "plot": plot,
+    }
+    if single_stats is not None:
+        stored["single_stats"] = single_stats
+    models_store.put(model_id, stored, nbytes=model_nbytes(stored))
+    response["model"]["model_id"] = model_id
+    return response
+
+
+async def _when_admitted(stage, max_wait: float = PREVIEW_REFINE_MAX_WAIT_SECONDS):
+    """Await ``stage()``, waiting out saturated pools for up to ``max_wait`` seconds before the 503 is raised."""
+    deadline = time.monotonic() + max_wait
+    while True:
+        try:
+            return await stage()
+        except HTTPException as e:
+            remaining = deadline - time.monotonic()
+            if e.status_code != 503 or remaining <= 0:
+                raise
+            await asyncio.sleep(min(SATURATED_RETRY_AFTER_SECONDS, remaining))
+
+
+# Strong references to running refinements; the event loop only keeps weak ones
+_refinements = set()
+# Result key -> model_id of the preview whose full fit is running under that key
+_refining = {}
+
+
+def _running_preview(key):
+    """The preview response of the refinement running for ``key``, if its model is still stored."""
+    job = fit_jobs.get(_refining.get(key))
+    if job is None or job["status"] not in ("queued", "running"):
+        return None
+    return job.get("preview")
+
+
+async def _refine(model_id: str, key, job, fit_fn, args) -> None:
+    """Background full fit replacing the preview model ``model_id``.
+
+    The finished response is cached under the full fit's key, so the status
+    endpoint and later identical requests both read it from the results cache.
+    """
+    job["status"] = "running"
+    try:
+        response = await _when_admitted(lambda: run_compute(fit_fn, *args))
+        stored = models_store.pop(response["model"]["model_id"])
+        if stored is None:
+            raise HTTPException(status_code=503, detail="The refined model was evicted before it could replace the preview")
+        models_store.put(model_id, stored, nbytes=model_nbytes(stored))
+        response["model"]["model_id"] = model_id
+        _cache_result(key, _link_plots(response))
+        job.update({"status": "done", "result_key": key})
+    except HTTPException as e:
+        if e.status_code == 503:
+            # The model keeps serving the preview coefficients
+            job.update({"status": "failed", "stale": True, "error": f"The full fit was not admitted within {PREVIEW_REFINE_MAX_WAIT_SECONDS} seconds: {e.detail}"})
+        else:
+            job.update({"status": "failed", "error": str(e.detail)})
+    except Exception as e:
+        job.update({"status": "failed", "error": f"Error analyzing data: {str(e)}"})
+    finally:
+        job["finished"] = time.time()
+        job.pop("preview", None)
+        if _refining.get(key) == model_id:
+            del _refining[key]
+
+
+def _start_refinement(previewed, key, fit_fn, args) -> None:
+    """Refine the ``previewed`` model in the background; identical previews share it until it finishes."""
+    model_id = previewed["model"]["model_id"]
+    job = {"status": "queued", "started": time.time(), "preview": previewed}
+    fit_jobs.put(model_id, job)
+    _refining[key] = model_id
+    task = asyncio.get_running_loop().create_task(_refine(model_id, key, job, fit_fn, args))
+    _refinements.add(task)
+    task.add_done_callback(_refinements.discard)
+
 
 @router.post("/analyze-data")
 async def analyze_data(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
     x_column: Optional[str] = Form(None),
     y_column: Optional[str] = Form(None),
     x_columns: Optional[str] = Form(None),
     y_columns: Optional[str] = Form(None),
     poly_degree: Optional[int] = Form(1),
+    fit_mode: Optional[str] = Form("auto"),
+    cv_folds: Optional[int] = Form(0),
+    regularization: Optional[str] = Form("none"),
+    alpha: Optional[float] = Form(None),
+    selection: Optional[str] = Form("none"),
+    selection_criterion: Optional[str] = Form("auto"),
+    max_terms: Optional[int] = Form(None),
+    preview: Optional[bool] = Form(False),
+    preview_sample: Optional[str] = Form("uniform"),
+    preview_rows: Optional[int] = Form(None),
+    confidence: Optional[str] = Form("none"),
+    confidence_level: Optional[float] = Form(0.95),
+    bootstrap_samples: Optional[int] = Form(None),
+    plot_data: Optional[bool] = Form(False),
+    plot_points: Optional[int] = Form(None),
+    downsample: Optional[str] = Form("lttb"),
 ):
     try:
-        contents = await file.read()
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.StringIO(contents.decode('utf-8')), low_memory=False)
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(io.BytesIO(contents))
-        elif file.filename.endswith('.json'):
-            data = json.loads(contents.decode('utf-8'))
-            df = pd.DataFrame(data)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
+        entry = await resolve_dataset(file, dataset_id)
 
         if x_columns:
             try:
@@ -59,253 +779,96 @@ async def analyze_data(
             raise HTTPException(status_code=400, detail="Please select at least one X column and one Y column")
 
         for col in x_cols + y_cols:
-            if col not in df.columns:
+            if col not in entry["columns"]:
                 raise HTTPException(status_code=400, detail=f"Column '{col}' not found in data")
 
-        work = df[x_cols + y_cols].copy()
-        placeholders = ['-', '—', '–', 'N/A', 'NA', 'na', 'NaN', '', 'null', 'None']
-        for col in work.columns:
-            try:
-                work[col] = work[col].replace(placeholders, np.nan)
-                work[col] = pd.to_numeric(work[col], errors='coerce')
-            except Exception:
-                work[col] = pd.to_numeric(pd.Series(dtype=float), errors='coerce')
-
-        kept_x = [c for c in x_cols if work[c].notna().sum() > 0]
-        ignored_x = [c for c in x_cols if c not in kept_x]
-        if not kept_x:
-            raise HTTPException(status_code=400, detail="No valid numeric X columns after sanitization. Please select different columns.")
-
-        for yc in y_cols:
-            if work[yc].notna().sum() == 0:
-                raise HTTPException(status_code=400, detail=f"Target column '{yc}' has no valid numeric values after sanitization.")
-
-        before_rows = len(work)
-        work = work.dropna(subset=kept_x + y_cols)
-        dropped_rows = before_rows - len(work)
-        if len(work) < 2:
-            raise HTTPException(status_code=400, detail="Not enough valid rows after sanitization to fit a model.")
-
-        X_base = work[kept_x].to_numpy()
-        Y = work[y_cols].to_numpy()
-        if Y.ndim == 1:
-            Y = Y.reshape(-1)
+        mode = (fit_mode or "auto").lower()
+        if mode not in FIT_MODES:
+            raise HTTPException(status_code=400, detail="fit_mode must be one of: " + ", ".join(FIT_MODES))
 
         try:
             deg_val = int(poly_degree) if poly_degree is not None else 1
         except Exception:
             deg_val = 1
-        if deg_val > 2:
-            deg_val = 2
-        use_poly = deg_val > 1
-        if use_poly:
-            poly = PolynomialFeatures(degree=deg_val, include_bias=False)
-            X = poly.fit_transform(X_base)
-            raw_feature_names = poly.get_feature_names_out(kept_x).tolist()
-            feature_names = [fn.replace(' ', '*') for fn in raw_feature_names]
-        else:
-            X = X_base
-            feature_names = kept_x
-
-        single_feature_single_target = (X_base.shape[1] == 1 and len(y_cols) == 1 and not use_poly)
-
-        if single_feature_single_target:
-            x_data = X_base[:, 0].tolist()
-            y_data = Y.tolist() if hasattr(Y, 'tolist') else list(Y)
-            details = req_details(x_data, y_data)
-            if 'error' in details:
-                raise HTTPException(status_code=400, detail=details['error'])
-
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6), facecolor='#0a0a0a')
-            ax1.scatter(x_data, y_data, alpha=0.8, color='#3b82f6', s=50, label='Data')
-            sorted_pairs = sorted(zip(x_data, y_data), key=lambda p: p[0])
-            if len(sorted_pairs) >= 2:
-                ax1.plot([p[0] for p in sorted_pairs], [p[1] for p in sorted_pairs], color='#60a5fa', alpha=0.6, linewidth=1)
-            coeffs = details['coefficients']
-            intercept = details['intercept']
-            xs = np.linspace(min(x_data), max(x_data), 200)
-            if details['is_polynomial']:
-                ys = np.full_like(xs, intercept, dtype=float)
-                for i, c in enumerate(coeffs):
-                    ys = ys + c * (xs ** (i + 1))
-            else:
-                ys = intercept + coeffs[0] * xs if len(coeffs) > 0 else np.full_like(xs, intercept, dtype=float)
-            ax1.plot(xs, ys, color='#f59e0b', linewidth=2, label='Model')
-            ax1.set_xlabel(kept_x[0], color='white')
-            ax1.set_ylabel(y_cols[0], color='white')
-            ax1.set_title('Data & Model Fit', color='white')
-            ax1.grid(True, alpha=0.3)
-
-            ax2.hist(y_data, bins=20, alpha=0.7, color='#10b981', edgecolor='white')
-            ax2.set_xlabel(y_cols[0], color='white')
-            ax2.set_ylabel('Frequency', color='white')
-            ax2.set_title('Target Variable Distribution', color='white')
-            ax2.grid(True, alpha=0.3)
-
-            for ax in [ax1, ax2]:
-                ax.set_facecolor('#1a1a1a')
-                ax.tick_params(colors='white')
-                for spine in ax.spines.values():
-                    spine.set_color('white')
-
-            plt.tight_layout()
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', facecolor='#0a0a0a', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            img_base64 = base64.b64encode(img_buffer.read()).decode()
-            plt.close()
-
-            return {
-                "success": True,
-                "functions": [details['function'].replace('f(x): ', '')],
-                "accuracies": [round(float(details['accuracy']) * 100, 2)],
-                "visualization": img_base64,
-                "data_points": len(x_data),
-                "x_columns": kept_x,
-                "y_columns": y_cols,
-                "sanitization": {"ignored_x_columns": ignored_x, "dropped_rows": int(dropped_rows)},
-                "model": {
-                    "coefficients": [details['coefficients']],
-                    "intercepts": [details['intercept']],
-                    "is_polynomial": details['is_polynomial'],
-                    "degree": details['degree'],
-                    "feature_names": kept_x,
-                    "target_names": y_cols,
-                    "multi_output": False,
-                }
-            }
-        else:
-            if len(work) > 200 and use_poly:
-                X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
-                lr = LinearRegression()
-                lr.fit(X_train, Y_train)
-                Y_pred = lr.predict(X_test)
-                accuracies = []
-                coef = lr.coef_
-                if coef.ndim == 1:
-                    coef = coef.reshape(1, -1)
-                intercepts = lr.intercept_.tolist() if hasattr(lr.intercept_, 'tolist') else [float(lr.intercept_)]
-                if len(y_cols) == 1:
-                    accuracies = [float(lr.score(X_test, Y_test))]
-                else:
-                    for t in range(len(y_cols)):
-                        y_true = Y_test[:, t]
-                        y_hat = Y_pred[:, t]
-                        ss_res = float(np.sum((y_true - y_hat) ** 2))
-                        ss_tot = float(np.sum((y_true - np.mean(y_true)) ** 2))
-                        r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
-                        accuracies.append(r2)
-                lr.fit(X, Y)
-                Y_pred = lr.predict(X)
-            else:
-                lr = LinearRegression()
-                lr.fit(X, Y)
-                Y_pred = lr.predict(X)
-
-            accuracies = []
-            coef = lr.coef_
-            if coef.ndim == 1:
-                coef = coef.reshape(1, -1)
-            intercepts = lr.intercept_.tolist() if hasattr(lr.intercept_, 'tolist') else [float(lr.intercept_)]
-
-            if len(y_cols) == 1:
-                accuracies = [float(lr.score(X, Y))]
-            else:
-                for t in range(len(y_cols)):
-                    y_true = Y[:, t]
-                    y_hat = Y_pred[:, t]
-                    ss_res = float(np.sum((y_true - y_hat) ** 2))
-                    ss_tot = float(np.sum((y_true - np.mean(y_true)) ** 2))
-                    r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
-                    accuracies.append(r2)
-
-            functions = []
-            for t in range(len(y_cols)):
-                terms = []
-                for i, fname in enumerate(feature_names):
-                    c = round(float(coef[t][i]), 4)
-                    sign = '+' if c >= 0 and i > 0 else ''
-                    terms.append(f"{sign}{c}*{fname}")
-                b = round(float(intercepts[t]), 4)
-                b_str = f"+ {abs(b)}" if b >= 0 else f"- {abs(b)}"
-                functions.append(f"{y_cols[t]}(x) = {' '.join(terms)} {b_str}")
-
-            target_visualizations = []
-            first_img_base64 = None
-            for t in range(len(y_cols)):
-                fig, (ax_feat, ax_pp) = plt.subplots(1, 2, figsize=(15, 6), facecolor='#0a0a0a')
-                coef_t = coef[t] if len(y_cols) > 1 else coef.flatten()
-                importance = np.abs(coef_t)
-                colors = ['#3b82f6' if c >= 0 else '#ef4444' for c in coef_t]
-                _ = ax_feat.barh(feature_names, importance, color=colors, alpha=0.8)
-                ax_feat.set_xlabel('Coefficient Magnitude', color='white')
-                ax_feat.set_title(f"Feature Importance ({y_cols[t]})", color='white')
-                ax_feat.tick_params(colors='white')
-                ax_feat.set_facecolor('#1a1a1a')
-                for spine in ax_feat.spines.values():
-                    spine.set_color('white')
-                ax_feat.grid(True, alpha=0.3, axis='x')
-
-                y_true_t = Y[:, t] if len(y_cols) > 1 else (Y if Y.ndim == 1 else Y[:, 0])
-                y_hat_t = Y_pred[:, t] if len(y_cols) > 1 else (Y_pred if Y_pred.ndim == 1 else Y_pred[:, 0])
-                ax_pp.scatter(y_true_t, y_hat_t, color='#3b82f6', alpha=0.7, s=30, edgecolors='white', linewidth=0.5)
-                min_v = float(min(np.min(y_true_t), np.min(y_hat_t)))
-                max_v = float(max(np.max(y_true_t), np.max(y_hat_t)))
-                margin = (max_v - min_v) * 0.05
-                ax_pp.plot([min_v - margin, max_v + margin], [min_v - margin, max_v + margin], color='#f59e0b', linewidth=2, linestyle='--')
-                r2_val_t = (accuracies[t] if accuracies else 0.0)
-                ax_pp.text(0.05, 0.95, f'R² = {r2_val_t:.3f}', transform=ax_pp.transAxes, bbox=dict(boxstyle='round', facecolor='#1a1a1a', alpha=0.8), color='white', fontsize=12)
-                ax_pp.set_xlabel(f'Actual {y_cols[t]}', color='white')
-                ax_pp.set_ylabel(f'Predicted {y_cols[t]}', color='white')
-                ax_pp.set_title('Prediction Accuracy', color='white')
-                ax_pp.grid(True, alpha=0.3)
-                ax_pp.set_facecolor('#1a1a1a')
-                for spine in ax_pp.spines.values():
-                    spine.set_color('white')
-                ax_pp.tick_params(colors='white')
-                ax_pp.set_aspect('equal', adjustable='box')
-                plt.tight_layout()
-
-                img_buffer = io.BytesIO()
-                plt.savefig(img_buffer, format='png', facecolor='#0a0a0a', dpi=150, bbox_inches='tight')
-                img_buffer.seek(0)
-                img_base64 = base64.b64encode(img_buffer.read()).decode()
-                plt.close()
-                if first_img_base64 is None:
-                    first_img_base64 = img_base64
-                target_visualizations.append({"target": y_cols[t], "image": img_base64})
-
-            model_id = str(uuid.uuid4())
-            models_store[model_id] = {
-                "linear": lr,
-                "poly": poly if use_poly else None,
-                "feature_names": feature_names,
-                "base_feature_names": kept_x,
-                "use_poly": use_poly,
-                "targets": y_cols,
+        deg_val = min(deg_val, POLY_MAX_DEGREE)
+        _check_expansion(len(x_cols), deg_val)
+        folds = _check_cv_folds(cv_folds)
+        method = (regularization or "none").lower()
+        if method not in ("none",) + REGULARIZATION_METHODS:
+            raise HTTPException(status_code=400, detail="regularization must be one of: none, " + ", ".join(REGULARIZATION_METHODS))
+        method = None if method == "none" else method
+        if alpha is not None and (not method or not alpha > 0):
+            raise HTTPException(status_code=400, detail="alpha must be positive and needs regularization set to ridge or lasso")
+        selector = (selection or "none").lower()
+        if selector not in ("none",) + SELECTION_METHODS:
+            raise HTTPException(status_code=400, detail="selection must be one of: none, " + ", ".join(SELECTION_METHODS))
+        criterion = (selection_criterion or "auto").lower()
+        if criterion not in SELECTION_CRITERIA:
+            raise HTTPException(status_code=400, detail="selection_criterion must be one of: " + ", ".join(SELECTION_CRITERIA))
+        if max_terms is not None and max_terms < 1:
+            raise HTTPException(status_code=400, detail="max_terms must be at least 1")
+        select = None
+        if selector != "none":
+            if method:
+                raise HTTPException(status_code=400, detail="selection cannot be combined with regularization")
+            select = {
+                "method": selector,
+                "criterion": criterion,
+                "max_terms": min(max_terms or SELECTION_MAX_TERMS, SELECTION_MAX_TERMS),
             }
+        strategy = (preview_sample or "uniform").lower()
+        if strategy not in SAMPLE_STRATEGIES:
+            raise HTTPException(status_code=400, detail="preview_sample must be one of: " + ", ".join(SAMPLE_STRATEGIES))
+        if preview_rows is not None and preview_rows < 10:
+            raise HTTPException(status_code=400, detail="preview_rows must be at least 10")
+        intervals = _confidence_options(confidence, confidence_level, bootstrap_samples)
+        if intervals and method:
+            raise HTTPException(status_code=400, detail="confidence intervals are only available for least-squares fits, not with regularization")
+        series = _plot_data_options(plot_data, plot_points, downsample)
 
-            return {
-                "success": True,
-                "functions": functions,
-                "accuracies": [round(a * 100, 2) for a in accuracies],
-                "visualization": first_img_base64,
-                "target_visualizations": target_visualizations,
-                "data_points": int(X.shape[0]),
-                "x_columns": kept_x,
-                "y_columns": y_cols,
-                "sanitization": {"ignored_x_columns": ignored_x, "dropped_rows": int(dropped_rows)},
-                "model": {
-                    "coefficients": coef.tolist(),
-                    "intercepts": intercepts,
-                    "is_polynomial": use_poly,
-                    "degree": int(poly_degree) if use_poly else 1,
-                    "feature_names": feature_names,
-                    "target_names": y_cols,
-                    "multi_output": len(y_cols) > 1,
-                    "model_id": model_id,
-                }
-            }
+        # Large files are fitted out of core unless their columns are already parsed,
+        # and so are expansions too wide to build in memory; the mode is final
+        # here, as it is part of the cache key and reported as fit_mode
+        streaming = mode == "streaming" or (
+            mode == "auto"
+            and entry["size"] >= STREAMING_FIT_MIN_BYTES
+            and not datasets_store.has_columns(entry, x_cols + y_cols)
+        )
+        if not streaming:
+            streaming = not await run_compute(_design_fits_memory, entry, x_cols, y_cols, deg_val)
+        key = _result_key(
+            entry, x_cols, y_cols, deg_val, "streaming" if streaming else "memory", folds, method, alpha,
+            tuple(sorted(select.items())) if select else None,
+            tuple(sorted(intervals.items())) if intervals else None,
+        )
+        cached = results_cache.get(key)
+        if cached is not None:
+            return {**(await _with_plot_data(cached, series)), "cached": True}
+
+        fit_fn = _fit_streaming if streaming else _fit_memory
+        fit_args = (entry, x_cols, y_cols, deg_val, folds, method, alpha, select, intervals)
+        if preview:
+            # An identical preview whose full fit is still running is shared, not fitted again
+            running = _running_preview(key)
+            if running is not None:
+                return {**(await _with_plot_data(running, series)), "cached": True}
+            # A first look from a sample now; the full fit replaces it in the background
+            previewed = await run_compute(
+                _fit_preview, entry, x_cols, y_cols, deg_val, preview_rows or PREVIEW_SAMPLE_ROWS, strategy,
+                folds, method, alpha, select, intervals,
+            )
+            if previewed is not None:
+                running = _running_preview(key)
+                if running is not None:
+                    # Another request started the same refinement while this sample was fitted
+                    models_store.pop(previewed["model"]["model_id"])
+                    return {**(await _with_plot_data(running, series)), "cached": True}
+                _start_refinement(_link_plots(previewed), key, fit_fn, fit_args)
+                return {**(await _with_plot_data(previewed, series)), "cached": False}
+
+        response = _link_plots(await run_compute(fit_fn, *fit_args))
+        _cache_result(key, response)
+        return {**(await _with_plot_data(response, series)), "cached": False}
 
     except HTTPException:
         raise
@@ -313,6 +876,149 @@ async def analyze_data(
         raise HTTPException(status_code=500, detail=f"Error analyzing data: {str(e)}")
 
 
+def _load_sanitized(entry, columns):
+    return sanitize_numeric(datasets_store.load_columns(entry, columns))
+
+
+def _parse_specs(specs: str, entry):
+    invalid = "specs must be a non-empty JSON array of {x_columns, y_columns, degree} objects"
+    try:
+        raw = json.loads(specs)
+    except Exception:
+        raise HTTPException(status_code=400, detail=invalid)
+    if not isinstance(raw, list) or not raw:
+        raise HTTPException(status_code=400, detail=invalid)
+    if len(raw) > BATCH_MAX_SPECS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_SPECS} specs are allowed per batch")
+
+    parsed = []
+    for i, spec in enumerate(raw):
+        if not isinstance(spec, dict):
+            raise HTTPException(status_code=400, detail=invalid)
+        x_cols, y_cols = spec.get("x_columns"), spec.get("y_columns")
+        x_cols = [x_cols] if isinstance(x_cols, str) else x_cols
+        y_cols = [y_cols] if isinstance(y_cols, str) else y_cols
+        if not isinstance(x_cols, list) or not isinstance(y_cols, list) or not x_cols or not y_cols:
+            raise HTTPException(status_code=400, detail=f"Spec {i} needs at least one X column and one Y column")
+        for col in x_cols + y_cols:
+            if col not in entry["columns"]:
+                raise HTTPException(status_code=400, detail=f"Column '{col}' not found in data")
+        try:
+            degree = int(spec.get("degree", 1))
+        except Exception:
+            raise HTTPException(status_code=400, detail=f"Spec {i} has an invalid degree")
+        degree = min(max(degree, 1), POLY_MAX_DEGREE)
+        _check_expansion(len(x_cols), degree)
+        parsed.append({"x_columns": x_cols, "y_columns": y_cols, "degree": degree})
+    return parsed
+
+
+def _batch_row(rank: int, result, cv_folds: int = 0):
+    row = {
+        "rank": rank,
+        "spec": result["spec"],
+        "x_columns": result["x_columns"],
+        "y_columns": result["y_columns"],
+        "degree": result["degree"],
+    }
+    if "error" in result:
+        row["error"] = result["error"]
+        return row
+
+    y_cols, feature_names, poly = result["y_columns"], result["feature_names"], result["poly"]
+    coef, intercepts = result["coef"], result["intercept"].tolist()
+    model_id = str(uuid.uuid4())
+    stored = {
+        "linear": result["linear"],
+        "poly": poly,
+        "feature_names": feature_names,
+        "base_feature_names": result["x_columns"],
+        "use_poly": poly is not None,
+        "targets": y_cols,
+        "train_stats": result["train_stats"],
+        "test_stats": result["test_stats"],
+        "accuracies": [float(a) for a in result["accuracies"]],
+        "updates": 1,
+    }
+    if "plot_X" in result:
+        stored["plot"] = {"X": result["plot_X"], "Y": result["plot_Y"]}
+    models_store.put(model_id, stored, nbytes=model_nbytes(stored))
+    row.update({
+        "functions": format_functions(y_cols, feature_names, coef, intercepts),
+        "accuracies": [round(a * 100, 2) for a in result["accuracies"]],
+        "accuracy_source": "holdout" if result["holdout"] else "in_sample",
+        "data_points": result["rows"],
+        "sanitization": {"ignored_x_columns": result["ignored_x_columns"], "dropped_rows": int(result["dropped_rows"])},
+        "model": {
+            "coefficients": coef.tolist(),
+            "intercepts": intercepts,
+            "is_polynomial": poly is not None,
+            "degree": result["degree"] if poly is not None else 1,
+            "pruned_terms": poly.pruned_terms if poly is not None else 0,
+            "feature_names": feature_names,
+            "target_names": y_cols,
+            "multi_output": len(y_cols) > 1,
+            "model_id": model_id,
+        },
+    })
+    if "cv" in result:
+        row["cv"] = _cv_summary(cv_folds, *result["cv"])
+    if "plot_X" in result:
+        _link_plots(row)
+    return row
+
+
+@router.post("/analyze-batch")
+async def analyze_batch(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    specs: str = Form(...),
+    render_plots: Optional[bool] = Form(False),
+    cv_folds: Optional[int] = Form(0),
+):
+    """Fit many specs against one dataset and return them ranked by accuracy.
+
+    ``specs`` is a JSON array of ``{"x_columns": [...], "y_columns": [...], "degree": n}``.
+    The union of their columns is parsed and sanitized once; specs with the same
+    features and degree share the polynomial expansion and X^T X, and families
+    are fitted in parallel on the compute pool. Accuracies are held-out R^2;
+    with ``cv_folds`` the ranking uses mean k-fold R^2 instead. Models keep a
+    row sample for ``GET /models/{model_id}/plot``, and rows link to it, only
+    when ``render_plots`` is set.
+    """
+    try:
+        entry = await resolve_dataset(file, dataset_id)
+        parsed = _parse_specs(specs, entry)
+        folds = _check_cv_folds(cv_folds)
+        columns = list(dict.fromkeys(c for spec in parsed for c in spec["x_columns"] + spec["y_columns"]))
+        work, valid_counts = await run_compute(_load_sanitized, entry, columns)
+
+        items, families = plan_batch(parsed, valid_counts)
+        plot_rows = STREAMING_PLOT_ROWS if render_plots else 0
+        n_jobs = min(COMPUTE_WORKERS, len(families))
+        fitted = await asyncio.gather(*(
+            run_compute(fit_families, work, families[i::n_jobs], plot_rows, folds) for i in range(n_jobs)
+        ))
+        results = {item["spec"]: item for item in items}
+        for part in fitted:
+            results.update((result["spec"], result) for result in part)
+
+        ranked = sorted(results.values(), key=rank_key)
+        rows = [_batch_row(rank, result, folds) for rank, result in enumerate(ranked, start=1)]
+
+        return {
+            "success": True,
+            "dataset_id": entry["dataset_id"],
+            "specs": len(parsed),
+            "results": rows,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing batch: {str(e)}")
+
+
 @router.post("/analyze-manual")
 async def analyze_manual(data: ManualDataInput):
     try:
@@ -323,84 +1029,59 @@ async def analyze_manual(data: ManualDataInput):
             y_data.append(point.y)
         if len(x_data) < 2:
             raise HTTPException(status_code=400, detail="At least 2 data points required")
+        intervals = _confidence_options(data.confidence, data.confidence_level, data.bootstrap_samples)
+        series = _plot_data_options(data.plot_data, data.plot_points, data.downsample)
+        image_format = (data.image_format or "png").lower()
+        if image_format not in PLOT_FORMATS:
+            raise HTTPException(status_code=400, detail="image_format must be one of: " + ", ".join(PLOT_FORMATS))
+        dpi = 150 if data.dpi is None else data.dpi
+        if not 50 <= dpi <= 300:
+            raise HTTPException(status_code=400, detail="dpi must be between 50 and 300")
 
-        details = req_details(x_data, y_data)
+        details = await run_compute(req_details, x_data, y_data, 0, intervals)
         if 'error' in details:
             raise HTTPException(status_code=400, detail=details['error'])
 
-        fig, ax = plt.subplots(1, 1, figsize=(10, 6), facecolor='#0a0a0a')
-        if isinstance(x_data[0], list):
-            x_plot = [x[0] for x in x_data]
-            ax.scatter(x_plot, y_data, alpha=0.8, color='#3b82f6', s=50, label='Data')
-            sorted_pairs = sorted(zip(x_plot, y_data), key=lambda p: p[0])
-            if len(sorted_pairs) >= 2:
-                ax.plot([p[0] for p in sorted_pairs], [p[1] for p in sorted_pairs], color='#60a5fa', alpha=0.6, linewidth=1)
-            coeffs = details['coefficients']
-            intercept = details['intercept']
-            xs = np.linspace(min(x_plot), max(x_plot), 200)
-            if details['is_polynomial']:
-                ys = np.full_like(xs, intercept, dtype=float)
-                for i, c in enumerate(coeffs):
-                    ys = ys + c * (xs ** (i + 1))
-            else:
-                if len(coeffs) > 0:
-                    ys = intercept + coeffs[0] * xs
-                else:
-                    ys = np.full_like(xs, intercept, dtype=float)
-            ax.plot(xs, ys, color='#f59e0b', linewidth=2, label='Model')
-            ax.set_xlabel('X (First Dimension)', color='white')
+        # With plot_data the client draws the chart from series instead of a PNG
+        if series:
+            plot_series = await run_compute(manual_series, x_data, y_data, details, *series)
+            img_base64 = None
         else:
-            ax.scatter(x_data, y_data, alpha=0.8, color='#3b82f6', s=50, label='Data')
-            sorted_pairs = sorted(zip(x_data, y_data), key=lambda p: p[0])
-            if len(sorted_pairs) >= 2:
-                ax.plot([p[0] for p in sorted_pairs], [p[1] for p in sorted_pairs], color='#60a5fa', alpha=0.6, linewidth=1)
-            coeffs = details['coefficients']
-            intercept = details['intercept']
-            xs = np.linspace(min(x_data), max(x_data), 200)
-            if details['is_polynomial']:
-                ys = np.full_like(xs, intercept, dtype=float)
-                for i, c in enumerate(coeffs):
-                    ys = ys + c * (xs ** (i + 1))
-            else:
-                if len(coeffs) > 0:
-                    ys = intercept + coeffs[0] * xs
-                else:
-                    ys = np.full_like(xs, intercept, dtype=float)
-            ax.plot(xs, ys, color='#f59e0b', linewidth=2, label='Model')
-            ax.set_xlabel('X', color='white')
-
-        ax.set_ylabel('Y', color='white')
-        ax.set_title('Manual Data Analysis & Model Fit', color='white')
-        ax.set_facecolor('#1a1a1a')
-        ax.tick_params(colors='white')
-        ax.grid(True, alpha=0.3)
-
-        for spine in ax.spines.values():
-            spine.set_color('white')
-
-        plt.tight_layout()
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', facecolor='#0a0a0a', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.read()).decode()
-        plt.close()
+            img_base64 = await run_render(manual_plot, x_data, y_data, details, image_format, dpi)
 
         equation = details['function'].replace('f(x): ', '')
         accuracy = f"{round(details['accuracy'] * 100, 2)}%"
 
-        return {
+        response = {
             "success": True,
             "function": equation,
             "accuracy": accuracy,
             "visualization": img_base64,
+            "visualization_format": image_format if img_base64 else None,
             "data_points": len(x_data),
             "model": {
                 "coefficients": details['coefficients'],
                 "intercept": details['intercept'],
                 "is_polynomial": details['is_polynomial'],
                 "degree": details['degree'],
+                "family": details.get('family'),
                 "feature_names": details['feature_names'],
-            }
+            },
+            **({"families": _family_ranking(details)} if "families" in details else {}),
         }
+        if "intervals" in details:
+            block = _intervals_block(details["intervals"])
+            block["coefficients"] = block["coefficients"][0]
+            block["intercept"] = block.pop("intercepts")[0]
+            block["standard_errors"] = {
+                "coefficients": block["standard_errors"]["coefficients"][0],
+                "intercept": block["standard_errors"]["intercepts"][0],
+            }
+            response["intervals"] = block
+        if series:
+            response["plot_data"] = plot_series
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing manual data: {str(e)}")
@@ -1,49 +1,49 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import pandas as pd
-import numpy as np
-import json
-import io
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from typing import Optional
+
+from ...core.settings import PROFILE_HEAD_ROWS, PROFILE_SAMPLE_ROWS
+from ...core.state import datasets_store
+from ...services.data.columnar import is_columnar
+from ...services.data.loaders import is_csv, is_supported, read_dataframe
+from ...services.data.profile import profile_columnar_sampled, profile_csv, profile_csv_sampled, profile_frame
+from ..datasets import register_upload
+from ..execution import run_compute
 
 router = APIRouter()
 
 
-@router.post("/upload-file")
-async def upload_file(file: UploadFile = File(...)):
-    try:
-        contents = await file.read()
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.StringIO(contents.decode('utf-8')), low_memory=False)
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(io.BytesIO(contents))
-        elif file.filename.endswith('.json'):
-            data = json.loads(contents.decode('utf-8'))
-            df = pd.DataFrame(data)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format. Please upload CSV, XLSX, or JSON files.")
+def _profile(entry, sampled: bool):
+    with datasets_store.reading(entry):
+        if is_csv(entry["format_name"]):
+            return profile_csv_sampled(entry) if sampled else profile_csv(entry["path"], entry["compression"])
+        if sampled and is_columnar(entry["format_name"]):
+            return profile_columnar_sampled(entry)
+        # Parsed for the profile only; analyses load the columns they need into the registry
+        frame = read_dataframe(entry["path"], entry["format_name"], compression=entry["compression"])
+    return profile_frame(frame, sample_rows=PROFILE_HEAD_ROWS + PROFILE_SAMPLE_ROWS if sampled else None)
 
-        df = df.dropna(how='all').dropna(axis=1, how='all')
-        coerced = df.apply(pd.to_numeric, errors='coerce') if not df.empty else df
-        numeric_columns = []
-        if not df.empty:
-            for col in df.columns:
-                series = coerced[col] if col in coerced.columns else pd.Series(dtype=float)
-                if getattr(series, 'notna', lambda: pd.Series(dtype=bool))().any():
-                    try:
-                        if pd.api.types.is_numeric_dtype(series.dropna()):
-                            numeric_columns.append(col)
-                    except Exception:
-                        pass
 
-        preview_df = df.replace([np.inf, -np.inf], np.nan)
-        head_records = json.loads(preview_df.head(50).to_json(orient='records')) if not preview_df.empty else []
+@router.post("/upload-file")
+async def upload_file(
+    file: UploadFile = File(...),
+    profile: Optional[str] = Form("sampled"),
+):
+    """Register an upload and return its preview.
 
+    ``profile="sampled"`` (default) infers column types from a bounded sample and
+    reports it under ``profile``; ``profile="full"`` scans every row.
+    """
+    try:
+        if not is_supported(file.filename):
+            raise HTTPException(status_code=400, detail="Unsupported file format. Please upload CSV, XLSX, JSON, Parquet, Feather/Arrow, NPY or NPZ files, optionally compressed (gzip, bz2, xz, zstd, zip).")
+        if profile not in ("sampled", "full"):
+            raise HTTPException(status_code=400, detail="profile must be 'sampled' or 'full'")
+        entry = await register_upload(file)
+        summary = await run_compute(_profile, entry, profile == "sampled")
         info = {
+            "dataset_id": entry["dataset_id"],
             "filename": file.filename,
-            "shape": (int(df.shape[0]), int(df.shape[1])) if hasattr(df, 'shape') else (0, 0),
-            "columns": [str(c) for c in df.columns.tolist()] if not df.empty else [],
-            "dtypes": {str(k): str(v) for k, v in (df.dtypes.astype(str).to_dict() if not df.empty else {}).items()},
-            "head": head_records,
-            "numeric_columns": numeric_columns,
+            **summary,
         }
         return {"success": True, "data": info}
     except HTTPException:
@@ -52,12 +52,14 @@ async def upload_file(file: UploadFile = File(...)):
         return {
             "success": False,
             "data": {
+                "dataset_id": None,
                 "filename": getattr(file, 'filename', 'unknown'),
                 "shape": (0, 0),
                 "columns": [],
                 "dtypes": {},
                 "head": [],
-                "numeric_columns": []
+                "numeric_columns": [],
+                "profile": None,
             },
             "warning": f"File loaded with issues and was sanitized. Details: {str(e)}"
         }
@@ -0,0 +1,376 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+import numpy as np
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from ...core.settings import PLOT_BATCH_MAX_PLOTS, RENDER_WORKERS
+from ...core.state import models_store, datasets_store, fit_jobs, plot_cache, results_cache
+from ...schemas.analysis import PlotBatchRequest
+from ...services.ml.chunked import (
+    FitInputError, linear_model, refit_single_feature, solve_split, update_chunks, update_single_feature,
+)
+from ...services.ml.families import LOG_TARGET, CurveModel
+from ...services.ml.regularized import solve_regularized
+from ...services.plotting.analysis_plots import PLOT_FORMATS, PLOT_KINDS, model_plot
+from ...services.plotting.series import plot_inputs, series_options, target_series
+from ...utils.features import format_functions
+from ..datasets import resolve_dataset
+from ..execution import run_compute, run_render
+
+router = APIRouter()
+
+# Serialises the read-modify-write of a model's statistics across concurrent updates
+_update_lock = threading.Lock()
+
+# ``density`` query values of the plot endpoint -> model_plot's density argument
+_DENSITY_MODES = {"auto": None, "on": True, "off": False}
+
+
+@router.get("/models/{model_id}/fit-status")
+async def fit_status(model_id: str):
+    """Progress of the background full fit that refines a preview model.
+
+    ``status`` is ``queued`` or ``running`` while the stored model still holds
+    the preview coefficients, then ``done`` with the full /analyze-data response
+    under ``result`` (while it is still cached) or ``failed`` with ``error``.
+    ``stale`` marks a full fit that never got a compute worker, leaving the
+    model on its preview coefficients.
+    Models that were never previews report ``done`` without a result.
+    """
+    job = fit_jobs.get(model_id)
+    if job is None:
+        if model_id not in models_store:
+            raise HTTPException(status_code=404, detail="Model not found or expired")
+        return {"success": True, "model_id": model_id, "status": "done", "preview": False}
+    status = {
+        "success": True,
+        "model_id": model_id,
+        "status": job["status"],
+        "preview": job["status"] != "done",
+        "elapsed_seconds": round(job.get("finished", time.time()) - job["started"], 3),
+    }
+    if job["status"] == "done":
+        result = results_cache.get(job["result_key"])
+        if result is not None:
+            status["result"] = {**result, "cached": True}
+    if "error" in job:
+        status["error"] = job["error"]
+    if job.get("stale"):
+        status["stale"] = True
+    return status
+
+
+def _update_single_feature(stored, chunks, base_features, targets, batch: int):
+    """``_update_model`` for a single-feature model: its chosen degree or family is
+    kept and re-solved from the merged sums of ``stored["single_stats"]``."""
+    single = stored["single_stats"]
+    added = update_single_feature(chunks, base_features, targets, single, batch)
+    if added["rows"] == 0:
+        return {**added, "solution": None}
+    with _update_lock:
+        train = single["train"] + added["train_stats"]
+        test = single["test"] + added["test_stats"]
+        details, holdout = refit_single_feature(single, train, test)
+        coef = np.array([details["coefficients"]])
+        if details["is_polynomial"]:
+            lr = linear_model(coef, np.array([details["intercept"]]))
+        else:
+            lr = CurveModel(details["family"], details["coefficients"][0], details["intercept"])
+        accuracies = [float(details["accuracy"])]
+        single.update({"train": train, "test": test})
+        stored.update({"linear": lr, "accuracies": accuracies})
+        results_cache.pop(stored.pop("result_key", None))
+    return {
+        **added,
+        "solution": (lr, coef, accuracies, holdout, train.n + test.n),
+        "functions": [details["function"].replace("f(x): ", "")],
+        "model": {
+            "is_polynomial": details["is_polynomial"],
+            "degree": details["degree"],
+            "family": details["family"],
+            "feature_names": stored["base_feature_names"],
+        },
+    }
+
+
+def _update_model(stored, chunks, base_features, targets, batch: int):
+    """Fold new rows into a stored model and re-solve it, on the compute pool.
+
+    The merge and solve hold ``_update_lock`` so concurrent updates of a model
+    do not lose each other's rows; ``solution`` is None when no row was valid.
+    """
+    if "single_stats" in stored:
+        return _update_single_feature(stored, chunks, base_features, targets, batch)
+    added = update_chunks(chunks, base_features, targets, stored["poly"], stored["train_stats"], batch)
+    if added["rows"] == 0:
+        return {**added, "solution": None}
+    with _update_lock:
+        train = stored["train_stats"] + added["train_stats"]
+        test = stored["test_stats"] + added["test_stats"]
+        regularization = stored.get("regularization")
+        if regularization:
+            # A chosen (not fixed) alpha is re-chosen on the grown statistics
+            coef, intercept, accuracies, holdout, _ = solve_regularized(train, test, regularization["method"], regularization["alpha"])
+        else:
+            coef, intercept, accuracies, holdout = solve_split(train, test)
+        lr = linear_model(coef, intercept)
+        stored.update({"linear": lr, "train_stats": train, "test_stats": test, "accuracies": [float(a) for a in accuracies]})
+        # The cached /analyze-data response now describes outdated coefficients
+        results_cache.pop(stored.pop("result_key", None))
+    return {
+        **added,
+        "solution": (lr, coef, accuracies, holdout, train.n + test.n),
+        "functions": format_functions(targets, stored["feature_names"], coef, lr.intercept_.tolist()),
+        "model": {},
+    }
+
+
+@router.post("/models/{model_id}/partial-fit")
+async def partial_fit(
+    model_id: str,
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+):
+    """Add new rows to a stored model and re-solve its coefficients.
+
+    The upload only needs the new rows, with the model's base feature and target
+    columns. They are folded into the stored X^T X / X^T Y statistics (the power
+    or transformed-column sums of a single-feature model, whose degree or family
+    stays fixed), so the cost depends on the new rows alone; rows with missing
+    values are skipped.
+    """
+    try:
+        stored = models_store.get(model_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Model not found or expired")
+        if getattr(stored["linear"], "family", None) in LOG_TARGET:
+            raise HTTPException(
+                status_code=409,
+                detail="Exp and power models cannot be updated incrementally: their accuracy is measured "
+                       "in the units of y, which needs every row again rather than sums of the new ones",
+            )
+        if "train_stats" not in stored and "single_stats" not in stored:
+            raise HTTPException(status_code=409, detail="This model does not support incremental updates")
+        entry = await resolve_dataset(file, dataset_id)
+        base_features, targets = stored["base_feature_names"], stored["targets"]
+        for col in base_features + targets:
+            if col not in entry["columns"]:
+                raise HTTPException(status_code=400, detail=f"Column '{col}' not found in data")
+
+        with _update_lock:
+            batch = stored["updates"]
+            stored["updates"] = batch + 1
+        try:
+            added = await run_compute(
+                _update_model, stored,
+                datasets_store.iter_columns(entry, base_features + targets),
+                base_features, targets, batch,
+            )
+        except FitInputError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if added["solution"] is None:
+            raise HTTPException(status_code=400, detail="No valid rows to add after sanitization.")
+        lr, coef, accuracies, holdout, data_points = added["solution"]
+
+        intercepts = lr.intercept_.tolist()
+        return {
+            "success": True,
+            "model_id": model_id,
+            "functions": added["functions"],
+            "accuracies": [round(a * 100, 2) for a in accuracies],
+            "accuracy_source": "holdout" if holdout else "in_sample",
+            "rows_added": int(added["rows"]),
+            "skipped_rows": int(added["skipped_rows"]),
+            "data_points": int(data_points),
+            "dataset_id": entry["dataset_id"],
+            "model": {
+                "coefficients": coef.tolist(),
+                "intercepts": intercepts,
+                "is_polynomial": stored["use_poly"],
+                "feature_names": stored["feature_names"],
+                "target_names": targets,
+                "multi_output": len(targets) > 1,
+                **added["model"],
+                "model_id": model_id,
+            }
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating model: {str(e)}")
+
+
+def _plot_etag(model_id: str, stored, *params) -> str:
+    """Hash of the model's current coefficients, plot sample and the plot parameters."""
+    lr = stored["linear"]
+    key = ":".join(str(p) for p in (model_id, stored["updates"], len(stored["plot"]["Y"])) + params)
+    digest = hashlib.sha1(key.encode())
+    digest.update(np.ascontiguousarray(lr.coef_, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(lr.intercept_, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _plot_request(model_id: str, kind: str, target: Optional[str], dpi: int, fmt: str, density: str):
+    """Validated plot parameters of a stored model: ``(stored, kind, target, fmt, density)``."""
+    stored = models_store.get(model_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Model not found or expired")
+    if "plot" not in stored:
+        raise HTTPException(status_code=409, detail="This model keeps no data to plot")
+    kind, fmt, density = kind.lower(), fmt.lower(), density.lower()
+    if kind not in PLOT_KINDS:
+        raise HTTPException(status_code=400, detail="kind must be one of: " + ", ".join(PLOT_KINDS))
+    if fmt not in PLOT_FORMATS and fmt != "json":
+        raise HTTPException(status_code=400, detail="format must be one of: " + ", ".join(list(PLOT_FORMATS) + ["json"]))
+    if density not in _DENSITY_MODES:
+        raise HTTPException(status_code=400, detail="density must be one of: " + ", ".join(_DENSITY_MODES))
+    if not 50 <= dpi <= 300:
+        raise HTTPException(status_code=400, detail="dpi must be between 50 and 300")
+    targets = stored["targets"]
+    target = targets[0] if target is None else target
+    if target not in targets:
+        raise HTTPException(status_code=404, detail=f"Target '{target}' not found in model")
+    if kind == "fit" and stored["plot"]["X"].shape[1] != 1:
+        raise HTTPException(status_code=400, detail="The fit plot needs a model of one feature")
+    return stored, kind, target, fmt, density
+
+
+async def _cached_plot(etag: str, stored, target: str, render):
+    """The content cached under ``etag``, else ``await render(data)`` on the target's plot inputs, cached."""
+    content = plot_cache.get(etag)
+    if content is None:
+        # Only the parts the plot needs travel to the (possibly process) pool
+        parts = {k: stored[k] for k in ("plot", "linear", "poly", "targets", "feature_names", "base_feature_names", "accuracies")}
+        data = await run_compute(plot_inputs, parts, stored["targets"].index(target))
+        content = await render(data)
+        plot_cache.put(etag, content, nbytes=len(content))
+    return content
+
+
+async def _plot_image(model_id: str, stored, kind: str, target: str, dpi: int, fmt: str, density: str):
+    """``(etag, content)`` of an image plot; the content is a view of the encoded buffer, not a copy."""
+    etag = f'"{_plot_etag(model_id, stored, kind, target, dpi, fmt, density)}"'
+
+    async def render(data):
+        buffer = await run_render(model_plot, kind, data, dpi, fmt, _DENSITY_MODES[density])
+        return buffer.getbuffer()
+
+    return etag, await _cached_plot(etag, stored, target, render)
+
+
+@router.get("/models/{model_id}/plot")
+async def model_plot_image(
+    model_id: str,
+    kind: str = "overview",
+    target: Optional[str] = None,
+    dpi: int = 150,
+    format: str = "png",
+    points: Optional[int] = None,
+    downsample: Optional[str] = "lttb",
+    density: str = "auto",
+    if_none_match: Optional[str] = Header(None),
+):
+    """Render one chart of a stored model on demand, as a binary image.
+
+    ``kind`` is one of ``PLOT_KINDS`` (``fit`` needs a model of one feature),
+    ``target`` a target column (the first by default) and ``format`` png,
+    webp, svg or json. json returns the downsampled series of every panel of
+    the target (see ``series``), at most about ``points`` per series, instead
+    of an image. Scatter panels of many points are drawn as a binned density;
+    ``density`` (auto, on or off) overrides the point threshold. Charts are
+    drawn from the row sample kept with the model and the current
+    coefficients, so they follow partial fits and preview refinement. Images
+    are cached by their ETag, which changes with the coefficients;
+    ``If-None-Match`` with the current ETag is answered with 304.
+    """
+    try:
+        stored, kind, target, fmt, density = _plot_request(model_id, kind, target, dpi, format, density)
+        try:
+            points, method = series_options(points, downsample)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if fmt == "json":
+            etag = f'"{_plot_etag(model_id, stored, target, fmt, points, method)}"'
+        else:
+            etag = f'"{_plot_etag(model_id, stored, kind, target, dpi, fmt, density)}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match and etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        if fmt == "json":
+            async def render(data):
+                return json.dumps(await run_compute(target_series, data, points, method)).encode()
+            content = await _cached_plot(etag, stored, target, render)
+        else:
+            _, content = await _plot_image(model_id, stored, kind, target, dpi, fmt, density)
+        return Response(content=content, media_type=PLOT_FORMATS.get(fmt, "application/json"), headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering plot: {str(e)}")
+
+
+@router.post("/models/plots")
+async def model_plot_images(request: PlotBatchRequest):
+    """Several model plots in one ``multipart/mixed`` response, for dashboards.
+
+    Each of ``plots`` names a ``model_id`` and optionally its ``target`` and
+    ``kind``; ``format`` (png, webp or svg), ``dpi`` and ``density`` apply to
+    all. Every part carries the image with its ``Content-Type``, ``ETag`` and
+    a ``Content-Location`` pointing at the single-plot URL; a plot that
+    cannot be drawn becomes a JSON part with its ``Status`` and ``detail``.
+    Images come from the same cache as ``GET /models/{model_id}/plot`` and the
+    parts are streamed from the encoded buffers without copying them.
+    """
+    try:
+        if not request.plots:
+            raise HTTPException(status_code=400, detail="plots must name at least one model")
+        if len(request.plots) > PLOT_BATCH_MAX_PLOTS:
+            raise HTTPException(status_code=400, detail=f"At most {PLOT_BATCH_MAX_PLOTS} plots are allowed per request")
+        fmt = (request.format or "webp").lower()
+        if fmt not in PLOT_FORMATS:
+            raise HTTPException(status_code=400, detail="format must be one of: " + ", ".join(PLOT_FORMATS))
+        dpi = int(request.dpi or 100)
+        if not 50 <= dpi <= 300:
+            raise HTTPException(status_code=400, detail="dpi must be between 50 and 300")
+        if (request.density or "auto").lower() not in _DENSITY_MODES:
+            raise HTTPException(status_code=400, detail="density must be one of: " + ", ".join(_DENSITY_MODES))
+        # Renders go to the pool a few at a time so a large batch does not saturate it
+        admitted = asyncio.Semaphore(RENDER_WORKERS)
+
+        async def part(spec):
+            query = {"kind": spec.kind or "overview", "dpi": dpi, "format": fmt, "density": request.density or "auto"}
+            if spec.target is not None:
+                query["target"] = spec.target
+            headers = {"Content-Location": f"/models/{spec.model_id}/plot?{urlencode(query)}"}
+            try:
+                stored, kind, target, _, density = _plot_request(spec.model_id, query["kind"], spec.target, dpi, fmt, query["density"])
+                async with admitted:
+                    etag, content = await _plot_image(spec.model_id, stored, kind, target, dpi, fmt, density)
+                return {**headers, "Content-Type": PLOT_FORMATS[fmt], "ETag": etag}, content
+            except HTTPException as e:
+                return {**headers, "Content-Type": "application/json", "Status": str(e.status_code)}, json.dumps({"detail": e.detail}).encode()
+
+        parts = await asyncio.gather(*(part(spec) for spec in request.plots))
+        boundary = uuid.uuid4().hex
+
+        def body():
+            for headers, content in parts:
+                yield f"--{boundary}\r\n".encode()
+                yield "".join(f"{k}: {v}\r\n" for k, v in headers.items()).encode() + f"Content-Length: {len(content)}\r\n\r\n".encode()
+                yield content
+                yield b"\r\n"
+            yield f"--{boundary}--\r\n".encode()
+
+        return StreamingResponse(body(), media_type=f"multipart/mixed; boundary={boundary}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering plots: {str(e)}")
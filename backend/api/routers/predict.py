@@ -1,19 +1,43 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from typing import List, Optional
 import numpy as np
 
 from ...schemas.analysis import PredictionRequest
-from ...core.state import models_store
+from ...core.state import models_store, datasets_store
+from ...services.data.sanitize import sanitize_numeric
+from ...services.ml.families import FAMILIES, curve
 from ...utils.features import expand_with_feature_names
+from ..datasets import resolve_dataset
+from ..execution import run_compute
 
 router = APIRouter()
 
 
+def _predict_rows(stored, entry):
+    base_features = stored["base_feature_names"]
+    frame = datasets_store.load_columns(entry, base_features)
+    X_all = sanitize_numeric(frame)[0].to_numpy()
+    valid = ~np.isnan(X_all).any(axis=1)
+    X_arr = X_all[valid]
+    if stored["poly"] is not None:
+        X_arr = stored["poly"].transform(X_arr)
+    n_targets = len(stored["targets"])
+    y_full = np.full((len(X_all), n_targets), np.nan)
+    if len(X_arr):
+        y_full[valid] = stored["linear"].predict(X_arr).reshape(len(X_arr), n_targets)
+    if n_targets == 1:
+        y_full = y_full[:, 0]
+    predictions: List = y_full.tolist()
+    for row_idx in np.flatnonzero(~valid):
+        predictions[row_idx] = None
+    return predictions, valid
+
+
 @router.post("/predict")
 async def predict(request: PredictionRequest):
     try:
-        if request.model_id and request.model_id in models_store:
-            stored = models_store[request.model_id]
+        stored = models_store.get(request.model_id) if request.model_id else None
+        if stored is not None:
             lr = stored["linear"]
             poly = stored["poly"]
             base_features = stored["base_feature_names"]
@@ -41,6 +65,9 @@ async def predict(request: PredictionRequest):
             else:
                 y_pred = y_pred.tolist()
             return {"success": True, "predictions": y_pred, "input_values": request.x_values}
+        if request.model_id and request.coefficients is None:
+            # Without inline coefficients there is nothing to fall back on
+            raise HTTPException(status_code=404, detail="Model not found or expired")
 
         predictions = []
         if request.multi_output:
@@ -74,7 +101,13 @@ async def predict(request: PredictionRequest):
                         if i < len(x_arr):
                             pred += float(c) * float(x_arr[i])
                 else:
-                    if request.is_polynomial:
+                    if request.family in FAMILIES:
+                        coeffs_1d = request.coefficients
+                        if isinstance(coeffs_1d, list) and coeffs_1d and isinstance(coeffs_1d[0], list):
+                            coeffs_1d = coeffs_1d[0]
+                        intercept = float(request.intercept if not isinstance(request.intercept, list) else request.intercept[0])
+                        pred = float(curve(request.family, float(coeffs_1d[0]), intercept, float(x_val)))
+                    elif request.is_polynomial:
                         pred = float(request.intercept if not isinstance(request.intercept, list) else request.intercept[0])
                         coeffs_1d = request.coefficients
                         if isinstance(coeffs_1d, list) and coeffs_1d and isinstance(coeffs_1d[0], list):
@@ -91,5 +124,43 @@ async def predict(request: PredictionRequest):
                 predictions.append(pred)
 
         return {"success": True, "predictions": predictions, "input_values": request.x_values}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error making predictions: {str(e)}")
+
+
+@router.post("/predict-batch")
+async def predict_batch(
+    model_id: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+):
+    """Predict every row of an uploaded dataset with a stored model.
+
+    The dataset must contain the model's base feature columns; rows with a missing
+    or non-numeric feature get a null prediction.
+    """
+    try:
+        stored = models_store.get(model_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Model not found or expired")
+        entry = await resolve_dataset(file, dataset_id)
+        base_features = stored["base_feature_names"]
+        for col in base_features:
+            if col not in entry["columns"]:
+                raise HTTPException(status_code=400, detail=f"Column '{col}' not found in data")
+
+        predictions, valid = await run_compute(_predict_rows, stored, entry)
+        return {
+            "success": True,
+            "predictions": predictions,
+            "targets": stored["targets"],
+            "rows": int(len(valid)),
+            "skipped_rows": int((~valid).sum()),
+            "dataset_id": entry["dataset_id"],
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error making predictions: {str(e)}")
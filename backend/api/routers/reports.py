@@ -8,6 +8,7 @@ from datetime import datetime
 
 from ...core.state import pdf_jobs
 from ...services.reporting.pdf_reportlab import generate_pdf_report
+from ..execution import run_render
 
 router = APIRouter()
 
@@ -33,11 +34,13 @@ async def generate_pdf(
             "coefficients": json.loads(coefficients),
             "filename": filename,
         }
-        final_file = generate_pdf_report(report_data)
+        final_file = await run_render(generate_pdf_report, report_data)
         media_type, extension = ('application/pdf', 'pdf')
         job_id = str(uuid.uuid4())
         pdf_jobs[job_id] = final_file
         return {"success": True, "job_id": job_id, "filename": f"fluent_analysis.{extension}"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
@@ -1,8 +1,23 @@
 from fastapi import APIRouter
 
+from ...core.state import datasets_store, fit_jobs, models_store, results_cache
+from ...core.workers import compute_pool, render_pool
+
 router = APIRouter()
 
 
 @router.get("/")
 async def root():
     return {"message": "Welcome to Fluent API - Your Data Analysis Companion"}
+
+
+@router.get("/stats")
+async def stats():
+    """Occupancy of the worker pools, the dataset cache, the model store, the preview refinements and the result cache."""
+    return {
+        "workers": {"compute": compute_pool.stats(), "render": render_pool.stats()},
+        "datasets": datasets_store.stats(),
+        "models": models_store.stats(),
+        "fit_jobs": fit_jobs.stats(),
+        "results": results_cache.stats(),
+    }
@@ -0,0 +1,142 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+
+def upload(client, frame, name):
+    response = client.post("/upload-file", files={"file": (name, frame.to_csv(index=False).encode(), "text/csv")})
+    return response.json()["data"]["dataset_id"]
+
+
+def fit(client, dataset_id):
+    response = client.post("/analyze-data", data={
+        "dataset_id": dataset_id,
+        "x_columns": '["irrigation", "sunshine"]',
+        "y_column": "yield",
+    })
+    return response.json()["model"]["model_id"]
+
+
+def multipart(response):
+    """``(headers, body)`` of each part of a ``multipart/mixed`` response, read by ``Content-Length``."""
+    boundary = response.headers["content-type"].split("boundary=")[1].encode()
+    data, parts, pos = response.content, [], 0
+    while data.startswith(b"--" + boundary + b"\r\n", pos):
+        head_end = data.index(b"\r\n\r\n", pos)
+        lines = data[pos:head_end].decode().split("\r\n")[1:]
+        headers = dict(line.split(": ", 1) for line in lines)
+        start = head_end + 4
+        end = start + int(headers["Content-Length"])
+        parts.append((headers, data[start:end]))
+        assert data[end:end + 2] == b"\r\n"
+        pos = end + 2
+    assert data[pos:] == b"--" + boundary + b"--\r\n"
+    return parts
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def orchard():
+    """Fruit yield against irrigation and sunshine, split into a first season and a later batch."""
+    rng = np.random.default_rng(17)
+    frame = pd.DataFrame({"irrigation": rng.uniform(0, 40, 260), "sunshine": rng.uniform(900, 1600, 260)})
+    frame["yield"] = 0.8 * frame.irrigation + 0.01 * frame.sunshine + rng.normal(0, 1.5, 260)
+    return frame.iloc[:200], frame.iloc[200:]
+
+
+@pytest.fixture(scope="module")
+def model_id(client, orchard):
+    return fit(client, upload(client, orchard[0], "season.csv"))
+
+
+def test_plot_revalidates_with_its_etag(client, model_id):
+    first = client.get(f"/models/{model_id}/plot", params={"format": "svg"})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["content-type"].startswith("image/svg")
+
+    cached = client.get(f"/models/{model_id}/plot", params={"format": "svg"}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag and not cached.content
+
+    other = client.get(f"/models/{model_id}/plot", params={"format": "svg"}, headers={"If-None-Match": '"stale", W/' + etag})
+    assert other.status_code == 304
+    assert client.get(f"/models/{model_id}/plot", params={"format": "png"}).headers["etag"] != etag
+
+
+def test_partial_fit_changes_the_plot_etag(client, orchard):
+    season, later = orchard
+    # A model of its own, so the shared one keeps its coefficients for the other tests
+    model = fit(client, upload(client, season, "season.csv"))
+    before = client.get(f"/models/{model}/plot", params={"format": "svg"}).headers["etag"]
+
+    update = client.post(f"/models/{model}/partial-fit", data={"dataset_id": upload(client, later, "later.csv")})
+    assert update.status_code == 200 and update.json()["rows_added"] == len(later)
+
+    after = client.get(f"/models/{model}/plot", params={"format": "svg"}, headers={"If-None-Match": before})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before
+
+
+def test_plot_batch_parts_match_the_single_plot_endpoint(client, model_id):
+    response = client.post("/models/plots", json={
+        "plots": [{"model_id": model_id}, {"model_id": "retired-model"}, {"model_id": model_id, "kind": "importance"}],
+        "format": "png",
+        "dpi": 80,
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("multipart/mixed; boundary=")
+    overview, missing, importance = multipart(response)
+
+    assert overview[0]["Content-Type"] == "image/png" and overview[1].startswith(b"\x89PNG")
+    single = client.get(overview[0]["Content-Location"])
+    assert single.headers["etag"] == overview[0]["ETag"]
+    assert single.content == overview[1]
+
+    assert missing[0]["Content-Type"] == "application/json" and missing[0]["Status"] == "404"
+    assert "not found" in json.loads(missing[1])["detail"]
+
+    assert importance[0]["ETag"] != overview[0]["ETag"]
+    assert client.get(importance[0]["Content-Location"], headers={"If-None-Match": importance[0]["ETag"]}).status_code == 304
+
+
+def test_plot_batch_rejects_bad_parameters_up_front(client, model_id):
+    assert client.post("/models/plots", json={"plots": []}).status_code == 400
+    assert client.post("/models/plots", json={"plots": [{"model_id": model_id}], "format": "json"}).status_code == 400
+
+
+@pytest.mark.parametrize("curve, family, status", [
+    (lambda t: 3.0 * np.log(t) + 2, "log", 200),
+    (lambda t: 0.5 * np.exp(0.25 * t), "exp", 409),
+])
+def test_single_feature_partial_fit_equals_a_refit(client, curve, family, status):
+    hours = np.linspace(1, 12, 300)
+    rng = np.random.default_rng(len(family))
+    frame = pd.DataFrame({"hours": hours, "growth": curve(hours) * (1 + rng.normal(0, 0.01, hours.size))})
+    first, later = frame.iloc[::3], frame.drop(frame.index[::3])
+
+    def single(dataset_id):
+        return client.post("/analyze-data", data={"dataset_id": dataset_id, "x_column": "hours", "y_column": "growth"}).json()
+
+    model = single(upload(client, first, f"{family}-first.csv"))["model"]
+    assert model["family"] == family
+    update = client.post(f"/models/{model['model_id']}/partial-fit", data={"dataset_id": upload(client, later, f"{family}-later.csv")})
+    assert update.status_code == status
+    if status != 200:
+        assert "incrementally" in update.json()["detail"]
+        return
+
+    refit = single(upload(client, pd.concat([first, later]), f"{family}-all.csv"))
+    assert update.json()["model"]["family"] == family
+    np.testing.assert_allclose(update.json()["model"]["coefficients"], refit["model"]["coefficients"], rtol=1e-8)
+    np.testing.assert_allclose(update.json()["model"]["intercepts"], refit["model"]["intercepts"], rtol=1e-8)
@@ -0,0 +1,70 @@
+"""
+Benchmark: full parse + column selection vs. column-projected parsing on wide files.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_column_projection --rows 5000 --cols 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.services.data.loaders import _load_json, read_dataframe
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _write_wide(path: str, fmt: str, rows: int, cols: int) -> None:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, cols)).round(4), columns=[f"s{i}" for i in range(cols)])
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'json':
+        df.to_json(path, orient='records')
+    else:
+        df.to_excel(path, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--cols', type=int, default=2000)
+    parser.add_argument('--selected', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--formats', default='csv,json,xlsx')
+    args = parser.parse_args()
+
+    full_parsers = {
+        'csv': lambda p, sel: pd.read_csv(p, low_memory=False)[sel],
+        'json': lambda p, sel: pd.DataFrame(_load_json(p))[sel],
+        'xlsx': lambda p, sel: pd.read_excel(p)[sel],
+    }
+    print(f"{'format':<8}{'rows':>8}{'cols':>7}{'full (s)':>12}{'projected (s)':>16}{'speedup':>10}")
+    for fmt in [f.strip() for f in args.formats.split(',') if f.strip()]:
+        # Excel writing is slow; keep that file smaller so the benchmark stays practical
+        rows = args.rows if fmt != 'xlsx' else min(args.rows, 1000)
+        cols = args.cols if fmt != 'xlsx' else min(args.cols, 500)
+        selected = [f"s{i}" for i in np.linspace(0, cols - 1, args.selected).astype(int)]
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        os.close(fd)
+        try:
+            _write_wide(path, fmt, rows, cols)
+            full = _timed(lambda: full_parsers[fmt](path, selected), args.repeat)
+            projected = _timed(lambda: read_dataframe(path, path, selected), args.repeat)
+            print(f"{fmt:<8}{rows:>8}{cols:>7}{full:>12.3f}{projected:>16.3f}{full / projected:>9.1f}x")
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: plot rendering throughput with serialised vs. concurrent workers.
+
+Renders the same batch of model plots (each from its own data) with:
+  serialised  a thread pool whose renders hold one lock, as pyplot renders had to
+  thread      a thread pool rendering independent figures concurrently
+  process     a process pool
+and checks every image against a serial render of the same data, so any
+cross-talk between concurrent renders shows up as a mismatch.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_render_concurrency --workers 1,2,4 --jobs 32
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from backend.services.plotting.analysis_plots import model_plot
+
+_lock = threading.Lock()
+
+
+def _plot_data(seed: int, rows: int):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, 10, rows)
+    y = np.sin(x) * (1 + seed % 5) + rng.normal(0, 0.3, rows)
+    xs = np.linspace(0, 10, 200)
+    return {
+        "target": f"y{seed}", "y": y, "y_hat": np.sin(x) * (1 + seed % 5),
+        "coef": rng.normal(size=12), "feature_names": [f"t{i}" for i in range(12)],
+        "accuracy": 0.9, "x": x, "x_label": "x", "curve": (xs, np.sin(xs) * (1 + seed % 5)),
+    }
+
+
+def _render(seed: int, rows: int, kind: str, dpi: int) -> bytes:
+    return model_plot(kind, _plot_data(seed, rows), dpi)
+
+
+def _render_serialised(seed: int, rows: int, kind: str, dpi: int) -> bytes:
+    with _lock:
+        return _render(seed, rows, kind, dpi)
+
+
+def _run(mode: str, workers: int, jobs: int, rows: int, kind: str, dpi: int):
+    fn = _render_serialised if mode == 'serialised' else _render
+    executor = ProcessPoolExecutor(workers) if mode == 'process' else ThreadPoolExecutor(workers)
+    with executor:
+        # Warm the workers (imports, font cache) outside the timing
+        list(executor.map(fn, range(workers), [rows] * workers, [kind] * workers, [dpi] * workers))
+        start = time.perf_counter()
+        images = list(executor.map(fn, range(jobs), [rows] * jobs, [kind] * jobs, [dpi] * jobs))
+        return time.perf_counter() - start, images
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', default='1,2,4')
+    parser.add_argument('--modes', default='serialised,thread,process')
+    parser.add_argument('--jobs', type=int, default=32)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--kind', default='overview')
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+
+    reference = [_render(seed, args.rows, args.kind, args.dpi) for seed in range(args.jobs)]
+    base = None
+    print(f"{'mode':>11}{'workers':>9}{'seconds':>10}{'plots/s':>10}{'speedup':>10}{'identical':>11}")
+    for mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+        for workers in [int(w) for w in args.workers.split(',') if w.strip()]:
+            seconds, images = _run(mode, workers, args.jobs, args.rows, args.kind, args.dpi)
+            base = base or seconds
+            same = sum(a == b for a, b in zip(images, reference))
+            print(f"{mode:>11}{workers:>9}{seconds:>10.2f}{args.jobs / seconds:>10.1f}{base / seconds:>9.2f}x"
+                  f"{f'{same}/{args.jobs}':>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: per-degree sklearn pipelines vs. the shared power-sum solver in req_details.
+
+Both sides run the polynomial degree search only: the power-sum side calls
+``power_sum_details`` on the sums req_details builds, without the transformed
+families req_details also tries, so degrees and scores are compared like for
+like.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_req_details --rows 1000,100000,1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.services.ml.moments import PowerSums, power_matrix, scale_feature
+from backend.services.ml.sklearn_fluent import candidate_degrees, power_sum_details
+
+
+def _timed(fn, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _pipeline_search(x, y):
+    """The previous degree search: one pipeline, split and fit per degree, then a refit."""
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import PolynomialFeatures
+
+    X = np.asarray(x).reshape(-1, 1)
+    y = np.asarray(y)
+    best_score, best_degree, best_model = -float('inf'), 0, None
+    for degree in (1, 2, 3):
+        pipeline = make_pipeline(PolynomialFeatures(degree=degree, include_bias=False), LinearRegression())
+        if len(y) > 50:
+            x_train, x_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            pipeline.fit(x_train, y_train)
+            score = pipeline.score(x_test, y_test)
+        else:
+            pipeline.fit(X, y)
+            score = pipeline.score(X, y)
+        if score > best_score:
+            best_score, best_degree = score, degree
+            if len(y) > 50:
+                pipeline.fit(X, y)
+            best_model = pipeline
+    return best_degree, best_score, best_model
+
+
+def _moment_search(x, y):
+    """req_details' polynomial search: power sums of the same split, solved per degree."""
+    from sklearn.model_selection import train_test_split
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    degrees = candidate_degrees(len(y))
+    u, center, scale = scale_feature(x)
+    y_offset = float(y.mean())
+    powers = power_matrix(u, degrees[-1])
+    y_centered = y - y_offset
+    if len(y) > 50:
+        train, test = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+        train_stats = PowerSums.from_powers(powers[train], y_centered[train], degrees[-1])
+        test_stats = PowerSums.from_powers(powers[test], y_centered[test], degrees[-1])
+        return power_sum_details(train_stats + test_stats, degrees, center, scale, y_offset, train_stats, test_stats)
+    full = PowerSums.from_powers(powers, y_centered, degrees[-1])
+    return power_sum_details(full, degrees, center, scale, y_offset)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', default='1000,100000,1000000')
+    parser.add_argument('--noise', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10}{'pipeline (s)':>15}{'moments (s)':>14}{'speedup':>10}{'degree':>9}{'|dR2|':>12}")
+    for rows in [int(r) for r in args.rows.split(',') if r.strip()]:
+        x = rng.uniform(-3, 3, rows)
+        y = 0.5 * x ** 3 - 2 * x ** 2 + x + 4 + rng.normal(0, args.noise, rows)
+        xlist, ylist = x.tolist(), y.tolist()
+        pipeline_time, (degree, score, _) = _timed(lambda: _pipeline_search(xlist, ylist), args.repeat)
+        moments_time, details = _timed(lambda: _moment_search(xlist, ylist), args.repeat)
+        agree = 'same' if details['degree'] == degree else f"{degree}->{details['degree']}"
+        print(f"{rows:>10}{pipeline_time:>15.3f}{moments_time:>14.3f}{pipeline_time / moments_time:>9.1f}x"
+              f"{agree:>9}{abs(details['accuracy'] - score):>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+
+# Runtime limits, overridable through environment variables
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Uploaded datasets kept in memory so /analyze-data can reference them by id
+DATASET_CACHE_MAX_ENTRIES = _env_int("FLUENT_DATASET_CACHE_MAX_ENTRIES", 16)
+DATASET_CACHE_MAX_BYTES = _env_int("FLUENT_DATASET_CACHE_MAX_MB", 1024) * 1024 * 1024
+
+# Streaming ingest: uploads are copied to disk in blocks and CSVs are parsed in row chunks
+INGEST_BLOCK_BYTES = _env_int("FLUENT_INGEST_BLOCK_KB", 1024) * 1024
+CSV_CHUNK_ROWS = _env_int("FLUENT_CSV_CHUNK_ROWS", 100_000)
+SPOOL_DIR = os.getenv("FLUENT_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "fluent-datasets")
+
+# Sampled upload profiles: first rows plus randomly placed blocks of the file
+PROFILE_HEAD_ROWS = _env_int("FLUENT_PROFILE_HEAD_ROWS", 1000)
+PROFILE_SAMPLE_ROWS = _env_int("FLUENT_PROFILE_SAMPLE_ROWS", 2000)
+PROFILE_SAMPLE_BLOCK_BYTES = _env_int("FLUENT_PROFILE_SAMPLE_BLOCK_KB", 64) * 1024
+PROFILE_SAMPLE_BLOCKS = _env_int("FLUENT_PROFILE_SAMPLE_BLOCKS", 32)
+
+# Compressed uploads are decompressed as streams; this caps the decompressed size
+MAX_DECOMPRESSED_BYTES = _env_int("FLUENT_MAX_DECOMPRESSED_MB", 4096) * 1024 * 1024
+
+# Datasets at least this large are fitted out of core: row chunks are streamed
+# from disk into normal equations instead of loading the design matrix
+STREAMING_FIT_MIN_BYTES = _env_int("FLUENT_STREAMING_FIT_MIN_MB", 256) * 1024 * 1024
+STREAMING_PLOT_ROWS = _env_int("FLUENT_STREAMING_PLOT_ROWS", 5000)
+
+# Worker pools for CPU-bound request stages (see core.workers). Each pool admits
+# workers + queue jobs at a time; further requests are answered with 503.
+COMPUTE_WORKERS = _env_int("FLUENT_COMPUTE_WORKERS", min(4, os.cpu_count() or 1))
+COMPUTE_QUEUE_DEPTH = _env_int("FLUENT_COMPUTE_QUEUE", 8)
+RENDER_WORKERS = _env_int("FLUENT_RENDER_WORKERS", 2)
+RENDER_QUEUE_DEPTH = _env_int("FLUENT_RENDER_QUEUE", 8)
+# "thread" or "process"; process workers sidestep the GIL for matplotlib and ReportLab
+RENDER_WORKER_KIND = os.getenv("FLUENT_RENDER_WORKER_KIND", "thread")
+SATURATED_RETRY_AFTER_SECONDS = _env_int("FLUENT_RETRY_AFTER_SECONDS", 2)
+
+# Polynomial expansion: highest degree accepted, largest number of expanded terms
+# (interactions beyond it are pruned, or the fit refused when pruning is off),
+# largest expanded design matrix built in memory, and the size of the row blocks
+# larger designs are folded in
+POLY_MAX_DEGREE = _env_int("FLUENT_POLY_MAX_DEGREE", 4)
+POLY_MAX_TERMS = _env_int("FLUENT_POLY_MAX_TERMS", 2000)
+POLY_PRUNE = _env_int("FLUENT_POLY_PRUNE", 1) != 0
+POLY_DESIGN_MAX_BYTES = _env_int("FLUENT_POLY_DESIGN_MAX_MB", 512) * 1024 * 1024
+POLY_BLOCK_BYTES = _env_int("FLUENT_POLY_BLOCK_MB", 64) * 1024 * 1024
+
+# Preview fits (/analyze-data with preview=true): rows in the sample, and how long
+# the background full fit waits for a saturated compute pool before giving up
+PREVIEW_SAMPLE_ROWS = _env_int("FLUENT_PREVIEW_SAMPLE_ROWS", 20_000)
+PREVIEW_REFINE_MAX_WAIT_SECONDS = _env_int("FLUENT_PREVIEW_REFINE_MAX_WAIT_SECONDS", 300)
+
+# Bootstrap confidence intervals (confidence=bootstrap): resamples drawn by default
+# and at most, row groups resampled, the most memory their statistics may take,
+# and the time budget for drawing resamples
+BOOTSTRAP_SAMPLES = _env_int("FLUENT_BOOTSTRAP_SAMPLES", 1000)
+BOOTSTRAP_MAX_SAMPLES = _env_int("FLUENT_BOOTSTRAP_MAX_SAMPLES", 10_000)
+BOOTSTRAP_GROUPS = _env_int("FLUENT_BOOTSTRAP_GROUPS", 100)
+BOOTSTRAP_MAX_BYTES = _env_int("FLUENT_BOOTSTRAP_MAX_MB", 256) * 1024 * 1024
+BOOTSTRAP_BUDGET_MS = _env_int("FLUENT_BOOTSTRAP_BUDGET_MS", 2000)
+
+# Most terms forward stepwise selection may add to a model
+SELECTION_MAX_TERMS = _env_int("FLUENT_SELECTION_MAX_TERMS", 200)
+
+# Largest number of specs accepted by one /analyze-batch call
+BATCH_MAX_SPECS = _env_int("FLUENT_BATCH_MAX_SPECS", 64)
+
+# Fitted models kept for /predict, partial-fit and plots; each is sized by its
+# X^T X statistics and plot sample, and the least recently used are evicted
+MODEL_STORE_MAX_ENTRIES = _env_int("FLUENT_MODEL_STORE_MAX_ENTRIES", 256)
+MODEL_STORE_MAX_BYTES = _env_int("FLUENT_MODEL_STORE_MAX_MB", 1024) * 1024 * 1024
+
+# Finished /analyze-data responses, keyed by dataset hash and fit configuration
+RESULT_CACHE_MAX_ENTRIES = _env_int("FLUENT_RESULT_CACHE_MAX_ENTRIES", 128)
+RESULT_CACHE_MAX_BYTES = _env_int("FLUENT_RESULT_CACHE_MAX_MB", 128) * 1024 * 1024
+
+# Stored models keep this many evenly spaced rows of their in-memory fit for
+# GET /models/{model_id}/plot; its rendered images are cached by parameters
+PLOT_SAMPLE_ROWS = _env_int("FLUENT_PLOT_SAMPLE_ROWS", 20000)
+PLOT_CACHE_MAX_ENTRIES = _env_int("FLUENT_PLOT_CACHE_MAX_ENTRIES", 256)
+PLOT_CACHE_MAX_BYTES = _env_int("FLUENT_PLOT_CACHE_MAX_MB", 64) * 1024 * 1024
+# Lossy WebP quality (1-100) of plot images requested as format=webp
+PLOT_WEBP_QUALITY = _env_int("FLUENT_PLOT_WEBP_QUALITY", 80)
+# Largest number of plots returned by one multipart POST /models/plots call
+PLOT_BATCH_MAX_PLOTS = _env_int("FLUENT_PLOT_BATCH_MAX_PLOTS", 64)
+
+# Scatter panels with more points than this are drawn as a binned 2D density
+# (bins x bins cells), so rendering cost follows the bin count, not the rows
+PLOT_DENSITY_MIN_POINTS = _env_int("FLUENT_PLOT_DENSITY_MIN_POINTS", 10000)
+PLOT_DENSITY_BINS = _env_int("FLUENT_PLOT_DENSITY_BINS", 200)
+
+# Point budget of each downsampled series returned for client-side charts
+PLOT_DATA_POINTS = _env_int("FLUENT_PLOT_DATA_POINTS", 1000)
+PLOT_DATA_MAX_POINTS = _env_int("FLUENT_PLOT_DATA_MAX_POINTS", 10000)
@@ -1,7 +1,53 @@
 from typing import Dict, Any
 
+from .settings import (
+    DATASET_CACHE_MAX_BYTES,
+    DATASET_CACHE_MAX_ENTRIES,
+    MODEL_STORE_MAX_BYTES,
+    MODEL_STORE_MAX_ENTRIES,
+    PLOT_CACHE_MAX_BYTES,
+    PLOT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_MAX_ENTRIES,
+)
+from ..services.data.registry import DatasetRegistry
+from ..utils.cache import BoundedLRU
+
 # In-memory store for generated PDF files (job_id -> file_path)
 pdf_jobs: Dict[str, str] = {}
 
-# In-memory store for trained models (model_id -> components)
-models_store: Dict[str, Dict[str, Any]] = {}
+# Bounded store of parsed uploads (dataset_id -> frame), shared by /upload-file and /analyze-data
+datasets_store = DatasetRegistry(max_entries=DATASET_CACHE_MAX_ENTRIES, max_bytes=DATASET_CACHE_MAX_BYTES)
+
+# Rendered /analyze-data responses ((dataset_id, x_cols, y_cols, degree, fit mode) -> response)
+results_cache = BoundedLRU(max_entries=RESULT_CACHE_MAX_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES)
+
+
+
+def model_nbytes(stored: Dict[str, Any]) -> int:
+    """Approximate size of a stored model: its sufficient statistics and plot sample."""
+    size = sum(stored[k].nbytes for k in ("train_stats", "test_stats") if stored.get(k) is not None)
+    plot = stored.get("plot")
+    if plot is not None:
+        size += plot["X"].nbytes + plot["Y"].nbytes
+    return int(size)
+
+
+def _model_evicted(model_id: str, stored: Dict[str, Any]) -> None:
+    # A cached response naming an evicted model would hand out a dead model_id
+    results_cache.pop(stored.get("result_key"))
+    # Replacing a preview with its full fit also lands here; its job must stay
+    if model_id not in models_store:
+        fit_jobs.pop(model_id)
+
+
+# Bounded store of trained models (model_id -> components); evicted ids answer 404
+models_store = BoundedLRU(max_entries=MODEL_STORE_MAX_ENTRIES, max_bytes=MODEL_STORE_MAX_BYTES, on_evict=_model_evicted)
+
+# Background full fits refining preview models (model_id -> status, result or error).
+# A job goes with its model, so there are never more jobs than models; the
+# bound only backs that up.
+fit_jobs = BoundedLRU(max_entries=MODEL_STORE_MAX_ENTRIES, max_bytes=0)
+
+# Rendered model plots (ETag of model state and plot parameters -> image bytes)
+plot_cache = BoundedLRU(max_entries=PLOT_CACHE_MAX_ENTRIES, max_bytes=PLOT_CACHE_MAX_BYTES)
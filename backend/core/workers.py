@@ -0,0 +1,113 @@
+"""
+Bounded executors for CPU-bound request stages.
+
+Handlers stay ``async def`` but hand parsing, fitting, rendering and report
+generation to a pool, so the event loop keeps serving cheap requests such as
+/predict while heavy analyses run. A pool admits at most ``workers + queue_depth``
+jobs; beyond that ``run`` raises ``PoolSaturated`` instead of queueing without
+bound.
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from .settings import (
+    COMPUTE_QUEUE_DEPTH,
+    COMPUTE_WORKERS,
+    RENDER_QUEUE_DEPTH,
+    RENDER_WORKER_KIND,
+    RENDER_WORKERS,
+    SATURATED_RETRY_AFTER_SECONDS,
+)
+
+
+class PoolSaturated(RuntimeError):
+    """Every worker is busy and the queue is full."""
+
+    def __init__(self, pool: str, retry_after: int):
+        super().__init__(f"The server is busy ({pool} workers saturated). Please retry shortly.")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class WorkerPool:
+    """Thread or process pool with admission control.
+
+    Admission is counted until the job finishes, not until the caller stops
+    waiting, so abandoned requests still hold their slot while they run.
+    Process pools only accept picklable module-level functions and arguments.
+    """
+
+    def __init__(self, name: str, workers: int, queue_depth: int, kind: str = "thread", retry_after: int = 2):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker kind for {name} pool: {kind}")
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, int(workers))
+        self.capacity = self.workers + max(0, int(queue_depth))
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"fluent-{self.name}")
+            return self._executor
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise PoolSaturated(self.name, self.retry_after)
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker process died; start a fresh pool for the next job
+            with self._lock:
+                self._executor = None
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Stages that read or write in-process state (dataset registry, model store) need threads
+compute_pool = WorkerPool("compute", COMPUTE_WORKERS, COMPUTE_QUEUE_DEPTH, retry_after=SATURATED_RETRY_AFTER_SECONDS)
+# Rendering and report generation are pure functions and may use processes
+render_pool = WorkerPool("render", RENDER_WORKERS, RENDER_QUEUE_DEPTH, kind=RENDER_WORKER_KIND, retry_after=SATURATED_RETRY_AFTER_SECONDS)
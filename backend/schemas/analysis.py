@@ -10,6 +10,14 @@ class DataPoint(BaseModel):
 class ManualDataInput(BaseModel):
     data_points: List[DataPoint]
     target_column: Optional[str] = "y"
+    confidence: Optional[str] = "none"
+    confidence_level: Optional[float] = 0.95
+    bootstrap_samples: Optional[int] = None
+    plot_data: Optional[bool] = False
+    plot_points: Optional[int] = None
+    downsample: Optional[str] = "lttb"
+    image_format: Optional[str] = "png"
+    dpi: Optional[int] = 150
 
 
 class PredictionRequest(BaseModel):
@@ -19,6 +27,20 @@ class PredictionRequest(BaseModel):
     intercept: Any
     is_polynomial: Optional[bool] = False
     degree: Optional[int] = 1
+    family: Optional[str] = None
     multi_output: Optional[bool] = False
     feature_names: Optional[List[str]] = None
     model_id: Optional[str] = None
+
+
+class PlotSpec(BaseModel):
+    model_id: str
+    target: Optional[str] = None
+    kind: Optional[str] = "overview"
+
+
+class PlotBatchRequest(BaseModel):
+    plots: List[PlotSpec]
+    format: Optional[str] = "webp"
+    dpi: Optional[int] = 100
+    density: Optional[str] = "auto"
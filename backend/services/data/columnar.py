@@ -0,0 +1,210 @@
+"""
+Readers for columnar binary uploads: Parquet, Feather/Arrow IPC and NumPy .npy/.npz.
+
+Files are memory-mapped where the format allows it and only the requested
+columns are materialised. pyarrow is imported lazily so CSV-only deployments
+do not need it.
+"""
+import zipfile
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PARQUET_EXTENSIONS: Tuple[str, ...] = ('.parquet', '.pq')
+ARROW_EXTENSIONS: Tuple[str, ...] = ('.feather', '.arrow', '.ipc')
+NUMPY_EXTENSIONS: Tuple[str, ...] = ('.npy', '.npz')
+COLUMNAR_EXTENSIONS: Tuple[str, ...] = PARQUET_EXTENSIONS + ARROW_EXTENSIONS + NUMPY_EXTENSIONS
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Parquet and Arrow uploads require the 'pyarrow' package")
+    return pyarrow
+
+
+def _open_arrow(path: str):
+    pa = _pyarrow()
+    source = pa.memory_map(path, 'r')
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        # Arrow IPC stream format (no footer)
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def _table_to_frame(table) -> pd.DataFrame:
+    # split_blocks keeps one block per column so null-free numeric columns stay zero-copy
+    return table.to_pandas(split_blocks=True)
+
+
+def _array_column_names(shape: Tuple[int, ...], dtype: np.dtype) -> List[str]:
+    if dtype.names:
+        return [str(n) for n in dtype.names]
+    if len(shape) <= 1:
+        return ["value"]
+    return [f"col_{i}" for i in range(shape[1])]
+
+
+def _array_frame(arr: np.ndarray, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    names = _array_column_names(arr.shape, arr.dtype)
+    wanted = list(columns) if columns is not None else names
+    if arr.dtype.names:
+        return pd.DataFrame({c: np.asarray(arr[c]) for c in wanted})
+    if arr.ndim <= 1:
+        return pd.DataFrame({"value": np.asarray(arr).reshape(-1)}) if wanted else pd.DataFrame()
+    if arr.ndim > 2:
+        raise ValueError("NumPy uploads must be 1-D or 2-D arrays")
+    positions = [names.index(c) for c in wanted]
+    block = arr if positions == list(range(arr.shape[1])) else arr[:, positions]
+    return pd.DataFrame(np.asarray(block), columns=wanted, copy=False)
+
+
+def _npz_layout(path: str) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+    """Shapes and dtypes of the arrays in an .npz, read from the member headers only."""
+    layout: Dict[str, Tuple[Tuple[int, ...], np.dtype]] = {}
+    with zipfile.ZipFile(path) as zf:
+        for member in zf.namelist():
+            if not member.endswith('.npy'):
+                continue
+            with zf.open(member) as fh:
+                version = np.lib.format.read_magic(fh)
+                if version == (1, 0):
+                    shape, _, dtype = np.lib.format.read_array_header_1_0(fh)
+                else:
+                    shape, _, dtype = np.lib.format.read_array_header_2_0(fh)
+            layout[member[:-4]] = (tuple(shape), dtype)
+    return layout
+
+
+def _npz_is_columns(layout: Dict[str, Tuple[Tuple[int, ...], np.dtype]]) -> bool:
+    """True when the archive holds equally long 1-D arrays, one per column."""
+    shapes = [shape for shape, _ in layout.values()]
+    return len(shapes) > 1 and all(len(s) == 1 for s in shapes) and len({s[0] for s in shapes}) == 1
+
+
+def columnar_header(path: str, filename: str) -> List[str]:
+    name = filename.lower()
+    if name.endswith(PARQUET_EXTENSIONS):
+        pa = _pyarrow()
+        return [str(c) for c in pa.parquet.read_schema(path, memory_map=True).names]
+    if name.endswith(ARROW_EXTENSIONS):
+        return [str(c) for c in _open_arrow(path).schema.names]
+    if name.endswith('.npy'):
+        arr = np.load(path, mmap_mode='r', allow_pickle=False)
+        return _array_column_names(arr.shape, arr.dtype)
+    if name.endswith('.npz'):
+        layout = _npz_layout(path)
+        if _npz_is_columns(layout):
+            return list(layout.keys())
+        if len(layout) != 1:
+            raise ValueError("NPZ uploads must hold one 2-D array or several 1-D arrays of equal length")
+        shape, dtype = next(iter(layout.values()))
+        return _array_column_names(shape, dtype)
+    raise ValueError(f"Unsupported file format: {filename}")
+
+
+def read_columnar(path: str, filename: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    name = filename.lower()
+    wanted: Optional[List[str]] = list(columns) if columns is not None else None
+    if name.endswith(PARQUET_EXTENSIONS):
+        pa = _pyarrow()
+        return _table_to_frame(pa.parquet.read_table(path, columns=wanted, memory_map=True))
+    if name.endswith(ARROW_EXTENSIONS):
+        table = _open_arrow(path).read_all()
+        return _table_to_frame(table.select(wanted) if wanted is not None else table)
+    if name.endswith('.npy'):
+        return _array_frame(np.load(path, mmap_mode='r', allow_pickle=False), wanted)
+    if name.endswith('.npz'):
+        with np.load(path, allow_pickle=False) as npz:
+            layout = _npz_layout(path)
+            if _npz_is_columns(layout):
+                keys = wanted if wanted is not None else list(layout.keys())
+                return pd.DataFrame({k: npz[k] for k in keys})
+            return _array_frame(npz[next(iter(layout.keys()))], wanted)
+    raise ValueError(f"Unsupported file format: {filename}")
+
+
+def columnar_head(path: str, filename: str, rows: int) -> Tuple[pd.DataFrame, int]:
+    """The first ``rows`` rows of a columnar upload and its total row count.
+
+    The count comes from the Parquet footer, the Arrow batch lengths or the
+    array header, and only the leading batches (or a slice of the memory map)
+    are materialised. .npz members cannot be mapped and are loaded once.
+    """
+    name = filename.lower()
+    rows = max(1, int(rows))
+    if name.endswith(PARQUET_EXTENSIONS):
+        pa = _pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        batch = next(parquet_file.iter_batches(batch_size=rows), None)
+        if batch is None:
+            return _table_to_frame(parquet_file.schema_arrow.empty_table()), 0
+        return _table_to_frame(pa.Table.from_batches([batch])), int(parquet_file.metadata.num_rows)
+    if name.endswith(ARROW_EXTENSIONS):
+        pa = _pyarrow()
+        reader = _open_arrow(path)
+        if hasattr(reader, 'num_record_batches'):
+            batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+        else:
+            batches = list(reader)
+        # Batches are views of the memory map; only the head is converted
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+        return _table_to_frame(table.slice(0, rows)), int(table.num_rows)
+    if name.endswith('.npy'):
+        arr = np.load(path, mmap_mode='r', allow_pickle=False)
+        total = arr.shape[0] if arr.ndim else 1
+        return _array_frame(arr[:rows] if arr.ndim else arr), int(total)
+    frame = read_columnar(path, name)
+    return frame.iloc[:rows], int(len(frame))
+
+
+def _batch_frames(batches, wanted: Optional[List[str]], chunksize: int) -> Iterator[pd.DataFrame]:
+    pa = _pyarrow()
+    for batch in batches:
+        if wanted is not None:
+            batch = batch.select(wanted)
+        for start in range(0, batch.num_rows, chunksize):
+            yield _table_to_frame(pa.Table.from_batches([batch.slice(start, chunksize)]))
+
+
+def iter_columnar(path: str, filename: str, columns: Optional[Sequence[str]] = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """Yield row chunks of a columnar upload without materialising the whole file.
+
+    Parquet is read one record batch at a time, Arrow IPC batches and .npy
+    arrays are sliced from the memory map. .npz members cannot be mapped, so
+    they are loaded once and sliced.
+    """
+    name = filename.lower()
+    wanted: Optional[List[str]] = list(columns) if columns is not None else None
+    chunksize = max(1, int(chunksize))
+    if name.endswith(PARQUET_EXTENSIONS):
+        pa = _pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        yield from _batch_frames(parquet_file.iter_batches(batch_size=chunksize, columns=wanted), None, chunksize)
+        return
+    if name.endswith(ARROW_EXTENSIONS):
+        reader = _open_arrow(path)
+        if hasattr(reader, 'num_record_batches'):
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        else:
+            batches = iter(reader)
+        yield from _batch_frames(batches, wanted, chunksize)
+        return
+    if name.endswith('.npy'):
+        arr = np.load(path, mmap_mode='r', allow_pickle=False)
+        for start in range(0, arr.shape[0] if arr.ndim else 1, chunksize):
+            yield _array_frame(arr[start:start + chunksize], wanted)
+        return
+    frame = read_columnar(path, name, wanted)
+    for start in range(0, len(frame), chunksize):
+        yield frame.iloc[start:start + chunksize]
+
+
+def is_columnar(filename: str) -> bool:
+    return bool(filename) and filename.lower().endswith(COLUMNAR_EXTENSIONS)
@@ -0,0 +1,177 @@
+"""
+Transparent decompression of uploads (gzip, bz2, xz, zstd, zip).
+
+The codec is detected from the file's magic bytes, and data is always read as
+a stream through a reader that enforces MAX_DECOMPRESSED_BYTES, so a small
+archive cannot expand into unbounded memory or disk.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+import random
+import zipfile
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from ...core.settings import INGEST_BLOCK_BYTES, MAX_DECOMPRESSED_BYTES, PROFILE_SAMPLE_BLOCK_BYTES
+
+MAGIC: Tuple[Tuple[str, bytes], ...] = (
+    ('gzip', b'\x1f\x8b'),
+    ('bz2', b'BZh'),
+    ('xz', b'\xfd7zXZ\x00'),
+    ('zstd', b'\x28\xb5\x2f\xfd'),
+    ('zip', b'PK\x03\x04'),
+)
+COMPRESSION_SUFFIXES: Tuple[str, ...] = ('.gz', '.gzip', '.bz2', '.xz', '.zst', '.zstd', '.zip')
+# Formats that are zip containers themselves and must not be unpacked
+_ZIP_BASED_FORMATS: Tuple[str, ...] = ('.xlsx', '.npz')
+
+
+class DecompressedSizeError(ValueError):
+    pass
+
+
+def detect_compression(path: str, filename: str) -> Optional[str]:
+    with open(path, 'rb') as fh:
+        head = fh.read(8)
+    for codec, magic in MAGIC:
+        if head.startswith(magic):
+            if codec == 'zip' and filename.lower().endswith(_ZIP_BASED_FORMATS):
+                return None
+            return codec
+    return None
+
+
+def strip_compression_suffix(filename: str) -> str:
+    name = filename or ''
+    lower = name.lower()
+    for suffix in COMPRESSION_SUFFIXES:
+        if lower.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def _zip_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith('__MACOSX/') and not os.path.basename(info.filename).startswith('.')
+    ]
+    if len(members) != 1:
+        raise ValueError("Zip uploads must contain exactly one data file")
+    return members[0]
+
+
+def logical_filename(path: str, filename: str, codec: Optional[str]) -> str:
+    """Name whose extension identifies the format of the decompressed data."""
+    if codec == 'zip':
+        with zipfile.ZipFile(path) as archive:
+            return os.path.basename(_zip_member(archive).filename)
+    if codec:
+        return strip_compression_suffix(filename)
+    return filename
+
+
+class _CappedReader(io.RawIOBase):
+    """Raw stream that fails once more than ``limit`` bytes have been read."""
+
+    def __init__(self, raw: BinaryIO, limit: int, closers: List[Any]):
+        self._raw = raw
+        self._limit = limit
+        self._closers = closers
+        self._read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        n = len(data)
+        self._read += n
+        if self._limit and self._read > self._limit:
+            raise DecompressedSizeError(
+                f"Decompressed upload exceeds the {self._limit // (1024 * 1024)} MB limit"
+            )
+        buffer[:n] = data
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            for closer in reversed(self._closers):
+                try:
+                    closer.close()
+                except Exception:
+                    pass
+        super().close()
+
+
+def open_decompressed(path: str, codec: str, limit: int = MAX_DECOMPRESSED_BYTES) -> BinaryIO:
+    """Open a compressed file as a buffered, size-capped binary stream."""
+    if codec == 'gzip':
+        raw = gzip.open(path, 'rb')
+        closers: List[Any] = [raw]
+    elif codec == 'bz2':
+        raw = bz2.open(path, 'rb')
+        closers = [raw]
+    elif codec == 'xz':
+        raw = lzma.open(path, 'rb')
+        closers = [raw]
+    elif codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Zstandard uploads require the 'zstandard' package")
+        fh = open(path, 'rb')
+        raw = zstandard.ZstdDecompressor().stream_reader(fh, read_across_frames=True)
+        closers = [fh, raw]
+    elif codec == 'zip':
+        archive = zipfile.ZipFile(path)
+        raw = archive.open(_zip_member(archive))
+        closers = [archive, raw]
+    else:
+        raise ValueError(f"Unknown compression: {codec}")
+    return io.BufferedReader(_CappedReader(raw, limit, closers), buffer_size=INGEST_BLOCK_BYTES)
+
+
+def scan_decompressed(
+    path: str,
+    codec: str,
+    sink: Optional[BinaryIO] = None,
+    sample_blocks: int = 0,
+    seed: str = '',
+) -> Dict[str, Any]:
+    """Stream through a compressed file once.
+
+    Counts decompressed bytes and newlines, optionally copies the data to
+    ``sink`` and keeps a reservoir of ``sample_blocks`` blocks (for sampled
+    profiles, since compressed files cannot be sampled by seeking).
+    """
+    rng = random.Random(seed)
+    size = 0
+    newlines = 0
+    last = b''
+    reservoir: List[bytes] = []
+    seen = 0
+    with open_decompressed(path, codec) as stream:
+        while True:
+            block = stream.read(PROFILE_SAMPLE_BLOCK_BYTES)
+            if not block:
+                break
+            size += len(block)
+            newlines += block.count(b'\n')
+            last = block[-1:]
+            if sink is not None:
+                sink.write(block)
+            if sample_blocks:
+                # Skip the first block: it holds the header and is covered by the head rows
+                seen += 1
+                if seen == 1:
+                    continue
+                if len(reservoir) < sample_blocks:
+                    reservoir.append(block)
+                else:
+                    slot = rng.randrange(seen - 1)
+                    if slot < sample_blocks:
+                        reservoir[slot] = block
+    lines = newlines + (1 if last and last != b'\n' else 0)
+    return {"size": size, "lines": lines, "sample_blocks": reservoir}
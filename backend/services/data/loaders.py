@@ -0,0 +1,218 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from fastapi import UploadFile
+
+from .sanitize import PLACEHOLDERS
+from .compression import open_decompressed, strip_compression_suffix
+from .columnar import COLUMNAR_EXTENSIONS, columnar_header, is_columnar, iter_columnar, read_columnar
+from ...core.settings import CSV_CHUNK_ROWS, INGEST_BLOCK_BYTES, SPOOL_DIR
+
+SUPPORTED_EXTENSIONS: Tuple[str, ...] = ('.csv', '.xlsx', '.xls', '.json') + COLUMNAR_EXTENSIONS
+
+
+def is_supported(filename: str) -> bool:
+    """Check the extension, looking through compression suffixes (.gz, .zip, ...).
+
+    The format of a zip archive is only known once its member is inspected.
+    """
+    if not filename:
+        return False
+    if filename.lower().endswith('.zip'):
+        return True
+    return strip_compression_suffix(filename).lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def is_csv(filename: str) -> bool:
+    return bool(filename) and filename.lower().endswith('.csv')
+
+
+async def spool_upload(file: UploadFile) -> Dict[str, Any]:
+    """Copy an upload to disk block by block, hashing it on the way.
+
+    Returns ``path``, ``sha256`` (hex), ``size`` in bytes and ``lines``, the number
+    of text lines (used as the row count of sampled CSV profiles). Only one block
+    is held in memory at a time, so the upload size does not affect peak memory.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    suffix = os.path.splitext(file.filename or '')[1].lower()
+    digest = hashlib.sha256()
+    size = 0
+    newlines = 0
+    last = b''
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=SPOOL_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                block = await file.read(INGEST_BLOCK_BYTES)
+                if not block:
+                    break
+                digest.update(block)
+                out.write(block)
+                size += len(block)
+                newlines += block.count(b'\n')
+                last = block[-1:]
+    except Exception:
+        remove_quietly(path)
+        raise
+    lines = newlines + (1 if last and last != b'\n' else 0)
+    return {"path": path, "sha256": digest.hexdigest(), "size": size, "lines": lines}
+
+
+def remove_quietly(path: Optional[str]) -> None:
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@contextlib.contextmanager
+def open_source(path: str, compression: Optional[str]):
+    """Yield something pandas can read: the path itself or a decompressing stream."""
+    if not compression:
+        yield path
+        return
+    stream = open_decompressed(path, compression)
+    try:
+        yield stream
+    finally:
+        stream.close()
+
+
+def _load_json(path: str, compression: Optional[str] = None) -> Any:
+    with open_source(path, compression) as source:
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as fh:
+                return json.load(fh)
+        return json.load(io.TextIOWrapper(source, encoding='utf-8'))
+
+
+def _json_columns(data: Any) -> List[str]:
+    if isinstance(data, dict):
+        return [str(k) for k in data.keys()]
+    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        keys: Dict[str, None] = {}
+        for row in data:
+            for k in row:
+                keys.setdefault(k, None)
+        return [str(k) for k in keys]
+    return [str(c) for c in pd.DataFrame(data).columns]
+
+
+def _json_frame(data: Any, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Build a frame from parsed JSON, materialising only ``columns`` when given."""
+    if columns is None:
+        return pd.DataFrame(data)
+    wanted = list(columns)
+    if isinstance(data, dict):
+        return pd.DataFrame({k: data[k] for k in wanted})
+    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        return pd.DataFrame(data, columns=wanted)
+    df = pd.DataFrame(data)
+    df.columns = [str(c) for c in df.columns]
+    return df[wanted]
+
+
+def read_header(path: str, filename: str, compression: Optional[str] = None) -> List[str]:
+    """Return the column names of a spooled upload without building its frame.
+
+    ``filename`` is the logical name (compression suffix removed); only CSV and
+    JSON are read through ``compression``, other formats are decompressed to
+    disk by the registry first.
+    """
+    name = filename.lower()
+    if name.endswith('.csv'):
+        with open_source(path, compression) as source:
+            return [str(c) for c in pd.read_csv(source, nrows=0).columns]
+    if name.endswith(('.xlsx', '.xls')):
+        return [str(c) for c in pd.read_excel(path, nrows=0).columns]
+    if name.endswith('.json'):
+        return _json_columns(_load_json(path, compression))
+    if is_columnar(name):
+        return columnar_header(path, name)
+    raise ValueError(f"Unsupported file format: {filename}")
+
+
+def iter_csv_chunks(
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    chunksize: int = CSV_CHUNK_ROWS,
+    compression: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield row chunks of a CSV, parsing only ``columns`` when given.
+
+    Compressed CSVs are decompressed as a stream while being parsed.
+    """
+    usecols = list(columns) if columns is not None else None
+    with open_source(path, compression) as source:
+        reader = pd.read_csv(source, usecols=usecols, chunksize=max(1, int(chunksize)), na_values=PLACEHOLDERS, low_memory=False)
+        with reader:
+            for chunk in reader:
+                yield chunk
+
+
+def read_dataframe(
+    path: str,
+    filename: str,
+    columns: Optional[Sequence[str]] = None,
+    compression: Optional[str] = None,
+) -> pd.DataFrame:
+    """Parse a spooled upload into a DataFrame based on the file extension.
+
+    Only ``columns`` are parsed when given: CSVs are read in row chunks with
+    ``usecols``, Excel sheets with ``usecols``, JSON frames are built from the
+    selected keys only and columnar formats are memory-mapped (see ``columnar``).
+    """
+    name = filename.lower()
+    if name.endswith('.csv'):
+        chunks = list(iter_csv_chunks(path, columns, compression=compression))
+        if not chunks:
+            with open_source(path, compression) as source:
+                return pd.read_csv(source, usecols=list(columns) if columns is not None else None, na_values=PLACEHOLDERS)
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+    if name.endswith(('.xlsx', '.xls')):
+        if columns is None:
+            return pd.read_excel(path, na_values=PLACEHOLDERS)
+        # Match on the string form so non-string headers (e.g. years) project correctly
+        wanted = {str(c) for c in columns}
+        df = pd.read_excel(path, usecols=lambda c: str(c) in wanted, na_values=PLACEHOLDERS)
+        df.columns = [str(c) for c in df.columns]
+        return df
+    if name.endswith('.json'):
+        return _json_frame(_load_json(path, compression), columns)
+    if is_columnar(name):
+        return read_columnar(path, name, columns)
+    raise ValueError(f"Unsupported file format: {filename}")
+
+
+def iter_frames(
+    path: str,
+    filename: str,
+    columns: Optional[Sequence[str]] = None,
+    chunksize: int = CSV_CHUNK_ROWS,
+    compression: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield ``columns`` of a spooled upload in row chunks of at most ``chunksize``.
+
+    CSV and columnar files are streamed from disk; Excel and JSON have no
+    incremental reader, so they are parsed once and sliced.
+    """
+    name = filename.lower()
+    if name.endswith('.csv'):
+        yield from iter_csv_chunks(path, columns, chunksize, compression)
+    elif is_columnar(name):
+        yield from iter_columnar(path, name, columns, chunksize)
+    else:
+        frame = read_dataframe(path, filename, columns, compression)
+        for start in range(0, len(frame), max(1, int(chunksize))):
+            yield frame.iloc[start:start + chunksize]
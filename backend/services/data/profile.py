@@ -0,0 +1,213 @@
+import io
+import random
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .columnar import columnar_head
+from .loaders import open_source, iter_csv_chunks
+from .sanitize import PLACEHOLDERS, sanitize_numeric
+from ...core.settings import PROFILE_HEAD_ROWS, PROFILE_SAMPLE_BLOCK_BYTES, PROFILE_SAMPLE_BLOCKS, PROFILE_SAMPLE_ROWS
+
+PREVIEW_ROWS = 50
+
+
+def _merge_dtype(current: Any, new: Any) -> Any:
+    if current is None or current == new:
+        return new
+    current_numeric = pd.api.types.is_numeric_dtype(current)
+    new_numeric = pd.api.types.is_numeric_dtype(new)
+    if current_numeric and new_numeric:
+        return np.result_type(current, new)
+    if current_numeric != new_numeric:
+        # A column that parses as text in any chunk is text for the whole file
+        return new if current_numeric else current
+    return np.dtype(object)
+
+
+def _head_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """First preview rows as JSON-ready dicts, with NaN/inf mapped to None."""
+    head = df.head(PREVIEW_ROWS)
+    if head.empty:
+        return []
+    names = [str(c) for c in head.columns]
+    columns = []
+    for i in range(head.shape[1]):
+        series = head.iloc[:, i]
+        values = series.to_numpy(dtype=object)
+        missing = pd.isna(values)
+        if pd.api.types.is_float_dtype(series.dtype):
+            missing |= np.isinf(series.to_numpy(dtype=np.float64, na_value=np.nan))
+        values[missing] = None
+        columns.append(values.tolist())
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def _sampling_info(sampled: bool, sample_size: int, rows_estimated: bool = False) -> Dict[str, Any]:
+    return {"mode": "sampled" if sampled else "full", "sampled": sampled, "sample_size": int(sample_size), "rows_estimated": rows_estimated}
+
+
+def profile_frame(df: pd.DataFrame, sample_rows: Optional[int] = None) -> Dict[str, Any]:
+    """Shape, dtypes, preview rows and numeric columns of an in-memory frame.
+
+    With ``sample_rows`` the numeric check only looks at the first rows plus a
+    random sample of the rest, bounded by ``sample_rows`` in total.
+    """
+    df = df.dropna(how='all').dropna(axis=1, how='all')
+    sample = df
+    if sample_rows is not None and len(df) > sample_rows:
+        head_n = min(PROFILE_HEAD_ROWS, sample_rows // 2)
+        rest = df.iloc[head_n:].sample(n=sample_rows - head_n, random_state=0)
+        sample = pd.concat([df.iloc[:head_n], rest])
+    valid_counts = sanitize_numeric(sample)[1] if not sample.empty else {}
+    numeric_columns = [col for col in df.columns if valid_counts.get(col, 0) > 0]
+
+    return {
+        "shape": (int(df.shape[0]), int(df.shape[1])) if hasattr(df, 'shape') else (0, 0),
+        "columns": [str(c) for c in df.columns.tolist()] if not df.empty else [],
+        "dtypes": {str(k): str(v) for k, v in (df.dtypes.astype(str).to_dict() if not df.empty else {}).items()},
+        "head": _head_records(df),
+        "numeric_columns": numeric_columns,
+        "profile": _sampling_info(sample is not df, len(sample)),
+    }
+
+
+def profile_csv(path: str, compression: Optional[str] = None) -> Dict[str, Any]:
+    """Same profile as :func:`profile_frame`, computed over CSV row chunks.
+
+    Only per-column flags, merged dtypes and the preview rows are kept between
+    chunks, so memory is bounded by the chunk size rather than the file size.
+    """
+    rows = 0
+    columns: List[Any] = []
+    dtypes: Dict[Any, Any] = {}
+    has_values: Dict[Any, bool] = {}
+    has_numbers: Dict[Any, bool] = {}
+    head_parts: List[pd.DataFrame] = []
+    head_rows = 0
+
+    for chunk in iter_csv_chunks(path, compression=compression):
+        if not columns:
+            columns = chunk.columns.tolist()
+            has_values = {c: False for c in columns}
+            has_numbers = {c: False for c in columns}
+        chunk = chunk.dropna(how='all')
+        if chunk.empty:
+            continue
+        rows += len(chunk)
+        pending = [col for col in columns if not has_numbers[col]]
+        valid_counts = sanitize_numeric(chunk[pending])[1] if pending else {}
+        for col in columns:
+            series = chunk[col]
+            dtypes[col] = _merge_dtype(dtypes.get(col), series.dtype)
+            if not has_values[col]:
+                has_values[col] = bool(series.notna().any())
+            if valid_counts.get(col, 0) > 0:
+                has_numbers[col] = True
+        if head_rows < PREVIEW_ROWS:
+            head_parts.append(chunk.head(PREVIEW_ROWS - head_rows))
+            head_rows += len(head_parts[-1])
+
+    kept = [c for c in columns if has_values.get(c)]
+    if not kept or rows == 0:
+        return {"shape": (0, 0), "columns": [], "dtypes": {}, "head": [], "numeric_columns": [], "profile": _sampling_info(False, 0)}
+    head_df = pd.concat(head_parts, ignore_index=True)[kept]
+    return {
+        "shape": (int(rows), len(kept)),
+        "columns": [str(c) for c in kept],
+        "dtypes": {str(c): str(dtypes[c]) for c in kept},
+        "head": _head_records(head_df),
+        "numeric_columns": [c for c in kept if has_numbers[c]],
+        "profile": _sampling_info(False, rows),
+    }
+
+
+def profile_columnar_sampled(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Profile of a Parquet, Arrow or NumPy upload from its leading rows.
+
+    Only the first PROFILE_HEAD_ROWS + PROFILE_SAMPLE_ROWS rows are read (the
+    first record batch or a slice of the memory map); the row count comes from
+    the file metadata, so latency does not grow with the file.
+    """
+    head, rows = columnar_head(entry["path"], entry["format_name"], PROFILE_HEAD_ROWS + PROFILE_SAMPLE_ROWS)
+    summary = profile_frame(head)
+    summary["shape"] = (rows, summary["shape"][1])
+    summary["profile"] = _sampling_info(len(head) < rows, len(head))
+    return summary
+
+
+def _lines_from_blocks(blocks: List[bytes], n_rows: int) -> bytes:
+    """Up to ``n_rows`` complete lines spread evenly over ``blocks``."""
+    if not blocks:
+        return b''
+    per_block = -(-n_rows // len(blocks))
+    out: List[bytes] = []
+    for block in blocks:
+        # Drop the partial first and last lines of the block
+        lines = block.split(b'\n')[1:-1]
+        out.extend(line for line in lines[:per_block] if line.strip())
+    return b'\n'.join(out[:n_rows])
+
+
+def _sample_csv_lines(path: str, size: int, n_rows: int, seed: str) -> bytes:
+    """Complete lines read from randomly placed blocks of a CSV.
+
+    Cost depends on ``n_rows`` and the block size only, never on the file size.
+    Blocks never start at offset 0, so the header is not picked up as a row.
+    """
+    if n_rows <= 0 or size <= PROFILE_SAMPLE_BLOCK_BYTES:
+        return b''
+    rng = random.Random(seed)
+    offsets = sorted(rng.randrange(1, size - 1) for _ in range(min(PROFILE_SAMPLE_BLOCKS, n_rows)))
+    blocks: List[bytes] = []
+    with open(path, 'rb') as fh:
+        for offset in offsets:
+            fh.seek(offset)
+            blocks.append(fh.read(PROFILE_SAMPLE_BLOCK_BYTES))
+    return _lines_from_blocks(blocks, n_rows)
+
+
+def profile_csv_sampled(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Fast CSV profile from the first rows plus a random sample of lines.
+
+    Types and numeric columns are inferred from at most PROFILE_HEAD_ROWS +
+    PROFILE_SAMPLE_ROWS rows, and the row count comes from the newline count taken
+    while spooling, so latency stays flat as the file grows. Small files that fit
+    in the head are profiled exactly. Compressed CSVs cannot be sampled by
+    seeking, so their lines come from the block reservoir kept by the registry.
+    """
+    path = entry["path"]
+    with open_source(path, entry.get("compression")) as source:
+        head = pd.read_csv(source, nrows=PROFILE_HEAD_ROWS + 1, na_values=PLACEHOLDERS, low_memory=False)
+    if len(head) <= PROFILE_HEAD_ROWS:
+        return profile_frame(head)
+    head = head.iloc[:PROFILE_HEAD_ROWS]
+
+    sample = head
+    if entry.get("compression"):
+        raw = _lines_from_blocks(entry.get("sample_blocks") or [], PROFILE_SAMPLE_ROWS)
+    else:
+        raw = _sample_csv_lines(path, entry["size"], PROFILE_SAMPLE_ROWS, entry["dataset_id"])
+    if raw:
+        try:
+            extra = pd.read_csv(
+                io.BytesIO(raw), header=None, names=list(head.columns), na_values=PLACEHOLDERS,
+                on_bad_lines='skip', low_memory=False,
+            )
+            sample = pd.concat([head, extra], ignore_index=True)
+        except Exception:
+            # e.g. quoted fields spanning lines; fall back to the head rows
+            sample = head
+
+    valid_counts = sanitize_numeric(sample)[1]
+    columns = list(sample.columns)
+    rows = max(int(entry.get("lines", 0)) - 1, len(head))
+    return {
+        "shape": (rows, len(columns)),
+        "columns": [str(c) for c in columns],
+        "dtypes": {str(c): str(t) for c, t in sample.dtypes.astype(str).items()},
+        "head": _head_records(head.dropna(how='all')),
+        "numeric_columns": [c for c in columns if valid_counts.get(c, 0) > 0],
+        "profile": _sampling_info(True, len(sample), rows_estimated=True),
+    }
@@ -0,0 +1,225 @@
+import contextlib
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from .compression import COMPRESSION_SUFFIXES, detect_compression, logical_filename, scan_decompressed
+from .loaders import is_csv, is_supported, iter_frames, read_dataframe, read_header, remove_quietly
+from ...core.settings import CSV_CHUNK_ROWS, PROFILE_SAMPLE_BLOCKS
+from ...utils.cache import BoundedLRU
+
+
+def frame_nbytes(df: Optional[pd.DataFrame]) -> int:
+    if df is None:
+        return 0
+    try:
+        return int(df.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+
+def _slices(frame: pd.DataFrame, chunksize: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(frame), chunksize):
+        yield frame.iloc[start:start + chunksize]
+
+
+def _streamed(entry: Dict[str, Any], columns: List[str], chunksize: int, release: Callable[[], None]) -> Iterator[pd.DataFrame]:
+    try:
+        yield from iter_frames(entry["path"], entry["format_name"], columns, chunksize, entry["compression"])
+    finally:
+        release()
+
+
+class DatasetRegistry:
+    """Uploaded datasets keyed by the sha256 of the uploaded bytes.
+
+    Each entry owns the spooled file on disk plus the columns parsed from it so
+    far. Parsed columns count against the memory budget; evicting an entry also
+    removes its file, after which clients have to upload it again. Reads pin
+    their entry (see ``reading``), so an entry evicted mid-read keeps its file
+    until the last reader is done.
+
+    Parsing holds only the entry's own lock, so different datasets are parsed
+    in parallel on the compute pool.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._cache = BoundedLRU(max_entries=max_entries, max_bytes=max_bytes, on_evict=self._evicted)
+        # Guards reader counts and eviction flags; parsing never holds it
+        self._lock = threading.Lock()
+        # Makes the duplicate check and insert of ``register`` atomic
+        self._register_lock = threading.Lock()
+
+    def _evicted(self, dataset_id: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            entry["evicted"] = True
+            if entry["readers"]:
+                return
+        remove_quietly(entry.get("path"))
+
+    def _pin(self, entry: Dict[str, Any]) -> Callable[[], None]:
+        """Count a reader of ``entry``; the returned callable releases it (once)."""
+        with self._lock:
+            entry["readers"] += 1
+        released = []
+
+        def release() -> None:
+            with self._lock:
+                if released:
+                    return
+                released.append(True)
+                entry["readers"] -= 1
+                orphaned = entry["evicted"] and not entry["readers"]
+            if orphaned:
+                remove_quietly(entry.get("path"))
+
+        return release
+
+    @contextlib.contextmanager
+    def reading(self, entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Keep ``entry``'s file on disk while the block reads it, even if it is evicted meanwhile."""
+        release = self._pin(entry)
+        try:
+            yield entry
+        finally:
+            release()
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        if not dataset_id:
+            return None
+        return self._cache.get(dataset_id)
+
+    def register(self, spooled: Dict[str, Any], filename: str) -> Dict[str, Any]:
+        """Adopt a spooled upload (see ``spool_upload``); duplicate content reuses the existing entry.
+
+        Identical uploads may be prepared concurrently; the first one registered
+        wins and the others drop their own files, so putting a duplicate never
+        evicts (and deletes the file of) an entry another request is using.
+        """
+        dataset_id, path = spooled["sha256"], spooled["path"]
+        existing = self._cache.get(dataset_id)
+        if existing is not None:
+            if existing["path"] != path:
+                remove_quietly(path)
+            return existing
+        try:
+            entry = self._prepare(dataset_id, spooled, filename)
+        except Exception:
+            remove_quietly(path)
+            raise
+        with self._register_lock:
+            existing = self._cache.get(dataset_id)
+            if existing is None:
+                self._cache.put(dataset_id, entry, nbytes=0)
+                return entry
+        if existing["path"] != entry["path"]:
+            remove_quietly(entry["path"])
+        return existing
+
+    @staticmethod
+    def _prepare(dataset_id: str, spooled: Dict[str, Any], filename: str) -> Dict[str, Any]:
+        """Build the entry for a spooled upload, unpacking compressed data if needed.
+
+        Compressed CSV/JSON stay compressed on disk and are decompressed as a
+        stream on every read; one scan here validates the size cap, counts lines
+        and keeps a reservoir of blocks for sampled profiles. Other compressed
+        formats need random access and are decompressed to a spool file once.
+        """
+        path = spooled["path"]
+        codec = detect_compression(path, filename)
+        format_name = logical_filename(path, filename, codec)
+        if not is_supported(format_name) or format_name.lower().endswith(COMPRESSION_SUFFIXES):
+            raise ValueError(f"Unsupported file format: {format_name}")
+        size, lines, sample_blocks = int(spooled["size"]), int(spooled["lines"]), None
+        if codec and format_name.lower().endswith(('.csv', '.json')):
+            n_blocks = PROFILE_SAMPLE_BLOCKS if is_csv(format_name) else 0
+            scan = scan_decompressed(path, codec, sample_blocks=n_blocks, seed=dataset_id)
+            size, lines, sample_blocks = scan["size"], scan["lines"], scan["sample_blocks"]
+        elif codec:
+            unpacked = f"{path}{os.path.splitext(format_name)[1].lower()}"
+            try:
+                with open(unpacked, 'wb') as sink:
+                    scan = scan_decompressed(path, codec, sink=sink)
+            except Exception:
+                remove_quietly(unpacked)
+                raise
+            remove_quietly(path)
+            path, codec, size, lines = unpacked, None, scan["size"], scan["lines"]
+        return {
+            "dataset_id": dataset_id,
+            "path": path,
+            "filename": filename,
+            "format_name": format_name,
+            "compression": codec,
+            "size": size,
+            "lines": lines,
+            "sample_blocks": sample_blocks,
+            "columns": read_header(path, format_name, codec),
+            "frame": None,
+            "lock": threading.Lock(),
+            "readers": 0,
+            "evicted": False,
+        }
+
+    def load_columns(self, entry: Dict[str, Any], columns: Sequence[str]) -> pd.DataFrame:
+        """Return ``columns`` of a dataset, parsing from disk only those not cached yet.
+
+        Columns that would push the entry past the whole memory budget are
+        returned without being cached.
+        """
+        wanted: List[str] = list(dict.fromkeys(columns))
+        # Per-entry lock: concurrent requests for one dataset parse it once
+        with entry["lock"]:
+            frame = entry.get("frame")
+            cached = [] if frame is None else [c for c in wanted if c in frame.columns]
+            missing = [c for c in wanted if c not in cached]
+            if not missing:
+                return frame[wanted]
+            with self.reading(entry):
+                parsed = read_dataframe(entry["path"], entry["format_name"], missing, entry["compression"])
+            merged = parsed if frame is None else pd.concat([frame, parsed], axis=1)
+            nbytes = frame_nbytes(merged)
+            if self._cache.max_bytes and nbytes > self._cache.max_bytes:
+                return merged[wanted]
+            entry["frame"] = merged
+        self._cache.resize(entry["dataset_id"], nbytes)
+        return merged[wanted]
+
+    def has_columns(self, entry: Dict[str, Any], columns: Sequence[str]) -> bool:
+        frame = entry.get("frame")
+        return frame is not None and all(c in frame.columns for c in columns)
+
+    def iter_columns(self, entry: Dict[str, Any], columns: Sequence[str], chunksize: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Yield ``columns`` of a dataset in row chunks without caching them.
+
+        Columns already parsed are sliced from memory; otherwise the spooled
+        file is streamed, so datasets larger than the memory budget can still
+        be scanned. The entry is pinned from this call until the chunks are
+        exhausted, closed or garbage collected, since they are usually read
+        later on a compute worker.
+        """
+        wanted: List[str] = list(dict.fromkeys(columns))
+        chunksize = max(1, int(chunksize))
+        frame = entry.get("frame")
+        if frame is not None and all(c in frame.columns for c in wanted):
+            return _slices(frame[wanted], chunksize)
+        release = self._pin(entry)
+        chunks = _streamed(entry, wanted, chunksize, release)
+        # An iterator that is never started never runs its finally block
+        weakref.finalize(chunks, release)
+        return chunks
+
+    def discard(self, dataset_id: str) -> None:
+        self._cache.pop(dataset_id)
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
@@ -0,0 +1,113 @@
+"""
+Row samples of a dataset for preview fits.
+
+Samples are of individual rows, never of contiguous runs, so the preview's
+intervals, which treat the rows as independent, hold on files ordered by
+time or key. ``uniform`` draws rows at random; ``stratified`` splits the rows
+(or bytes) into equal ranges and draws one row within each, so every part of
+an ordered file is represented.
+
+Plain CSVs are sampled by seeking to random byte offsets and reading the
+line that starts after each, so the cost depends on the sample size and not
+on the file size. Compressed CSVs cannot be seeked; their chosen rows are
+picked out of one streamed pass. Frames that are parsed or memory-mapped as
+a whole are sampled by row position.
+"""
+import io
+import random
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .sanitize import PLACEHOLDERS
+
+SAMPLE_STRATEGIES = ("uniform", "stratified")
+
+
+def _positions(extent: int, count: int, strategy: str, rng: random.Random) -> List[int]:
+    """``count`` sorted positions in ``[0, extent)``: independent, or one per equal stratum."""
+    if strategy == "stratified":
+        bounds = np.linspace(0, extent, count + 1)
+        return [int(lo) + rng.randrange(max(1, int(hi) - int(lo))) for lo, hi in zip(bounds, bounds[1:])]
+    return sorted(rng.randrange(extent) for _ in range(count))
+
+
+def _row_positions(total: int, count: int, strategy: str, rng: random.Random) -> List[int]:
+    """``count`` distinct sorted row indices out of ``total``."""
+    if strategy == "stratified":
+        return _positions(total, count, strategy, rng)
+    return sorted(rng.sample(range(total), count))
+
+
+def sample_csv_rows(entry: Dict[str, Any], columns: Sequence[str], n_rows: int, strategy: str = "uniform") -> Optional[pd.DataFrame]:
+    """About ``n_rows`` rows of ``columns`` of an uncompressed CSV, one per random offset.
+
+    Each offset is snapped to the start of the next line; offsets that land
+    in the same line yield it once, and uniform samples draw more offsets for
+    the lines lost that way. Returns None when no line was read or the
+    lines cannot be parsed (e.g. quoted fields spanning lines); callers fall
+    back to a full read.
+    """
+    size, lines = int(entry["size"]), max(int(entry.get("lines", 0)), 1)
+    rng = random.Random(f"{entry['dataset_id']}:{strategy}")
+    # Small reads: each offset only needs the rest of its line and the next one
+    buffering = max(512, int(8 * size / lines))
+    starts, picked = set(), []
+    # Offsets start at the header's last byte at the earliest, so it is never read as a row
+    offsets = _positions(max(size - 1, 1), n_rows, strategy, rng)
+    with open(entry["path"], 'rb', buffering=buffering) as fh:
+        for _ in range(3):
+            for offset in offsets:
+                fh.seek(offset)
+                fh.readline()
+                start = fh.tell()
+                line = fh.readline()
+                if start in starts or not line.strip():
+                    continue
+                starts.add(start)
+                picked.append(line.rstrip(b'\r\n'))
+            missing = n_rows - len(picked)
+            if strategy == "stratified" or missing <= 0:
+                break
+            offsets = _positions(max(size - 1, 1), missing, strategy, rng)
+    if not picked:
+        return None
+    raw = b'\n'.join(picked)
+    try:
+        return pd.read_csv(
+            io.BytesIO(raw), header=None, names=list(entry["columns"]), usecols=list(columns),
+            na_values=PLACEHOLDERS, on_bad_lines='skip', low_memory=False,
+        )
+    except Exception:
+        return None
+
+
+def sample_frame(frame: pd.DataFrame, n_rows: int, strategy: str = "uniform", seed: str = "") -> pd.DataFrame:
+    """``n_rows`` rows of ``frame`` (all of them if it is smaller), in frame order."""
+    if len(frame) <= n_rows:
+        return frame
+    rng = random.Random(f"{seed}:{strategy}")
+    return frame.iloc[_row_positions(len(frame), n_rows, strategy, rng)]
+
+
+def sample_chunk_rows(chunks: Iterable[pd.DataFrame], total_rows: int, n_rows: int, strategy: str = "uniform", seed: str = "") -> Optional[pd.DataFrame]:
+    """``n_rows`` rows out of streamed row chunks, chosen up front from ``total_rows``.
+
+    Only the chosen rows of each chunk are kept, so memory is bounded by the
+    chunk size. ``total_rows`` may overestimate (e.g. a line count); rows past
+    the end are simply not found. Returns None when nothing was picked.
+    """
+    rng = random.Random(f"{seed}:{strategy}")
+    rows = np.asarray(_row_positions(total_rows, min(n_rows, total_rows), strategy, rng), dtype=np.int64)
+    parts, offset = [], 0
+    for chunk in chunks:
+        lo, hi = np.searchsorted(rows, [offset, offset + len(chunk)])
+        if hi > lo:
+            parts.append(chunk.iloc[rows[lo:hi] - offset])
+        offset += len(chunk)
+        if hi == len(rows):
+            break
+    if not parts:
+        return None
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,37 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Tokens treated as missing values; passed to the parsers as na_values so they never reach the frame
+PLACEHOLDERS: List[str] = ['-', '—', '–', 'N/A', 'NA', 'na', 'NaN', '', 'null', 'None']
+
+
+def sanitize_numeric(frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Convert every column of ``frame`` to float64 and count its valid values.
+
+    Numeric columns are converted as one block; all text columns are coerced
+    together with a single ``pd.to_numeric`` call over their stacked values, so
+    unparseable cells (including any placeholder the parser did not catch)
+    become NaN. Infinite values are treated as missing.
+
+    Returns the float64 frame (same index and column order) and a mapping of
+    column name -> number of finite values.
+    """
+    columns = list(frame.columns)
+    values = np.empty((len(frame), len(columns)), dtype=np.float64, order='F')
+
+    is_numeric = [pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes]
+    numeric_idx = [i for i, flag in enumerate(is_numeric) if flag]
+    text_idx = [i for i, flag in enumerate(is_numeric) if not flag]
+    if numeric_idx:
+        values[:, numeric_idx] = frame.iloc[:, numeric_idx].to_numpy(dtype=np.float64, na_value=np.nan)
+    if text_idx:
+        stacked = frame.iloc[:, text_idx].to_numpy(dtype=object).ravel(order='F')
+        coerced = pd.to_numeric(pd.Series(stacked, dtype=object), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        values[:, text_idx] = coerced.reshape((len(frame), len(text_idx)), order='F')
+
+    values[~np.isfinite(values)] = np.nan
+    counts = np.count_nonzero(~np.isnan(values), axis=0)
+    sanitized = pd.DataFrame(values, index=frame.index, columns=columns, copy=False)
+    return sanitized, {c: int(n) for c, n in zip(columns, counts)}
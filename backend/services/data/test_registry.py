@@ -0,0 +1,71 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+from backend.services.data.registry import DatasetRegistry
+
+
+@pytest.fixture
+def spool(tmp_path):
+    """Writes a CSV of daily station readings the way ``spool_upload`` leaves it on disk."""
+    counter = iter(range(1000))
+
+    def write(station: str, days: int = 5) -> dict:
+        data = ("station,day,rainfall\n" + "".join(f"{station},{d},{(d * 7) % 11}\n" for d in range(days))).encode()
+        path = tmp_path / f"upload-{next(counter)}.csv"
+        path.write_bytes(data)
+        return {"path": str(path), "sha256": hashlib.sha256(data).hexdigest(), "size": len(data), "lines": data.count(b"\n")}
+
+    return write
+
+
+def test_evicting_the_oldest_dataset_removes_its_file(spool):
+    registry = DatasetRegistry(max_entries=2, max_bytes=0)
+    first, second, third = (registry.register(spool(name), f"{name}.csv") for name in ("kew", "oxford", "armagh"))
+
+    assert first["dataset_id"] not in registry
+    assert not os.path.exists(first["path"])
+    assert os.path.exists(second["path"]) and os.path.exists(third["path"])
+    assert registry.stats()["evictions"] == 1
+
+
+def test_a_reader_keeps_an_evicted_file_until_it_is_done(spool):
+    registry = DatasetRegistry(max_entries=1, max_bytes=0)
+    kept = registry.register(spool("kew"), "kew.csv")
+    chunks = registry.iter_columns(kept, ["rainfall"], chunksize=2)
+
+    registry.register(spool("oxford"), "oxford.csv")
+    assert kept["dataset_id"] not in registry
+    assert os.path.exists(kept["path"])
+    assert sum(len(chunk) for chunk in chunks) == 5
+    assert not os.path.exists(kept["path"])
+
+
+def test_parsed_columns_count_against_the_byte_budget(spool):
+    registry = DatasetRegistry(max_entries=10, max_bytes=5_000)
+    old = registry.register(spool("kew", days=40), "kew.csv")
+    registry.load_columns(old, ["day", "rainfall"])
+    new = registry.register(spool("oxford", days=300), "oxford.csv")
+    registry.load_columns(new, ["day", "rainfall"])
+
+    assert old["dataset_id"] not in registry and not os.path.exists(old["path"])
+    assert new["dataset_id"] in registry and registry.stats()["bytes"] <= 5_000
+
+
+def test_duplicate_uploads_reuse_the_first_entry(spool):
+    registry = DatasetRegistry(max_entries=4, max_bytes=0)
+    uploads = [spool("kew") for _ in range(6)]
+    entries = []
+    threads = [threading.Thread(target=lambda u=u: entries.append(registry.register(u, "kew.csv"))) for u in uploads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(registry) == 1
+    winner = registry.get(uploads[0]["sha256"])
+    assert all(entry is winner for entry in entries)
+    assert [os.path.exists(u["path"]) for u in uploads].count(True) == 1
+    assert os.path.exists(winner["path"])
@@ -0,0 +1,125 @@
+"""
+Screening many (features, targets, degree) specs against one dataset.
+
+Specs are grouped into families by feature set and degree, so each polynomial
+expansion is planned once and expanded block by block. Within a family, specs
+whose columns leave the same rows after dropping missing values also share one
+X^T X: all of their targets are accumulated together and every spec solves
+from its own slice.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .chunked import cv_scores, linear_model, solve_split, split_stats
+from .polynomial import plan_expansion
+
+
+def plan_batch(specs: Sequence[Dict[str, Any]], valid_counts: Dict[str, int]):
+    """Resolve each spec's usable columns and group the fittable ones into families.
+
+    Returns ``(items, families)``: one item per spec, in spec order (items that
+    cannot be fitted carry an ``error``), and lists of items sharing
+    ``(x_columns, degree)``.
+    """
+    items: List[Dict[str, Any]] = []
+    families: Dict[Tuple[Tuple[str, ...], int], List[Dict[str, Any]]] = {}
+    for i, spec in enumerate(specs):
+        kept_x = [c for c in spec["x_columns"] if valid_counts[c] > 0]
+        item = {
+            "spec": i,
+            "x_columns": kept_x,
+            "y_columns": list(spec["y_columns"]),
+            "degree": int(spec["degree"]),
+            "ignored_x_columns": [c for c in spec["x_columns"] if c not in kept_x],
+        }
+        empty_y = [c for c in item["y_columns"] if valid_counts[c] == 0]
+        if not kept_x:
+            item["error"] = "No valid numeric X columns after sanitization."
+        elif empty_y:
+            item["error"] = f"Target column '{empty_y[0]}' has no valid numeric values after sanitization."
+        else:
+            families.setdefault((tuple(kept_x), item["degree"]), []).append(item)
+        items.append(item)
+    return items, list(families.values())
+
+
+def fit_family(work: pd.DataFrame, family: Sequence[Dict[str, Any]], plot_rows: int = 0, cv_folds: int = 0) -> List[Dict[str, Any]]:
+    """Fit every item of one family on the sanitized float frame ``work``.
+
+    Accuracies are held-out R^2 on the hashed split used by the other fits
+    (in-sample when there are too few rows); with ``cv_folds`` each result also
+    carries k-fold ``cv`` scores as ``(means, stds)``. With ``plot_rows`` each
+    result also carries evenly spaced rows of its base features and targets for plotting.
+    """
+    x_cols, degree = family[0]["x_columns"], family[0]["degree"]
+    X_base = work[x_cols].to_numpy()
+    x_valid = ~np.isnan(X_base).any(axis=1)
+    poly = plan_expansion(len(x_cols), degree) if degree > 1 else None
+    feature_names = poly.feature_names(x_cols) if poly is not None else list(x_cols)
+
+    # Items whose target columns have the same missing rows share one row mask
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for item in family:
+        missing = tuple(c for c in item["y_columns"] if work[c].hasnans)
+        groups.setdefault(missing, []).append(item)
+
+    results = []
+    for missing, items in groups.items():
+        mask = x_valid.copy()
+        for c in missing:
+            mask &= work[c].notna().to_numpy()
+        targets = list(dict.fromkeys(c for item in items for c in item["y_columns"]))
+        Xm = X_base[mask]
+        Ym = work[targets].to_numpy()[mask]
+        rows = int(mask.sum())
+        if rows < 2:
+            for item in items:
+                results.append({**item, "error": "Not enough valid rows after sanitization to fit a model."})
+            continue
+
+        train, test, folds = split_stats(Xm, Ym, poly, cv_folds)
+        plot_idx = np.unique(np.linspace(0, rows - 1, min(plot_rows, rows)).astype(np.int64)) if plot_rows > 0 else None
+        for item in items:
+            idx = [targets.index(c) for c in item["y_columns"]]
+            item_train, item_test = train.select(idx), test.select(idx)
+            coef, intercept, accuracies, holdout = solve_split(item_train, item_test)
+            lr = linear_model(coef, intercept)
+            result = {
+                **item,
+                "linear": lr,
+                "poly": poly,
+                "feature_names": feature_names,
+                "coef": coef,
+                "intercept": intercept,
+                "accuracies": accuracies,
+                "holdout": holdout,
+                "train_stats": item_train,
+                "test_stats": item_test,
+                "rows": rows,
+                "dropped_rows": len(work) - rows,
+            }
+            if folds:
+                result["cv"] = cv_scores([fold.select(idx) for fold in folds])
+            if plot_idx is not None:
+                result["plot_X"] = Xm[plot_idx]
+                result["plot_Y"] = Ym[plot_idx][:, idx]
+            results.append(result)
+    return results
+
+
+def fit_families(work: pd.DataFrame, families: Sequence[Sequence[Dict[str, Any]]], plot_rows: int = 0, cv_folds: int = 0) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for family in families:
+        results.extend(fit_family(work, family, plot_rows, cv_folds))
+    return results
+
+
+def rank_key(result: Dict[str, Any]):
+    """Sort key: fitted specs by mean k-fold R^2 if available, else mean accuracy
+    (best first), then failed specs in spec order."""
+    if "error" in result:
+        return (1, 0.0, result["spec"])
+    scores = result["cv"][0] if "cv" in result else result["accuracies"]
+    return (0, -float(np.mean(scores)), result["spec"])
@@ -0,0 +1,614 @@
+"""
+Out-of-core least squares: row chunks are folded into normal equations so a
+fit never needs the whole design matrix in memory.
+
+Features and targets are shifted and scaled with the statistics of the first
+chunk before X^T X and X^T Y are accumulated, which keeps the Gram matrix well
+conditioned for polynomial terms. Rows go to the train or test side of the
+held-out split by hashing their global row index, so the split is
+deterministic and does not depend on the chunk size.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from .families import FAMILIES, LOG_TARGET, FamilySums, family_shift, log_target_sse, needs_second_pass, sum_scores
+from .moments import PowerSums, group_power_sums, power_matrix, scale_feature
+from .polynomial import ExpansionTooWide, PolynomialExpansion, plan_expansion
+from .sklearn_fluent import _with_families, candidate_degrees, power_sum_details
+from ..data.sanitize import sanitize_numeric
+from ...core.settings import BOOTSTRAP_GROUPS, BOOTSTRAP_MAX_BYTES
+
+HOLDOUT_FRACTION = 0.2
+_SPLIT_SEED = 0x9E3779B97F4A7C15
+_SAMPLE_SEED = 0xD1B54A32D192ED03
+_FOLD_SEED = 0x632BE59BD9B4E019
+MAX_CV_FOLDS = 20
+# Rows added by later updates are indexed from ``batch << _BATCH_SHIFT`` so they never collide
+_BATCH_SHIFT = 40
+# Largest degree the single-feature search can pick (see ``candidate_degrees``)
+_MAX_SEARCH_DEGREE = 3
+# Fewest row groups worth resampling for bootstrap intervals
+_MIN_BOOTSTRAP_GROUPS = 20
+
+
+class FitInputError(ValueError):
+    """The selected columns cannot produce a model; the message is shown to the user."""
+
+
+def row_hash(rows: np.ndarray, seed: int) -> np.ndarray:
+    """splitmix64 of global row indices, so a row hashes the same in any chunk."""
+    z = np.asarray(rows, dtype=np.uint64) + np.uint64(seed)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def holdout_mask(rows: np.ndarray, fraction: float = HOLDOUT_FRACTION) -> np.ndarray:
+    """True for the global row indices that belong to the held-out test set."""
+    return (row_hash(rows, _SPLIT_SEED) >> np.uint64(11)) < np.uint64(int(fraction * (1 << 53)))
+
+
+def fold_ids(rows: np.ndarray, folds: int) -> np.ndarray:
+    """Cross-validation fold (0..folds-1) of each global row index."""
+    return (row_hash(rows, _FOLD_SEED) % np.uint64(folds)).astype(np.int64)
+
+
+def bootstrap_groups(width: int) -> int:
+    """Row groups to accumulate for bootstrap intervals on a design of ``width``
+    columns, or 0 when too few of them fit in ``BOOTSTRAP_MAX_BYTES``."""
+    groups = min(BOOTSTRAP_GROUPS, BOOTSTRAP_MAX_BYTES // (8 * (width + 1) ** 2))
+    return int(groups) if groups >= _MIN_BOOTSTRAP_GROUPS else 0
+
+
+class NormalEquations:
+    """Running X^T X, X^T Y and Y^T Y for ``[1, (X - shift) / scale]`` and ``Y - y_shift``."""
+
+    def __init__(self, shift: np.ndarray, scale: np.ndarray, y_shift: np.ndarray):
+        self.shift = np.asarray(shift, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.y_shift = np.asarray(y_shift, dtype=float)
+        p, t = len(self.shift), len(self.y_shift)
+        self.gram = np.zeros((p + 1, p + 1))
+        self.xty = np.zeros((p + 1, t))
+        self.yty = np.zeros(t)
+        self.n = 0
+
+    @classmethod
+    def from_sample(cls, X: np.ndarray, Y: np.ndarray) -> "NormalEquations":
+        """Empty accumulator whose basis is standardised on the rows ``X``, ``Y``."""
+        scale = X.std(axis=0)
+        scale[~np.isfinite(scale) | (scale == 0)] = 1.0
+        return cls(X.mean(axis=0), scale, Y.mean(axis=0))
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(a.nbytes for a in (self.gram, self.xty, self.yty, self.shift, self.scale, self.y_shift)))
+
+    def empty_like(self) -> "NormalEquations":
+        return NormalEquations(self.shift, self.scale, self.y_shift)
+
+    def update(self, X: np.ndarray, Y: np.ndarray) -> None:
+        if len(X) == 0:
+            return
+        A = np.empty((len(X), len(self.shift) + 1))
+        A[:, 0] = 1.0
+        np.divide(X - self.shift, self.scale, out=A[:, 1:])
+        Yc = Y - self.y_shift
+        self.gram += A.T @ A
+        self.xty += A.T @ Yc
+        self.yty += np.einsum('ij,ij->j', Yc, Yc)
+        self.n += len(X)
+
+    def select(self, targets: Sequence[int]) -> "NormalEquations":
+        """Accumulator for a subset of the targets; X^T X is shared, not recomputed."""
+        idx = list(targets)
+        subset = NormalEquations(self.shift, self.scale, self.y_shift[idx])
+        subset.gram = self.gram.copy()
+        subset.xty = self.xty[:, idx].copy()
+        subset.yty = self.yty[idx].copy()
+        subset.n = self.n
+        return subset
+
+    def subset(self, features: Sequence[int]) -> "NormalEquations":
+        """Accumulator for a subset of the features (indices into ``shift``), as if
+        only those columns had been accumulated."""
+        idx = list(features)
+        keep = [0] + [i + 1 for i in idx]
+        subset = NormalEquations(self.shift[idx], self.scale[idx], self.y_shift)
+        subset.gram = self.gram[np.ix_(keep, keep)].copy()
+        subset.xty = self.xty[keep].copy()
+        subset.yty = self.yty.copy()
+        subset.n = self.n
+        return subset
+
+    def __add__(self, other: "NormalEquations") -> "NormalEquations":
+        total = self.empty_like()
+        total.gram = self.gram + other.gram
+        total.xty = self.xty + other.xty
+        total.yty = self.yty + other.yty
+        total.n = self.n + other.n
+        return total
+
+    def __sub__(self, other: "NormalEquations") -> "NormalEquations":
+        """Downdate: the statistics of these rows without ``other``'s (a subset of them)."""
+        rest = self.empty_like()
+        rest.gram = self.gram - other.gram
+        rest.xty = self.xty - other.xty
+        rest.yty = self.yty - other.yty
+        rest.n = self.n - other.n
+        return rest
+
+    def solve(self) -> np.ndarray:
+        """Coefficients in the standardised basis, one column per target."""
+        return np.linalg.lstsq(self.gram, self.xty, rcond=None)[0]
+
+    def r2(self, beta: np.ndarray) -> List[float]:
+        """R^2 per target of ``beta`` (from ``solve``, possibly of other rows) on these rows."""
+        if self.n == 0:
+            return [float('nan')] * len(self.yty)
+        sse = self.yty - 2.0 * np.einsum('ij,ij->j', beta, self.xty) + np.einsum('ij,ik,kj->j', beta, self.gram, beta)
+        sst = self.yty - self.xty[0] ** 2 / self.n
+        scores = []
+        for res, tot in zip(np.maximum(sse, 0.0), sst):
+            scores.append(float(1.0 - res / tot) if tot > 0 else 0.0)
+        return scores
+
+    def coefficients(self, beta: np.ndarray):
+        """``(coef, intercept)`` in the original units: coef is (targets, features)."""
+        coef = (beta[1:] / self.scale[:, None]).T
+        intercept = beta[0] + self.y_shift - coef @ self.shift
+        return coef, intercept
+
+
+def batch_rows(batch: int, count: int) -> np.ndarray:
+    """Global row indices for the ``count`` rows of update number ``batch`` (0 is the initial fit)."""
+    return np.arange(count, dtype=np.int64) + (int(batch) << _BATCH_SHIFT)
+
+
+def fold_rows(train: NormalEquations, test: NormalEquations, X: np.ndarray, Y: np.ndarray, rows: np.ndarray) -> None:
+    """Add rows to the train or test accumulator according to their hashed global index."""
+    is_test = holdout_mask(rows)
+    train.update(X[~is_test], Y[~is_test])
+    test.update(X[is_test], Y[is_test])
+
+
+def fold_cv(folds: Sequence[NormalEquations], X: np.ndarray, Y: np.ndarray, rows: np.ndarray) -> None:
+    """Add rows to the cross-validation fold accumulators according to their hashed global index."""
+    ids = fold_ids(rows, len(folds))
+    for f, fold in enumerate(folds):
+        in_fold = ids == f
+        fold.update(X[in_fold], Y[in_fold])
+
+
+def fold_expanded(
+    train: NormalEquations,
+    test: NormalEquations,
+    X_base: np.ndarray,
+    Y: np.ndarray,
+    rows: np.ndarray,
+    poly: Optional[PolynomialExpansion],
+    folds: Sequence[NormalEquations] = (),
+    groups: Sequence[NormalEquations] = (),
+) -> None:
+    """``fold_rows`` (and ``fold_cv`` into ``folds`` and bootstrap ``groups`` when
+    given) on the expansion of ``X_base``, built one row block at a time."""
+    step = poly.block_rows() if poly is not None else max(len(X_base), 1)
+    for start in range(0, len(X_base), step):
+        block = slice(start, start + step)
+        X = poly.transform(X_base[block]) if poly is not None else X_base[block]
+        fold_rows(train, test, X, Y[block], rows[block])
+        for parts in (folds, groups):
+            if parts:
+                fold_cv(parts, X, Y[block], rows[block])
+
+
+def split_stats(X: np.ndarray, Y: np.ndarray, poly: Optional[PolynomialExpansion] = None, cv_folds: int = 0):
+    """Train/test accumulators for in-memory rows, so the model can be updated later.
+
+    With ``poly``, ``X`` holds the base features and is expanded block by block.
+    Returns ``(train, test, folds)``; ``folds`` holds ``cv_folds`` accumulators
+    for ``cv_scores`` (empty when ``cv_folds`` is 0).
+    """
+    first = X if poly is None else poly.transform(X[:poly.block_rows()])
+    train = NormalEquations.from_sample(first, Y[:len(first)])
+    test = train.empty_like()
+    folds = [train.empty_like() for _ in range(cv_folds)]
+    fold_expanded(train, test, X, Y, batch_rows(0, len(X)), poly, folds)
+    return train, test, folds
+
+
+def cv_scores(folds: Sequence[NormalEquations], solve: Optional[Callable[[NormalEquations], np.ndarray]] = None):
+    """Mean and standard deviation over folds of the held-out R^2, per target.
+
+    Each fold is scored with the solution for all other folds, obtained by
+    downdating the total statistics instead of refitting. ``solve`` maps
+    statistics to coefficients (least squares by default).
+    """
+    solve = solve or NormalEquations.solve
+    total = sum(folds[1:], folds[0])
+    scores = np.array([fold.r2(solve(total - fold)) for fold in folds if fold.n > 0])
+    return scores.mean(axis=0).tolist(), scores.std(axis=0).tolist()
+
+
+def solve_split(train: NormalEquations, test: NormalEquations):
+    """Solve on all rows; score on the held-out rows when both sides can support it.
+
+    Returns ``(coef, intercept, accuracies, holdout)``.
+    """
+    full = train + test
+    holdout = test.n >= 2 and train.n >= full.gram.shape[0]
+    accuracies = test.r2(train.solve()) if holdout else full.r2(full.solve())
+    coef, intercept = full.coefficients(full.solve())
+    return coef, intercept, accuracies, holdout
+
+
+def linear_model(coef: np.ndarray, intercept: np.ndarray) -> LinearRegression:
+    """A fitted ``LinearRegression`` carrying externally solved coefficients."""
+    lr = LinearRegression()
+    lr.coef_ = np.asarray(coef, dtype=float)
+    lr.intercept_ = np.asarray(intercept, dtype=float)
+    lr.n_features_in_ = lr.coef_.shape[-1]
+    return lr
+
+
+def _complete_rows(work: pd.DataFrame, x_cols: Sequence[str], y_cols: Sequence[str], start: int):
+    """``(X, Y, global row indices)`` of the rows of sanitized ``work`` with every column
+    present; ``start`` is the global index of its first row."""
+    valid = work[list(x_cols) + list(y_cols)].notna().all(axis=1).to_numpy()
+    return work[list(x_cols)].to_numpy()[valid], work[list(y_cols)].to_numpy()[valid], np.arange(start, start + len(valid))[valid]
+
+
+def _add_parts(current: List[Any], parts: Sequence[Any]) -> List[Any]:
+    """Element-wise sum of accumulated statistics and a chunk's (``None`` before the first chunk)."""
+    return [part if total is None else total + part for total, part in zip(current, parts)]
+
+
+def _valid_columns(frames: Iterable[pd.DataFrame], x_cols: List[str], y_cols: List[str]) -> List[str]:
+    """The X columns with a numeric value in some chunk.
+
+    Counts are summed over chunks until every column has a value, which is
+    usually after the first chunk; a column missing from it is looked for in
+    the rest before it is dropped. Raises ``FitInputError`` when no X column or
+    some target has a numeric value.
+    """
+    counts = dict.fromkeys(x_cols + y_cols, 0)
+    for chunk in frames:
+        for column, count in sanitize_numeric(chunk[x_cols + y_cols])[1].items():
+            counts[column] += count
+        if all(counts.values()):
+            break
+    kept_x = [c for c in x_cols if counts[c] > 0]
+    if not kept_x:
+        raise FitInputError("No valid numeric X columns after sanitization. Please select different columns.")
+    for yc in y_cols:
+        if counts[yc] == 0:
+            raise FitInputError(f"Target column '{yc}' has no valid numeric values after sanitization.")
+    return kept_x
+
+
+def _scoring_parts(rows: np.ndarray, scoring: str, cv_folds: int) -> np.ndarray:
+    """Part of the rows each global row index is scored in: its fold, 0 for held-out
+    rows (-1, unscored, for training rows) or 0 for every row in-sample."""
+    if scoring == "folds":
+        return fold_ids(rows, cv_folds)
+    if scoring == "holdout":
+        return np.where(holdout_mask(rows), 0, -1)
+    return np.zeros(len(rows), dtype=np.int64)
+
+
+class _Sample:
+    """Deterministic bottom-k sample of rows by hash, used to draw plots."""
+
+    def __init__(self, size: int):
+        self.size = max(0, int(size))
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.X: Optional[np.ndarray] = None
+        self.Y: Optional[np.ndarray] = None
+
+    def offer(self, keys: np.ndarray, X: np.ndarray, Y: np.ndarray) -> None:
+        if self.size == 0 or len(keys) == 0:
+            return
+        if self.X is not None:
+            keys, X, Y = np.concatenate([self.keys, keys]), np.vstack([self.X, X]), np.vstack([self.Y, Y])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size - 1)[:self.size]
+            keys, X, Y = keys[keep], X[keep], Y[keep]
+        self.keys, self.X, self.Y = keys, X, Y
+
+
+def fit_chunks(
+    open_frames: Callable[[], Iterable[pd.DataFrame]],
+    x_cols: Sequence[str],
+    y_cols: Sequence[str],
+    degree: int = 1,
+    sample_rows: int = 5000,
+    cv_folds: int = 0,
+    degree_search: bool = True,
+    bootstrap: bool = False,
+) -> Dict[str, Any]:
+    """Fit ``y_cols`` on ``x_cols`` from the raw row chunks ``open_frames()`` yields.
+
+    Mirrors the in-memory analysis: chunks are sanitized, rows with missing
+    values are dropped and features are expanded to ``degree`` (pruned to
+    the term budget, see ``plan_expansion``) one row block at a time. X columns
+    without any numeric value are ignored. A single
+    feature with a single target at degree 1 runs the req_details degree
+    search on power sums instead, unless ``degree_search`` is off; the
+    transformed families are searched on ``FamilySums`` alongside, with a
+    second pass over the chunks when exp or power must be scored. With ``cv_folds``, rows are also accumulated
+    per fold: the degree search is scored by k-fold R^2 and other fits report
+    it under ``cv`` as ``(means, stds)``. With ``bootstrap``, rows are also
+    accumulated per hashed row group for ``intervals`` and returned under
+    ``groups``. Single-feature fits return their full ``power_sums`` and the
+    ``scaling`` (center, scale, y offset) they were taken in, the
+    ``family_sums`` (and ``family_groups`` with ``bootstrap``) of the families
+    and the ``single_stats`` of the chosen model (see ``single_feature_stats``).
+
+    Raises ``FitInputError`` when the columns cannot produce a model.
+    """
+    x_cols, y_cols = list(x_cols), list(y_cols)
+    kept_x = _valid_columns(open_frames(), x_cols, y_cols)
+    poly: Optional[PolynomialExpansion] = None
+    single = False
+    stats = None
+    center = scale = y_offset = 0.0
+    sample = _Sample(sample_rows)
+    raw_rows = used_rows = 0
+
+    for chunk in open_frames():
+        work = sanitize_numeric(chunk[x_cols + y_cols])[0]
+        X_base, Y, index = _complete_rows(work, kept_x, y_cols, raw_rows)
+        raw_rows += len(work)
+        if len(Y) == 0:
+            continue
+        used_rows += len(Y)
+
+        if stats is None:
+            single = degree_search and len(kept_x) == 1 and len(y_cols) == 1 and degree <= 1
+            if single:
+                x0 = X_base[:, 0]
+                center = float(x0.mean())
+                scale = float(np.max(np.abs(x0 - center))) or 1.0
+                y_offset = float(Y[:, 0].mean())
+                groups = BOOTSTRAP_GROUPS if bootstrap else 0
+                stats = {
+                    "sides": [None, None],
+                    "folds": [None] * cv_folds,
+                    "groups": [None] * groups,
+                    "family_shift": family_shift(x0, Y[:, 0]),
+                    "family_sides": [None, None],
+                    "family_folds": [None] * cv_folds,
+                    "family_groups": [None] * groups,
+                }
+            else:
+                if degree > 1:
+                    try:
+                        poly = plan_expansion(len(kept_x), degree)
+                    except ExpansionTooWide as e:
+                        raise FitInputError(str(e))
+                X0 = poly.transform(X_base[:poly.block_rows()]) if poly is not None else X_base
+                base = NormalEquations.from_sample(X0, Y[:len(X0)])
+                groups = bootstrap_groups(X0.shape[1]) if bootstrap else 0
+                if bootstrap and not groups:
+                    raise FitInputError("The model has too many terms for bootstrap intervals; use confidence=analytic.")
+                stats = {
+                    "train": base,
+                    "test": base.empty_like(),
+                    "folds": [base.empty_like() for _ in range(cv_folds)],
+                    "groups": [base.empty_like() for _ in range(groups)],
+                }
+
+        if single:
+            x0, y0, shift = X_base[:, 0], Y[:, 0], stats["family_shift"]
+            powers = power_matrix((x0 - center) / scale, _MAX_SEARCH_DEGREE)
+            y_centered = y0 - y_offset
+            sides = holdout_mask(index).astype(np.int64)
+            stats["sides"] = _add_parts(stats["sides"], group_power_sums(powers, y_centered, sides, 2, _MAX_SEARCH_DEGREE))
+            stats["family_sides"] = _add_parts(stats["family_sides"], FamilySums.grouped(x0, y0, sides, 2, shift))
+            if cv_folds:
+                ids = fold_ids(index, cv_folds)
+                for f, fold in enumerate(stats["folds"]):
+                    part = PowerSums.from_powers(powers[ids == f], y_centered[ids == f], _MAX_SEARCH_DEGREE)
+                    stats["folds"][f] = part if fold is None else fold + part
+                stats["family_folds"] = _add_parts(stats["family_folds"], FamilySums.grouped(x0, y0, ids, cv_folds, shift))
+            if bootstrap:
+                ids = fold_ids(index, BOOTSTRAP_GROUPS)
+                parts = group_power_sums(powers, y_centered, ids, BOOTSTRAP_GROUPS, _MAX_SEARCH_DEGREE)
+                stats["groups"] = _add_parts(stats["groups"], parts)
+                stats["family_groups"] = _add_parts(stats["family_groups"], FamilySums.grouped(x0, y0, ids, BOOTSTRAP_GROUPS, shift))
+        else:
+            fold_expanded(stats["train"], stats["test"], X_base, Y, index, poly, stats["folds"], stats["groups"])
+        sample.offer(row_hash(index, _SAMPLE_SEED), X_base, Y)
+
+    if used_rows < 2:
+        raise FitInputError("Not enough valid rows after sanitization to fit a model.")
+
+    result: Dict[str, Any] = {
+        "x_columns": kept_x,
+        "ignored_x_columns": [c for c in x_cols if c not in kept_x],
+        "rows": used_rows,
+        "dropped_rows": raw_rows - used_rows,
+        "single_feature": single,
+        "sample_X": sample.X,
+        "sample_Y": sample.Y,
+    }
+    if single:
+        train, test = stats["sides"]
+        full = train + test
+        family_train, family_test = stats["family_sides"]
+        family_full = family_train + family_test
+        degrees = candidate_degrees(used_rows)
+        use_folds = bool(cv_folds) and used_rows >= 2 * cv_folds
+        # Families are scored on the same rows as the degrees, each part with the fit
+        # to the rows it is held out from.
+        if use_folds:
+            scoring = "folds"
+            details = power_sum_details(full, degrees, center, scale, y_offset, fold_stats=stats["folds"])
+            family_parts = stats["family_folds"]
+            family_fits = [(family_full - part).fit() for part in family_parts]
+        elif used_rows > 50 and test.n >= 2:
+            scoring = "holdout"
+            details = power_sum_details(full, degrees, center, scale, y_offset, train, test)
+            family_parts, family_fits = [family_test], [family_train.fit()]
+        else:
+            scoring = "in_sample"
+            details = power_sum_details(full, degrees, center, scale, y_offset)
+            family_parts, family_fits = [family_full], [family_full.fit()]
+        if 'error' in details:
+            raise FitInputError(details['error'])
+        log_sse = None
+        if needs_second_pass(family_full):
+            log_sse = np.zeros((len(family_parts), len(FAMILIES)))
+            start = 0
+            for chunk in open_frames():
+                work = sanitize_numeric(chunk[x_cols + y_cols])[0]
+                X_base, Y, index = _complete_rows(work, kept_x, y_cols, start)
+                start += len(work)
+                log_sse += log_target_sse(X_base[:, 0], Y[:, 0], _scoring_parts(index, scoring, cv_folds), family_fits)
+        family_scores = sum_scores(family_parts, family_fits, log_sse, folds=use_folds)
+        details = _with_families(details, family_full, family_scores)
+        if details["is_polynomial"]:
+            single_stats = {"degree": details["degree"], "scaling": (center, scale, y_offset), "train": train, "test": test}
+        elif details["family"] not in LOG_TARGET:
+            single_stats = {"family": details["family"], "shift": family_full.shift, "train": family_train, "test": family_test}
+        else:
+            single_stats = None
+        result.update({
+            "details": details,
+            "power_sums": full,
+            "scaling": (center, scale, y_offset),
+            "family_sums": family_full,
+            "single_stats": single_stats,
+        })
+        if bootstrap:
+            result["groups"] = stats["groups"]
+            result["family_groups"] = stats["family_groups"]
+        return result
+
+    train, test = stats["train"], stats["test"]
+    coef, intercept, accuracies, holdout = solve_split(train, test)
+    feature_names = poly.feature_names(kept_x) if poly is not None else kept_x
+    result.update({
+        "poly": poly,
+        "feature_names": feature_names,
+        "coef": coef,
+        "intercept": intercept,
+        "accuracies": accuracies,
+        "holdout": holdout,
+        "train_stats": train,
+        "test_stats": test,
+    })
+    if cv_folds:
+        result["folds"] = stats["folds"]
+        result["cv"] = cv_scores(stats["folds"])
+    if bootstrap:
+        result["groups"] = stats["groups"]
+    return result
+
+
+def update_chunks(
+    frames: Iterable[pd.DataFrame],
+    base_cols: Sequence[str],
+    y_cols: Sequence[str],
+    poly: Optional[PolynomialExpansion],
+    template: NormalEquations,
+    batch: int,
+) -> Dict[str, Any]:
+    """Accumulate new rows for an existing model in fresh accumulators shaped like ``template``.
+
+    Only the new rows are read; the caller adds the returned ``train_stats``
+    and ``test_stats`` to the stored ones. Rows with a missing feature or
+    target are skipped.
+    """
+    base_cols, y_cols = list(base_cols), list(y_cols)
+    train, test = template.empty_like(), template.empty_like()
+    raw_rows = 0
+    for chunk in frames:
+        work = sanitize_numeric(chunk[base_cols + y_cols])[0]
+        X_base, Y, rows = _complete_rows(work, base_cols, y_cols, (int(batch) << _BATCH_SHIFT) + raw_rows)
+        raw_rows += len(work)
+        if len(X_base) == 0:
+            continue
+        fold_expanded(train, test, X_base, Y, rows, poly)
+    return {
+        "train_stats": train,
+        "test_stats": test,
+        "rows": train.n + test.n,
+        "skipped_rows": raw_rows - train.n - test.n,
+    }
+
+
+def single_feature_sides(x: np.ndarray, y: np.ndarray, rows: np.ndarray, single: Dict[str, Any]) -> List[Any]:
+    """Train and test sums of rows of one feature ``x`` and target ``y``, split by their
+    hashed global index, in the basis of the stored ``single`` statistics."""
+    sides = holdout_mask(rows).astype(np.int64)
+    if "degree" in single:
+        center, scale, y_offset = single["scaling"]
+        powers = power_matrix((x - center) / scale, _MAX_SEARCH_DEGREE)
+        return group_power_sums(powers, y - y_offset, sides, 2, _MAX_SEARCH_DEGREE)
+    return FamilySums.grouped(x, y, sides, 2, single["shift"])
+
+
+def single_feature_stats(x: np.ndarray, y: np.ndarray, details: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Statistics a single-feature model keeps for partial fits, from its in-memory rows.
+
+    A polynomial keeps the train/test ``PowerSums`` of its feature with the
+    ``degree`` and ``scaling`` they were taken in; a log or reciprocal fit the
+    ``FamilySums`` of its transformed columns with their ``shift``. Exp and
+    power fits are scored in the units of y, which their sums cannot give, so
+    they keep nothing (None).
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if details["is_polynomial"]:
+        center, scale = scale_feature(x)[1:]
+        single = {"degree": details["degree"], "scaling": (center, scale, float(y.mean()))}
+    elif details["family"] not in LOG_TARGET:
+        single = {"family": details["family"], "shift": family_shift(x, y)}
+    else:
+        return None
+    single["train"], single["test"] = single_feature_sides(x, y, batch_rows(0, len(y)), single)
+    return single
+
+
+def update_single_feature(
+    frames: Iterable[pd.DataFrame], base_cols: Sequence[str], y_cols: Sequence[str], single: Dict[str, Any], batch: int,
+) -> Dict[str, Any]:
+    """``update_chunks`` for a single-feature model: sums of the new rows shaped like ``single``'s."""
+    base_cols, y_cols = list(base_cols), list(y_cols)
+    sides: List[Any] = [None, None]
+    raw_rows = 0
+    for chunk in frames:
+        work = sanitize_numeric(chunk[base_cols + y_cols])[0]
+        X_base, Y, rows = _complete_rows(work, base_cols, y_cols, (int(batch) << _BATCH_SHIFT) + raw_rows)
+        raw_rows += len(work)
+        if len(Y) == 0:
+            continue
+        sides = _add_parts(sides, single_feature_sides(X_base[:, 0], Y[:, 0], rows, single))
+    rows = sum(side.n for side in sides if side is not None)
+    return {"train_stats": sides[0], "test_stats": sides[1], "rows": rows, "skipped_rows": raw_rows - rows}
+
+
+def refit_single_feature(single: Dict[str, Any], train, test):
+    """Re-solve a single-feature model on its ``train`` and ``test`` sums.
+
+    Returns ``(details, holdout)``: the ``req_details``-style description of
+    the model refitted to all rows, its accuracy taken on the test rows when
+    both sides can support it (in-sample otherwise). Raises ``FitInputError``
+    when a row falls outside the domain of a transformed family.
+    """
+    full = train + test
+    if "degree" in single:
+        degree = single["degree"]
+        holdout = test.n >= 2 and train.n > degree
+        sides = (train, test) if holdout else (None, None)
+        return power_sum_details(full, [degree], *single["scaling"], *sides), holdout
+    family = single["family"]
+    if family not in full.families:
+        raise FitInputError(f"The new rows are outside the domain of the {family} model.")
+    holdout = test.n >= 2 and train.n >= 2
+    a, b = (train if holdout else full).fit()
+    accuracy = (test if holdout else full).r2(a, b)[FAMILIES.index(family)]
+    return full.details(family, accuracy), holdout
@@ -0,0 +1,325 @@
+"""
+Transformed model families for the single-feature search.
+
+Besides polynomials in x, ``req_details`` tries curves that are linear after
+transforming x, y or both:
+
+    log         y = a*ln(x) + b      needs x > 0
+    reciprocal  y = a/x + b          needs x != 0
+    exp         y = b*e^(a*x)        fitted as ln(y) = a*x + ln(b), needs y > 0
+    power       y = b*x^a            fitted as ln(y) = a*ln(x) + ln(b), needs x, y > 0
+
+ln(x), 1/x and ln(y) are computed once for all rows. Each family is one
+(u, v) column pair of a shared design, so all candidates are fitted together
+with column-wise simple-regression sums and scored by the R^2 of their
+predictions in the original units of y, on the same split or folds as the
+polynomial degrees.
+
+``FamilySums`` holds the same simple-regression sums for rows streamed in
+chunks. They add up across chunks and splits, and give the R^2 of the log and
+reciprocal families exactly. Exp and power predict exp(v), whose squared error
+is not a function of the sums, so a streamed search scores them with
+``log_target_sse`` in a second pass over the rows.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FAMILIES = ("log", "reciprocal", "exp", "power")
+_COLUMNS = {"log": ("ln_x", "y"), "reciprocal": ("inv_x", "y"), "exp": ("x", "ln_y"), "power": ("ln_x", "ln_y")}
+LOG_TARGET = ("exp", "power")
+
+
+def curve(family: str, a: float, b: float, x: np.ndarray) -> np.ndarray:
+    """Values of a fitted family at ``x`` (``a`` is the slope or exponent, ``b`` the
+    intercept or multiplier); non-finite where ``x`` is outside its domain."""
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if family == "log":
+            return a * np.log(x) + b
+        if family == "reciprocal":
+            return a / x + b
+        if family == "exp":
+            return b * np.exp(a * x)
+        if family == "power":
+            return b * np.power(x, a)
+    raise ValueError(f"Unknown model family: {family}")
+
+
+def family_function(family: str, a: float, b: float) -> str:
+    """Equation in the ``req_details`` format, e.g. ``f(x): 2.0ln(x) + 1.5``."""
+    if family in LOG_TARGET:
+        body = f"{round(b, 4)}e^({round(a, 4)}x)" if family == "exp" else f"{round(b, 4)}x^{round(a, 4)}"
+    else:
+        term = "ln(x)" if family == "log" else "/x"
+        sign = "+" if b >= 0 else "-"
+        body = f"{round(a, 4)}{term} {sign} {round(abs(b), 4)}"
+    return "f(x): " + body
+
+
+def family_details(family: str, slope: float, intercept: float, accuracy: float) -> Dict[str, Any]:
+    """``req_details``-style description of a fitted family; ``intercept`` is the
+    fitted intercept of v, so ln(b) for exp and power."""
+    offset = float(np.exp(intercept)) if family in LOG_TARGET else float(intercept)
+    term = {"log": "ln(x)", "reciprocal": "1/x", "exp": "x", "power": "ln(x)"}[family]
+    return {
+        "function": family_function(family, float(slope), offset),
+        "accuracy": float(accuracy),
+        "coefficients": [float(slope)],
+        "intercept": offset,
+        "is_polynomial": False,
+        "degree": 1,
+        "family": family,
+        "feature_names": [term],
+    }
+
+
+def _r2(ss_res: np.ndarray, ss_tot: float) -> np.ndarray:
+    """R^2 from residual sums of squares, like sklearn's r2_score; -inf where not finite."""
+    if ss_tot <= 0.0:
+        scores = np.where(ss_res <= 0.0, 1.0, 0.0)
+    else:
+        scores = 1.0 - ss_res / ss_tot
+    return np.where(np.isfinite(scores), scores, -np.inf)
+
+
+class FamilyDesign:
+    """The transformed columns of one feature and target, shared by every family."""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        columns = {"x": x, "y": y}
+        if len(x) and (x > 0).all():
+            columns["ln_x"] = np.log(x)
+        if len(x) and (x != 0).all():
+            columns["inv_x"] = 1.0 / x
+        if len(y) and (y > 0).all():
+            columns["ln_y"] = np.log(y)
+        self.families: List[str] = [f for f in FAMILIES if all(c in columns for c in _COLUMNS[f])]
+        self.U = np.column_stack([columns[_COLUMNS[f][0]] for f in self.families]) if self.families else np.empty((len(x), 0))
+        self.V = np.column_stack([columns[_COLUMNS[f][1]] for f in self.families]) if self.families else np.empty((len(x), 0))
+        self.log_target = np.array([f in LOG_TARGET for f in self.families], dtype=bool)
+        self.y = y
+
+    def fit(self, rows: Optional[np.ndarray] = None):
+        """Slopes and intercepts of every family on ``rows`` (all rows by default)."""
+        U = self.U if rows is None else self.U[rows]
+        V = self.V if rows is None else self.V[rows]
+        mean_u, mean_v = U.mean(axis=0), V.mean(axis=0)
+        du = U - mean_u
+        sxx = np.einsum('ij,ij->j', du, du)
+        sxy = np.einsum('ij,ij->j', du, V - mean_v)
+        a = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+        return a, mean_v - a * mean_u
+
+    def r2(self, a: np.ndarray, b: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """R^2 of every family's predictions in the units of y (sklearn's r2_score)."""
+        U = self.U if rows is None else self.U[rows]
+        y = self.y if rows is None else self.y[rows]
+        with np.errstate(over='ignore', invalid='ignore'):
+            pred = U * a + b
+            pred[:, self.log_target] = np.exp(pred[:, self.log_target])
+            ss_res = ((y[:, None] - pred) ** 2).sum(axis=0)
+        return _r2(ss_res, float(((y - y.mean()) ** 2).sum()) if len(y) else 0.0)
+
+    def score(self, train: Optional[np.ndarray] = None, test: Optional[np.ndarray] = None,
+              fold_of: Optional[np.ndarray] = None, folds: int = 0) -> List[Dict[str, Any]]:
+        """Score every family like ``power_sum_details`` scores degrees: mean k-fold
+        R^2 with ``fold_of``, held-out R^2 with ``train``/``test``, else in-sample."""
+        if not self.families:
+            return []
+        if fold_of is not None:
+            per_fold = np.array([
+                self.r2(*self.fit(fold_of != f), fold_of == f) for f in range(folds) if (fold_of == f).any()
+            ])
+            return [
+                {"family": f, "r2": float(per_fold[:, i].mean()), "std_r2": float(per_fold[:, i].std())}
+                for i, f in enumerate(self.families)
+            ]
+        scores = self.r2(*self.fit(train), test) if test is not None else self.r2(*self.fit())
+        return [{"family": f, "r2": float(s)} for f, s in zip(self.families, scores)]
+
+    def columns(self, family: str):
+        """``(u, v, log_target)``: the columns ``family`` is fitted on, and whether v is ln(y)."""
+        i = self.families.index(family)
+        return self.U[:, i], self.V[:, i], bool(self.log_target[i])
+
+    def details(self, family: str, accuracy: float) -> Dict[str, Any]:
+        """``req_details``-style description of ``family`` fitted to all rows.
+
+        ``coefficients`` holds the slope or exponent ``a`` and ``intercept`` the
+        intercept or multiplier ``b`` (see ``curve``).
+        """
+        i = self.families.index(family)
+        a, b = self.fit()
+        return family_details(family, a[i], b[i], accuracy)
+
+
+def _all_columns(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``(U, V, defined)`` for every family in ``FAMILIES`` order: the (u, v) columns,
+    zero on rows outside a family's domain, and whether all rows are inside it."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns = {"x": x, "y": y, "ln_x": np.log(x), "inv_x": 1.0 / x, "ln_y": np.log(y)}
+    defined = {"x": True, "y": True, "ln_x": bool((x > 0).all()), "inv_x": bool((x != 0).all()), "ln_y": bool((y > 0).all())}
+    U = np.column_stack([columns[_COLUMNS[f][0]] for f in FAMILIES])
+    V = np.column_stack([columns[_COLUMNS[f][1]] for f in FAMILIES])
+    ok = np.array([defined[_COLUMNS[f][0]] and defined[_COLUMNS[f][1]] for f in FAMILIES], dtype=bool)
+    finite = np.isfinite(U) & np.isfinite(V)
+    return np.where(finite, U, 0.0), np.where(finite, V, 0.0), ok
+
+
+class FamilySums:
+    """Simple-regression sums of every family's (u, v) columns over a set of rows.
+
+    Columns are summed shifted by ``shift`` (``(u_shift, v_shift, y_shift)``,
+    see ``family_shift``), which every part of one fit must share. Arrays are
+    indexed like ``FAMILIES``; ``ok`` is False for a family whose columns are
+    undefined on some row.
+    """
+
+    __slots__ = ("n", "ok", "shift", "su", "sv", "suu", "suv", "svv", "sy", "syy")
+
+    def __init__(self, n, ok, shift, su, sv, suu, suv, svv, sy, syy):
+        self.n = int(n)
+        self.ok = ok
+        self.shift = shift
+        self.su, self.sv, self.suu, self.suv, self.svv = su, sv, suu, suv, svv
+        self.sy = float(sy)
+        self.syy = float(syy)
+
+    @classmethod
+    def grouped(cls, x: np.ndarray, y: np.ndarray, ids: np.ndarray, groups: int, shift) -> List["FamilySums"]:
+        """Sums of every row group (``ids`` in 0..groups-1), one ``bincount`` per column."""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        U, V, ok = _all_columns(x, y)
+        du, dv, dy = U - shift[0], V - shift[1], y - shift[2]
+
+        def sums(weights):
+            return np.bincount(ids, weights=weights, minlength=groups)
+        columns = [np.column_stack([sums(w[:, k]) for k in range(len(FAMILIES))]) for w in (du, dv, du * du, du * dv, dv * dv)]
+        n, sy, syy = np.bincount(ids, minlength=groups), sums(dy), sums(dy * dy)
+        return [cls(n[g], ok, shift, *(c[g] for c in columns), sy[g], syy[g]) for g in range(groups)]
+
+    def __add__(self, other: "FamilySums") -> "FamilySums":
+        return FamilySums(
+            self.n + other.n, self.ok & other.ok, self.shift, self.su + other.su, self.sv + other.sv,
+            self.suu + other.suu, self.suv + other.suv, self.svv + other.svv, self.sy + other.sy, self.syy + other.syy,
+        )
+
+    def __sub__(self, other: "FamilySums") -> "FamilySums":
+        return FamilySums(
+            self.n - other.n, self.ok, self.shift, self.su - other.su, self.sv - other.sv,
+            self.suu - other.suu, self.suv - other.suv, self.svv - other.svv, self.sy - other.sy, self.syy - other.syy,
+        )
+
+    @property
+    def families(self) -> List[str]:
+        return [f for f, ok in zip(FAMILIES, self.ok) if ok] if self.n else []
+
+    def fit(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Slopes and intercepts of v on u for every family (like ``FamilyDesign.fit``)."""
+        n = max(self.n, 1)
+        mean_u, mean_v = self.su / n, self.sv / n
+        sxx = self.suu - self.su * mean_u
+        sxy = self.suv - self.su * mean_v
+        a = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+        return a, self.shift[1] + mean_v - a * (self.shift[0] + mean_u)
+
+    def r2(self, a: np.ndarray, b: np.ndarray, log_sse: Optional[np.ndarray] = None) -> np.ndarray:
+        """R^2 in the units of y of every family's ``a``, ``b`` on these rows.
+
+        The squared errors of log and reciprocal come from the sums; those of exp
+        and power must be passed in ``log_sse`` (see ``log_target_sse``) and are
+        -inf without it.
+        """
+        if self.n == 0:
+            return np.full(len(FAMILIES), np.nan)
+        c = b + a * self.shift[0] - self.shift[1]
+        ss_res = (self.svv - 2.0 * a * self.suv + a * a * self.suu
+                  - 2.0 * c * (self.sv - a * self.su) + self.n * c * c)
+        log_target = np.isin(FAMILIES, LOG_TARGET)
+        ss_res = np.where(log_target, np.inf if log_sse is None else log_sse, np.maximum(ss_res, 0.0))
+        return _r2(ss_res, self.syy - self.sy * self.sy / self.n)
+
+    def details(self, family: str, accuracy: float) -> Dict[str, Any]:
+        """Like ``FamilyDesign.details``, from these sums."""
+        i = FAMILIES.index(family)
+        a, b = self.fit()
+        return family_details(family, a[i], b[i], accuracy)
+
+
+def family_shift(x: np.ndarray, y: np.ndarray):
+    """Column means of the first rows streamed, to shift every ``FamilySums`` of a fit by."""
+    U, V, _ = _all_columns(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    y = np.asarray(y, dtype=float)
+    return U.mean(axis=0), V.mean(axis=0), float(y.mean()) if len(y) else 0.0
+
+
+def needs_second_pass(sums: FamilySums) -> bool:
+    """Whether ``sums`` admit a family that ``log_target_sse`` must score."""
+    return any(f in LOG_TARGET for f in sums.families)
+
+
+def log_target_sse(x: np.ndarray, y: np.ndarray, ids: np.ndarray, fits: Sequence[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+    """Squared errors in the units of y of the exp and power fits, per scoring group.
+
+    Row ``r`` is predicted with ``fits[ids[r]]`` (a ``FamilySums.fit`` result);
+    rows with a negative id are skipped. Returns a (groups, families) array,
+    zero for the other families.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    U = _all_columns(x, y)[0]
+    keep = ids >= 0
+    U, y, ids = U[keep], y[keep], ids[keep]
+    sse = np.zeros((len(fits), len(FAMILIES)))
+    for i, family in enumerate(FAMILIES):
+        if family not in LOG_TARGET:
+            continue
+        a = np.array([fit[0][i] for fit in fits])[ids]
+        b = np.array([fit[1][i] for fit in fits])[ids]
+        with np.errstate(over='ignore', invalid='ignore'):
+            residuals = (y - np.exp(U[:, i] * a + b)) ** 2
+        sse[:, i] = np.bincount(ids, weights=residuals, minlength=len(fits))
+    return sse
+
+
+def sum_scores(parts: Sequence[FamilySums], fits, log_sse: Optional[np.ndarray] = None, folds: bool = False) -> List[Dict[str, Any]]:
+    """``FamilyDesign.score`` from sums: each of ``parts`` scored with its entry of
+    ``fits`` and ``log_sse``; the mean and spread over them when ``folds``. Exp
+    and power are left out without ``log_sse``."""
+    if not parts:
+        return []
+    families = [
+        f for f in sum(parts[1:], parts[0]).families if log_sse is not None or f not in LOG_TARGET
+    ]
+    scores = np.array([
+        part.r2(a, b, None if log_sse is None else log_sse[g])
+        for g, (part, (a, b)) in enumerate(zip(parts, fits)) if part.n > 0
+    ])
+    if not len(scores):
+        return []
+    ranked = []
+    for f in families:
+        i = FAMILIES.index(f)
+        with np.errstate(invalid='ignore'):
+            entry = {"family": f, "r2": float(scores[:, i].mean())}
+            if folds:
+                entry["std_r2"] = float(scores[:, i].std())
+        ranked.append(entry)
+    return ranked
+
+
+class CurveModel:
+    """``LinearRegression``-like predictor for a fitted family, for stored single-feature models."""
+
+    def __init__(self, family: str, a: float, b: float):
+        self.family = family
+        self.coef_ = np.array([[float(a)]])
+        self.intercept_ = np.array([float(b)])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=float).reshape(len(X), -1)
+        return curve(self.family, self.coef_[0, 0], self.intercept_[0], X[:, 0])[:, None]
@@ -0,0 +1,216 @@
+"""
+Confidence intervals for least-squares coefficients from sufficient statistics.
+
+The analytic intervals assume independent rows with constant noise variance:
+the covariance of the coefficients is sigma^2 (X^T X)^-1 with sigma^2 estimated
+from the residual sum of squares, and bounds use Student's t. They are read
+off the same statistics as the fit, so they cost one pseudo-inverse of X^T X.
+
+The bootstrap makes no such assumption and still never revisits the rows.
+Rows are hashed into groups whose statistics are accumulated alongside the
+fit. A resample is a vector of multinomial counts over the groups, so its
+X^T X and X^T y are count-weighted sums of the group statistics: a batch of
+resamples is one matrix product and one stacked solve. The groups hold
+randomly assigned rows and are independent, so resampling them estimates
+the sampling distribution of the coefficients like resampling rows does.
+Batches are drawn until the requested number of resamples or the time
+budget is reached; the intervals are the percentiles of the draws.
+
+Both apply to any statistics whose solution maps linearly onto the reported
+coefficients: ``NormalEquations`` and the ``PowerSums`` of a single-feature
+polynomial. Intervals for a transformed family (see ``families``) are taken
+on its transformed columns, from the rows or from its ``FamilySums``.
+"""
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from scipy import stats as st
+
+from .chunked import FitInputError, NormalEquations, batch_rows, bootstrap_groups, fold_ids, split_stats
+from .families import FAMILIES, FamilyDesign, FamilySums
+from .moments import PowerSums, group_power_sums, unscale_coefficients
+from ...core.settings import BOOTSTRAP_BUDGET_MS, BOOTSTRAP_GROUPS, BOOTSTRAP_SAMPLES
+
+CONFIDENCE_METHODS = ("analytic", "bootstrap")
+# Largest resamples x width^2 solved in one stacked call
+_BATCH_ELEMENTS = 1 << 22
+
+
+def _normal_map(stats: NormalEquations):
+    """``(M, offset)`` with ``[intercept, coef...] = M @ beta`` plus ``offset`` on the intercept."""
+    inv = 1.0 / stats.scale
+    M = np.zeros((len(inv) + 1, len(inv) + 1))
+    M[0, 0] = 1.0
+    M[0, 1:] = -stats.shift * inv
+    M[1:, 1:] = np.diag(inv)
+    return M, stats.y_shift
+
+
+def _power_map(degree: int, center: float, scale: float, y_offset: float):
+    """``_normal_map`` for the power sums basis u = (x - center) / scale."""
+    columns = []
+    for e in np.eye(degree + 1):
+        intercept, coef = unscale_coefficients(e, center, scale, 0.0)
+        columns.append(np.concatenate([[intercept], coef]))
+    return np.column_stack(columns), np.array([y_offset])
+
+
+def _result(method: str, level: float, se: np.ndarray, lower: np.ndarray, upper: np.ndarray, **extra) -> Dict[str, Any]:
+    """Split (intercept + coefficients) x targets arrays into the per-part fields."""
+    return {
+        "method": method,
+        "level": level,
+        **extra,
+        "coef_se": se[1:].T,
+        "coef_lower": lower[1:].T,
+        "coef_upper": upper[1:].T,
+        "intercept_se": se[0],
+        "intercept_lower": lower[0],
+        "intercept_upper": upper[0],
+    }
+
+
+def _analytic(gram, xty, yty, n: int, beta, M, offset, level: float) -> Dict[str, Any]:
+    cov = np.linalg.pinv(gram)
+    dof = max(n - np.linalg.matrix_rank(gram), 1)
+    rss = yty - 2.0 * np.einsum('ij,ij->j', beta, xty) + np.einsum('ij,ik,kj->j', beta, gram, beta)
+    sigma = np.sqrt(np.maximum(rss, 0.0) / dof)
+    params = M @ beta
+    params[0] += offset
+    se = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', M, cov, M), 0.0))[:, None] * sigma[None, :]
+    t = float(st.t.ppf(0.5 + level / 2.0, dof))
+    return _result("analytic", level, se, params - t * se, params + t * se, dof=int(dof))
+
+
+def _bootstrap(grams, xtys, M, offset, level: float, samples: int, seed: int = 0) -> Dict[str, Any]:
+    """Percentile intervals over resamples of the group statistics ``grams`` (groups x p x p)
+    and ``xtys`` (groups x p x targets)."""
+    groups, width = grams.shape[0], grams.shape[1]
+    flat_gram, flat_xty = grams.reshape(groups, -1), xtys.reshape(groups, -1)
+    per_batch = max(1, min(samples, _BATCH_ELEMENTS // (width * width)))
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + BOOTSTRAP_BUDGET_MS / 1000.0
+    draws, done = [], 0
+    while done < samples and (done < 2 or time.perf_counter() < deadline):
+        count = min(per_batch, samples - done)
+        weights = rng.multinomial(groups, np.full(groups, 1.0 / groups), size=count).astype(float)
+        gram = (weights @ flat_gram).reshape(count, width, width)
+        xty = (weights @ flat_xty).reshape(count, width, -1)
+        try:
+            beta = np.linalg.solve(gram, xty)
+        except np.linalg.LinAlgError:
+            beta = np.linalg.pinv(gram) @ xty
+        params = np.einsum('qp,bpt->bqt', M, beta)
+        params[:, 0] += offset
+        draws.append(params)
+        done += count
+    draws = np.concatenate(draws)
+    tail = (1.0 - level) / 2.0
+    lower, upper = np.quantile(draws, [tail, 1.0 - tail], axis=0)
+    return _result("bootstrap", level, draws.std(axis=0, ddof=1), lower, upper, samples=int(done), groups=int(groups))
+
+
+def analytic_intervals(stats: NormalEquations, beta: np.ndarray, level: float = 0.95) -> Dict[str, Any]:
+    """Two-sided ``level`` intervals for ``stats.coefficients(beta)``.
+
+    Returns ``method``, ``level``, the residual degrees of freedom and, per
+    target, the standard errors and lower/upper bounds of the coefficients
+    (targets x features) and of the intercepts, in the original units.
+    """
+    M, offset = _normal_map(stats)
+    return _analytic(stats.gram, stats.xty, stats.yty, stats.n, beta, M, offset, level)
+
+
+def bootstrap_intervals(groups: Sequence[NormalEquations], level: float = 0.95, samples: int = BOOTSTRAP_SAMPLES) -> Dict[str, Any]:
+    """Like ``analytic_intervals`` from resampling row-group statistics (which sum
+    to the fitted ones); also returns the ``samples`` drawn and the ``groups``."""
+    M, offset = _normal_map(groups[0])
+    grams = np.stack([g.gram for g in groups])
+    xtys = np.stack([g.xty for g in groups])
+    return _bootstrap(grams, xtys, M, offset, level, samples)
+
+
+def coefficient_intervals(stats: NormalEquations, groups: Optional[Sequence[NormalEquations]], confidence: Dict[str, Any]) -> Dict[str, Any]:
+    """Intervals for the least-squares fit on ``stats`` as ``confidence`` asks:
+    ``{"method", "level", "samples"}``; the bootstrap needs the ``groups``."""
+    if confidence["method"] == "bootstrap":
+        return bootstrap_intervals(groups, confidence["level"], confidence["samples"])
+    return analytic_intervals(stats, stats.solve(), confidence["level"])
+
+
+def row_intervals(X: np.ndarray, Y: np.ndarray, confidence: Dict[str, Any]) -> Dict[str, Any]:
+    """``coefficient_intervals`` for least squares of ``Y`` on in-memory rows ``X``.
+
+    Raises ``FitInputError`` when ``X`` is too wide to bootstrap.
+    """
+    groups = bootstrap_groups(X.shape[1]) if confidence["method"] == "bootstrap" else 0
+    if confidence["method"] == "bootstrap" and not groups:
+        raise FitInputError("The model has too many terms for bootstrap intervals; use confidence=analytic.")
+    train, test, parts = split_stats(X, Y, cv_folds=groups)
+    return coefficient_intervals(train + test, parts, confidence)
+
+
+def row_power_sums(powers: np.ndarray, y: np.ndarray, max_degree: int, confidence: Dict[str, Any]):
+    """Power sums of in-memory rows in the hashed row groups the bootstrap resamples
+    (a single group for analytic intervals)."""
+    groups = BOOTSTRAP_GROUPS if confidence["method"] == "bootstrap" else 1
+    return group_power_sums(powers, y, fold_ids(batch_rows(0, len(y)), groups), groups, max_degree)
+
+
+def power_sum_intervals(
+    groups: Sequence[PowerSums], degree: int, center: float, scale: float, y_offset: float, confidence: Dict[str, Any],
+) -> Dict[str, Any]:
+    """``coefficient_intervals`` for the degree-``degree`` polynomial of ``power_sum_details``,
+    from the power sums of the row groups."""
+    M, offset = _power_map(degree, center, scale, y_offset)
+    if confidence["method"] == "bootstrap":
+        grams, xtys = zip(*(g.gram(degree) for g in groups))
+        return _bootstrap(np.stack(grams), np.stack(xtys)[:, :, None], M, offset, confidence["level"], confidence["samples"])
+    full = sum(groups[1:], groups[0])
+    gram, xty = full.gram(degree)
+    beta = np.linalg.lstsq(gram, xty, rcond=None)[0]
+    return _analytic(gram, xty[:, None], np.array([full.syy]), full.n, beta[:, None], M, offset, confidence["level"])
+
+
+def family_intervals(design: FamilyDesign, family: str, confidence: Dict[str, Any]) -> Dict[str, Any]:
+    """``coefficient_intervals`` for a transformed family fitted by ``design``.
+
+    Exp and power fits are linear in ln(y), so the bounds of their intercept
+    are exponentiated into bounds of the multiplier and its standard error
+    scaled by the multiplier (the delta method).
+    """
+    u, v, log_target = design.columns(family)
+    intervals = row_intervals(u[:, None], v[:, None], confidence)
+    if log_target:
+        _exp_intercept(intervals, design.fit()[1][design.families.index(family)])
+    return intervals
+
+
+def family_sum_intervals(groups: Sequence[FamilySums], family: str, confidence: Dict[str, Any]) -> Dict[str, Any]:
+    """``family_intervals`` from the ``FamilySums`` of the row groups the bootstrap
+    resamples (or of all rows, for analytic intervals)."""
+    parts = [_family_equations(g, family) for g in groups]
+    intervals = coefficient_intervals(sum(parts[1:], parts[0]), parts, confidence)
+    if family in ("exp", "power"):
+        full = sum(groups[1:], groups[0])
+        _exp_intercept(intervals, full.fit()[1][FAMILIES.index(family)])
+    return intervals
+
+
+def _family_equations(sums: FamilySums, family: str) -> NormalEquations:
+    """The normal equations of v on u for one family, read off its sums."""
+    i = FAMILIES.index(family)
+    stats = NormalEquations(sums.shift[0][i:i + 1], np.ones(1), np.array([sums.shift[1][i]]))
+    stats.gram = np.array([[sums.n, sums.su[i]], [sums.su[i], sums.suu[i]]], dtype=float)
+    stats.xty = np.array([[sums.sv[i]], [sums.suv[i]]])
+    stats.yty = np.array([sums.svv[i]])
+    stats.n = sums.n
+    return stats
+
+
+def _exp_intercept(intervals: Dict[str, Any], log_intercept: float) -> None:
+    """Turn intervals on ln(b) into intervals on the multiplier b of an exp or power fit."""
+    intervals["intercept_lower"] = np.exp(intervals["intercept_lower"])
+    intervals["intercept_upper"] = np.exp(intervals["intercept_upper"])
+    intervals["intercept_se"] = intervals["intercept_se"] * float(np.exp(log_intercept))
@@ -0,0 +1,111 @@
+"""
+Sufficient-statistics polynomial regression for a single feature.
+
+All candidate degrees are solved from one set of power sums: with
+u = (x - center) / scale, the Gram matrix of [1, u, ..., u^d] is the Hankel
+matrix of sum(u^k) for k <= 2d and the right-hand side is sum(u^k * y). The
+statistics are additive, so the sums of disjoint row subsets (train / test /
+folds) combine into the full-data statistics without touching the rows again.
+"""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+class PowerSums:
+    """Power sums of a scaled feature ``u`` and a centered target ``y``."""
+
+    __slots__ = ("n", "su", "suy", "sy", "syy")
+
+    def __init__(self, n: int, su: np.ndarray, suy: np.ndarray, sy: float, syy: float):
+        self.n = int(n)
+        self.su = su
+        self.suy = suy
+        self.sy = float(sy)
+        self.syy = float(syy)
+
+    @classmethod
+    def from_powers(cls, powers: np.ndarray, y: np.ndarray, max_degree: int) -> "PowerSums":
+        """``powers`` holds u**k in column k, for k = 0..2*max_degree."""
+        return cls(
+            n=len(y),
+            su=powers.sum(axis=0),
+            suy=powers[:, :max_degree + 1].T @ y,
+            sy=y.sum(),
+            syy=float(y @ y),
+        )
+
+    def __add__(self, other: "PowerSums") -> "PowerSums":
+        return PowerSums(self.n + other.n, self.su + other.su, self.suy + other.suy, self.sy + other.sy, self.syy + other.syy)
+
+    def __sub__(self, other: "PowerSums") -> "PowerSums":
+        return PowerSums(self.n - other.n, self.su - other.su, self.suy - other.suy, self.sy - other.sy, self.syy - other.syy)
+
+    def gram(self, degree: int) -> Tuple[np.ndarray, np.ndarray]:
+        idx = np.arange(degree + 1)
+        return self.su[idx[:, None] + idx[None, :]], self.suy[:degree + 1]
+
+    def solve(self, degree: int) -> np.ndarray:
+        """Least-squares coefficients of [1, u, ..., u^degree] (minimum norm if singular)."""
+        G, b = self.gram(degree)
+        return np.linalg.lstsq(G, b, rcond=None)[0]
+
+    def sse(self, beta: np.ndarray) -> float:
+        G, b = self.gram(len(beta) - 1)
+        return float(max(self.syy - 2.0 * beta @ b + beta @ G @ beta, 0.0))
+
+    def r2(self, beta: np.ndarray) -> float:
+        """Coefficient of determination of ``beta`` on these rows (sklearn's r2_score)."""
+        if self.n == 0:
+            return float('nan')
+        ss_tot = self.syy - self.sy * self.sy / self.n
+        ss_res = self.sse(beta)
+        if ss_tot <= 0.0:
+            return 1.0 if ss_res <= 0.0 else 0.0
+        return 1.0 - ss_res / ss_tot
+
+
+def fold_r2(folds: Sequence[PowerSums], degree: int) -> np.ndarray:
+    """Held-out R^2 of each non-empty fold under the fit to all the other folds.
+
+    The other folds' sums are the total minus the fold (a downdate), so k folds
+    cost k small solves rather than k passes over the rows.
+    """
+    total = sum(folds[1:], folds[0])
+    return np.array([fold.r2((total - fold).solve(degree)) for fold in folds if fold.n > 0])
+
+
+def group_power_sums(powers: np.ndarray, y: np.ndarray, ids: np.ndarray, groups: int, max_degree: int) -> List[PowerSums]:
+    """``PowerSums.from_powers`` of every row group (``ids`` in 0..groups-1), one
+    ``bincount`` per column instead of one masked pass per group."""
+    def sums(weights):
+        return np.bincount(ids, weights=weights, minlength=groups)
+    su = np.column_stack([sums(powers[:, k]) for k in range(powers.shape[1])])
+    suy = np.column_stack([sums(powers[:, k] * y) for k in range(max_degree + 1)])
+    n, sy, syy = np.bincount(ids, minlength=groups), sums(y), sums(y * y)
+    return [PowerSums(n[g], su[g], suy[g], sy[g], syy[g]) for g in range(groups)]
+
+
+def scale_feature(x: np.ndarray) -> Tuple[np.ndarray, float, float]:
+    """Center and scale ``x`` so high powers stay well conditioned."""
+    center = float(np.mean(x)) if len(x) else 0.0
+    scale = float(np.max(np.abs(x - center))) if len(x) else 1.0
+    if not np.isfinite(scale) or scale == 0.0:
+        scale = 1.0
+    return (x - center) / scale, center, scale
+
+
+def power_matrix(u: np.ndarray, max_degree: int) -> np.ndarray:
+    return np.vander(u, 2 * max_degree + 1, increasing=True)
+
+
+def unscale_coefficients(beta: np.ndarray, center: float, scale: float, y_offset: float) -> Tuple[float, np.ndarray]:
+    """Convert coefficients in u = (x - center) / scale back to powers of x.
+
+    Returns ``(intercept, [c_1, ..., c_d])`` for y = intercept + sum(c_k * x^k).
+    """
+    degree = len(beta) - 1
+    poly = np.polynomial.Polynomial(beta)(np.polynomial.Polynomial([-center / scale, 1.0 / scale]))
+    coef = np.zeros(degree + 1)
+    coef[:len(poly.coef)] = poly.coef[:degree + 1]
+    return float(coef[0] + y_offset), coef[1:]
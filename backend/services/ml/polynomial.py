@@ -0,0 +1,119 @@
+"""
+Polynomial feature expansion with an explicit, prunable term list.
+
+``PolynomialFeatures`` always emits every monomial, which at degree 3 or 4 on
+a few dozen columns is far wider than the solver or the process can hold. The
+expansion here knows its width before a single row is expanded. When the full
+width exceeds the term budget it keeps every power of every feature, then adds
+interactions in order of how many features they involve and of their degree
+until the budget is spent. Columns come out in ``PolynomialFeatures`` order, so
+unpruned expansions (and their feature names) are unchanged.
+"""
+from itertools import combinations, islice
+from math import comb
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from ...core.settings import POLY_BLOCK_BYTES, POLY_MAX_TERMS, POLY_PRUNE
+
+
+class ExpansionTooWide(ValueError):
+    """The requested degree cannot be expanded within the term budget; the message is shown to the user."""
+
+
+def expanded_width(n_features: int, degree: int) -> int:
+    """Number of monomials of degree 1..``degree`` in ``n_features`` variables."""
+    return comb(n_features + degree, degree) - 1
+
+
+def _compositions(total: int, parts: int) -> Iterator[Tuple[int, ...]]:
+    """Ordered ways to write ``total`` as ``parts`` positive integers."""
+    for cuts in combinations(range(1, total), parts - 1):
+        bounds = (0,) + cuts + (total,)
+        yield tuple(b - a for a, b in zip(bounds, bounds[1:]))
+
+
+def _terms(n_features: int, degree: int) -> Iterator[Tuple[int, ...]]:
+    """Monomials as sorted tuples of feature indices, fewest distinct features first, then lowest degree."""
+    for k in range(1, min(n_features, degree) + 1):
+        for d in range(k, degree + 1):
+            for features in combinations(range(n_features), k):
+                for exponents in _compositions(d, k):
+                    yield tuple(f for f, e in zip(features, exponents) for _ in range(e))
+
+
+class PolynomialExpansion:
+    """Expands base features into the monomials ``terms`` (sorted tuples of feature indices).
+
+    When a term's parent (the term without its last factor) is also a term,
+    ``transform`` builds its column with one multiplication. Every prefix of
+    ``_terms`` has that property; terms of a ``subset`` may not, and are
+    multiplied out in full.
+    """
+
+    def __init__(self, n_features: int, terms: Sequence[Tuple[int, ...]], full_width: int):
+        self.terms: List[Tuple[int, ...]] = sorted(terms, key=lambda t: (len(t), t))
+        self.n_features_in_ = int(n_features)
+        self.n_output_features_ = len(self.terms)
+        self.full_width = int(full_width)
+        position = {t: i for i, t in enumerate(self.terms)}
+        self._parents = [position.get(t[:-1], -1) for t in self.terms]
+
+    @property
+    def pruned_terms(self) -> int:
+        return self.full_width - self.n_output_features_
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        out = np.empty((len(X), self.n_output_features_), order='F')
+        for j, (term, parent) in enumerate(zip(self.terms, self._parents)):
+            if parent >= 0:
+                np.multiply(out[:, parent], X[:, term[-1]], out=out[:, j])
+            else:
+                out[:, j] = X[:, term[0]]
+                for f in term[1:]:
+                    out[:, j] *= X[:, f]
+        return out
+
+    def subset(self, columns: Sequence[int]) -> "PolynomialExpansion":
+        """Expansion producing only the given output columns, in the same order."""
+        return PolynomialExpansion(self.n_features_in_, [self.terms[i] for i in sorted(columns)], self.full_width)
+
+    def feature_names(self, names: Sequence[str]) -> List[str]:
+        """Names such as ``a``, ``a^2`` and ``a^2*b``, as produced for ``PolynomialFeatures``."""
+        out = []
+        for term in self.terms:
+            factors = []
+            for f in dict.fromkeys(term):
+                power = term.count(f)
+                factors.append(names[f] if power == 1 else f"{names[f]}^{power}")
+            out.append('*'.join(factors))
+        return out
+
+    def block_rows(self) -> int:
+        """Rows per expanded block so a block stays within ``POLY_BLOCK_BYTES``."""
+        return max(1, POLY_BLOCK_BYTES // (8 * self.n_output_features_))
+
+
+def plan_expansion(n_features: int, degree: int, max_terms: int = POLY_MAX_TERMS, prune: bool = POLY_PRUNE) -> PolynomialExpansion:
+    """Expansion of ``n_features`` columns to ``degree``, pruned to ``max_terms`` if allowed.
+
+    Raises ``ExpansionTooWide`` when even the pure powers exceed the budget, or
+    when the full expansion does and pruning is disabled.
+    """
+    width = expanded_width(n_features, degree)
+    if width <= max_terms:
+        return PolynomialExpansion(n_features, list(_terms(n_features, degree)), width)
+    if not prune or n_features * degree > max_terms:
+        raise ExpansionTooWide(
+            f"Degree {degree} on {n_features} features expands to {width} terms, above the limit of "
+            f"{max_terms}. Select fewer X columns or a lower degree."
+        )
+    return PolynomialExpansion(n_features, list(islice(_terms(n_features, degree), max_terms)), width)
+
+
+def design_nbytes(rows: int, n_features: int, degree: int) -> int:
+    """Bytes of the float64 design matrix ``plan_expansion`` would produce for ``rows`` rows."""
+    width = min(expanded_width(n_features, degree), POLY_MAX_TERMS)
+    return int(rows) * width * 8
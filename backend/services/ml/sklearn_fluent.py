@@ -161,9 +161,108 @@ def fluent_it(xlist, ylist):
     """Alias for req function to match the sklearn_fluent library interface"""
     return req(xlist, ylist)
 
-def req_details(xlist, ylist):
+def power_sum_details(full_stats, possible_degrees, center, scale, y_offset, train_stats=None, test_stats=None, fold_stats=None):
+    """Pick the best polynomial degree from power sums and describe it like ``req_details``.
+
+    With ``fold_stats`` (per-fold sums adding up to ``full_stats``) degrees are
+    scored by mean k-fold R^2 and the per-degree mean and standard deviation
+    are returned under ``cv``. Otherwise they are scored on ``test_stats`` with
+    coefficients solved from ``train_stats`` when both are given, or in-sample
+    on ``full_stats``. The winner is solved from ``full_stats``. The sums must
+    be taken over u = (x - center) / scale and y - y_offset (see ``moments``).
+    """
+    from .moments import fold_r2, unscale_coefficients
+
+    best_score = -float('inf')
+    best_degree = 0
+    cv_candidates = []
+    ranking = []
+    for degree in possible_degrees:
+        if fold_stats:
+            scores = fold_r2(fold_stats, degree)
+            current_score = float(scores.mean())
+            cv_candidates.append({"degree": int(degree), "mean_r2": current_score, "std_r2": float(scores.std())})
+        elif test_stats is not None:
+            current_score = test_stats.r2(train_stats.solve(degree))
+        else:
+            current_score = full_stats.r2(full_stats.solve(degree))
+        ranking.append({"family": "linear" if degree == 1 else "polynomial", "degree": int(degree), "r2": float(current_score)})
+        # Relative tolerance keeps the lower degree on round-off ties.
+        if best_degree == 0 or current_score > best_score + 1e-9 * max(1.0, abs(best_score)):
+            best_score = current_score
+            best_degree = degree
+
+    if best_degree == 0:
+        return {"error": "Could not determine a suitable model."}
+
+    intercept, coef_arr = unscale_coefficients(full_stats.solve(best_degree), center, scale, y_offset)
+    coef = coef_arr.tolist()
+    feature_terms = ['x' if k == 1 else f'x^{k}' for k in range(1, best_degree + 1)]
+
+    # Build display equation (ascending powers order maintained)
+    equation_parts = []
+    for i, c in enumerate(coef):
+        term = feature_terms[i]
+        if i == 0:
+            equation_parts.append(f"{round(c, 4)}{term}")
+        else:
+            sign = "+" if c >= 0 else "-"
+            equation_parts.append(f"{sign} {round(abs(c), 4)}{term}")
+    intercept_sign = "+" if intercept >= 0 else "-"
+    equation_parts.append(f"{intercept_sign} {round(abs(intercept), 4)}")
+    function_str = "f(x): " + " ".join(equation_parts)
+
+    details = {
+        "function": function_str,
+        "accuracy": float(best_score),
+        "coefficients": coef,
+        "intercept": intercept,
+        "is_polynomial": True,
+        "degree": int(best_degree),
+        "family": "linear" if best_degree == 1 else "polynomial",
+        "feature_names": feature_terms,
+        "families": sorted(ranking, key=lambda c: -c["r2"]),
+    }
+    if fold_stats:
+        details["cv"] = {"folds": len(fold_stats), "candidates": cv_candidates}
+    return details
+
+def _with_families(details, design, family_scores):
+    """Swap in the best transformed family if it beats the polynomial, and rank all candidates."""
+    if "error" in details or not family_scores:
+        return details
+    ranking = sorted(details["families"] + family_scores, key=lambda c: -c["r2"])
+    best = max(family_scores, key=lambda c: c["r2"])
+    score = details["accuracy"]
+    cv = details.get("cv")
+    if cv is not None:
+        cv["candidates"] += [{"family": c["family"], "mean_r2": c["r2"], "std_r2": c["std_r2"]} for c in family_scores]
+    if best["r2"] > score + 1e-9 * max(1.0, abs(score)):
+        details = design.details(best["family"], best["r2"])
+        if cv is not None:
+            details["cv"] = cv
+    details["families"] = ranking
+    return details
+
+def candidate_degrees(n_points):
+    """Polynomial degrees the single-feature search tries for ``n_points`` rows."""
+    return [degree for degree, needed in ((1, 2), (2, 3), (3, 4)) if n_points >= needed]
+
+def req_details(xlist, ylist, cv_folds=0, confidence=None):
     """Return detailed model info in addition to the formatted function string.
 
+    With ``cv_folds`` >= 2 a single feature's degree is chosen by k-fold
+    cross-validation and ``cv`` holds the mean and standard deviation of R^2
+    for every candidate degree; ``accuracy`` is then the winner's mean.
+
+    A single feature is also fitted with the log, reciprocal, exp and power
+    families (see ``families``), scored on the same split or folds; one of them
+    replaces the polynomial only if it scores strictly higher. ``families``
+    ranks every candidate by score.
+
+    With ``confidence`` (``{"method", "level", "samples"}``, see ``intervals``)
+    the model also gets ``intervals`` on its coefficients.
+
     Response keys:
     - function: str (formatted equation)
     - accuracy: float (0..1)
@@ -171,22 +270,18 @@ def req_details(xlist, ylist):
     - intercept: float
     - is_polynomial: bool
     - degree: int (0 for multi-linear, otherwise polynomial degree)
+    - family: str (single feature: linear, polynomial, log, reciprocal, exp or power)
     - feature_names: List[str] (terms like ['x', 'x^2'] or ['a','b','c'])
     """
     from sklearn.linear_model import LinearRegression
-    from sklearn.preprocessing import PolynomialFeatures
-    from sklearn.pipeline import make_pipeline
     from sklearn.model_selection import train_test_split
     import numpy as np
+    from .families import FamilyDesign
+    from .moments import PowerSums, power_matrix, scale_feature
 
     x_arr = np.array(xlist)
     y_arr = np.array(ylist)
 
-    best_model = None
-    best_score = -float('inf')
-    best_degree = 0
-    final_poly_feature_names = None
-
     is_single_feature = False
     if x_arr.ndim == 1:
         is_single_feature = True
@@ -198,69 +293,46 @@ def req_details(xlist, ylist):
         x_processed_linear = x_arr
 
     if is_single_feature:
-        possible_degrees = []
-        if len(y_arr) >= 2: possible_degrees.append(1)
-        if len(y_arr) >= 3: possible_degrees.append(2)
-        if len(y_arr) >= 4: possible_degrees.append(3)
-        if not possible_degrees and len(y_arr) >= 2:
-            possible_degrees.append(1)
-        elif not possible_degrees:
+        possible_degrees = candidate_degrees(len(y_arr))
+        if not possible_degrees:
             return {"error": "Not enough data points to fit a model."}
 
-        for degree in possible_degrees:
-            current_pipeline = make_pipeline(
-                PolynomialFeatures(degree=degree, include_bias=False),
-                LinearRegression()
-            )
-            score_on_test = len(y_arr) > 50
-            if score_on_test:
-                x_train, x_test, y_train, y_test = train_test_split(
-                    x_processed_for_poly, y_arr, test_size=0.2, random_state=42
-                )
-                current_pipeline.fit(x_train, y_train)
-                current_score = current_pipeline.score(x_test, y_test)
-            else:
-                current_pipeline.fit(x_processed_for_poly, y_arr)
-                current_score = current_pipeline.score(x_processed_for_poly, y_arr)
-            if current_score > best_score:
-                best_score = current_score
-                best_degree = degree
-                if score_on_test:
-                    current_pipeline.fit(x_processed_for_poly, y_arr)
-                best_model = current_pipeline
+        # Every candidate degree is solved from one set of power sums
+        # (sum u^k for k <= 2*max_degree, sum u^k*y for k <= max_degree), so the
+        # rows are touched once instead of once per degree and split.
+        max_degree = possible_degrees[-1]
+        x_flat = x_processed_for_poly.reshape(-1).astype(float)
+        y_flat = y_arr.reshape(len(y_arr), -1)[:, 0].astype(float)
+        u, center, scale = scale_feature(x_flat)
+        y_offset = float(y_flat.mean())
+        y_centered = y_flat - y_offset
+        powers = power_matrix(u, max_degree)
+        design = FamilyDesign(x_flat, y_flat)
 
-        if best_model is None:
-            return {"error": "Could not determine a suitable model."}
-
-        final_poly_feature_names = best_model.named_steps['polynomialfeatures'].get_feature_names_out()
-        # Convert names to human-friendly terms
-        feature_terms = [name.replace('x0', 'x').replace('^1', '') for name in final_poly_feature_names]
-        lr = best_model.named_steps['linearregression']
-        coef = lr.coef_.ravel().tolist()
-        intercept = float(lr.intercept_) if not isinstance(lr.intercept_, np.ndarray) else float(lr.intercept_[0])
-
-        # Build display equation (ascending powers order maintained)
-        equation_parts = []
-        for i, c in enumerate(coef):
-            term = feature_terms[i]
-            if i == 0:
-                equation_parts.append(f"{round(c, 4)}{term}")
+        if cv_folds >= 2 and len(y_arr) >= 2 * cv_folds:
+            fold_of = np.random.default_rng(42).permutation(len(y_arr)) % cv_folds
+            folds = [PowerSums.from_powers(powers[fold_of == f], y_centered[fold_of == f], max_degree) for f in range(cv_folds)]
+            details = power_sum_details(sum(folds[1:], folds[0]), possible_degrees, center, scale, y_offset, fold_stats=folds)
+            family_scores = design.score(fold_of=fold_of, folds=cv_folds)
+        elif len(y_arr) > 50:
+            train_idx, test_idx = train_test_split(np.arange(len(y_arr)), test_size=0.2, random_state=42)
+            train_stats = PowerSums.from_powers(powers[train_idx], y_centered[train_idx], max_degree)
+            test_stats = PowerSums.from_powers(powers[test_idx], y_centered[test_idx], max_degree)
+            details = power_sum_details(train_stats + test_stats, possible_degrees, center, scale, y_offset, train_stats, test_stats)
+            family_scores = design.score(train_idx, test_idx)
+        else:
+            full_stats = PowerSums.from_powers(powers, y_centered, max_degree)
+            details = power_sum_details(full_stats, possible_degrees, center, scale, y_offset)
+            family_scores = design.score()
+        details = _with_families(details, design, family_scores)
+        if confidence and "error" not in details:
+            from .intervals import family_intervals, power_sum_intervals, row_power_sums
+            if details["is_polynomial"]:
+                groups = row_power_sums(powers, y_centered, max_degree, confidence)
+                details["intervals"] = power_sum_intervals(groups, details["degree"], center, scale, y_offset, confidence)
             else:
-                sign = "+" if c >= 0 else "-"
-                equation_parts.append(f"{sign} {round(abs(c), 4)}{term}")
-        intercept_sign = "+" if intercept >= 0 else "-"
-        equation_parts.append(f"{intercept_sign} {round(abs(intercept), 4)}")
-        function_str = "f(x): " + " ".join(equation_parts)
-
-        return {
-            "function": function_str,
-            "accuracy": float(best_score),
-            "coefficients": coef,
-            "intercept": intercept,
-            "is_polynomial": True,
-            "degree": int(best_degree),
-            "feature_names": feature_terms,
-        }
+                details["intervals"] = family_intervals(design, details["family"], confidence)
+        return details
 
     # Multi-linear case
     lr = LinearRegression()
@@ -278,6 +350,10 @@ def req_details(xlist, ylist):
 
     coef = lr.coef_.ravel().tolist()
     intercept = float(lr.intercept_) if not isinstance(lr.intercept_, np.ndarray) else float(lr.intercept_[0])
+    intervals = None
+    if confidence:
+        from .intervals import row_intervals
+        intervals = row_intervals(x_processed_linear.astype(float), y_arr.reshape(len(y_arr), -1).astype(float), confidence)
     letters = list('abcdefghijklmnopqrstuvwxyz')
     feature_terms = [letters[i % len(letters)] for i in range(len(coef))]
     equation_parts = []
@@ -291,7 +367,7 @@ def req_details(xlist, ylist):
     equation_parts.append(f"{intercept_sign} {round(abs(intercept), 4)}")
     function_str = "f(x): " + " ".join(equation_parts)
 
-    return {
+    details = {
         "function": function_str,
         "accuracy": float(best_score),
         "coefficients": coef,
@@ -300,3 +376,6 @@ def req_details(xlist, ylist):
         "degree": 0,
         "feature_names": feature_terms,
     }
+    if intervals is not None:
+        details["intervals"] = intervals
+    return details
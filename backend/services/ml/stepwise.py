@@ -0,0 +1,128 @@
+"""
+Forward stepwise selection of model terms from normal equations.
+
+Selection runs on the training side of a ``NormalEquations`` split, so it
+applies to in-memory and streamed fits alike and never touches the rows
+again. The intercept is always in the model. Each step adds the term that
+most reduces the residual sum of squares, summed over targets relative to
+each target's variance, so multi-target models share one set of terms.
+
+Adding a term extends the Cholesky factor of the selected X^T X by one row:
+with W = L^-1 X_S^T X and u = L^-1 X_S^T y kept for every candidate column,
+the residual reduction each candidate would bring and the factor's next row
+are O(p) updates, so a step costs O(k p) rather than a refit per candidate.
+
+The path stops on the held-out R^2 of the test side or, without one, on BIC,
+once the criterion has not improved for a few steps. The best model on the
+path is kept.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.linalg import solve_triangular
+
+from .chunked import NormalEquations, solve_split
+from .polynomial import PolynomialExpansion
+
+SELECTION_METHODS = ("forward",)
+SELECTION_CRITERIA = ("auto", "holdout", "bic")
+_PATIENCE = 5
+_COLLINEAR = 1e-10
+
+
+def _r2(stats: NormalEquations, columns: Sequence[int], beta: np.ndarray) -> List[float]:
+    """``stats.r2`` for coefficients on the given columns of the basis only."""
+    if stats.n == 0:
+        return [float('nan')] * len(stats.yty)
+    gram = stats.gram[np.ix_(columns, columns)]
+    xty = stats.xty[columns]
+    sse = stats.yty - 2.0 * np.einsum('ij,ij->j', beta, xty) + np.einsum('ij,ik,kj->j', beta, gram, beta)
+    sst = stats.yty - stats.xty[0] ** 2 / stats.n
+    return [float(1.0 - r / s) if s > 0 else 0.0 for r, s in zip(np.maximum(sse, 0.0), sst)]
+
+
+def forward_stepwise(train: NormalEquations, test: NormalEquations, max_terms: int, criterion: str = "auto") -> Dict[str, Any]:
+    """Forward selection over the features of ``train`` (indices into its ``shift``).
+
+    ``criterion`` is ``holdout`` (mean held-out R^2 over targets), ``bic`` or
+    ``auto`` (holdout when the test side has rows). Returns a dict with the
+    ``selected`` feature indices (in selection order), the ``criterion`` used and
+    the ``path``: one entry per step with the feature added, the train R^2 and
+    the held-out R^2 or BIC.
+    """
+    if criterion == "auto":
+        criterion = "holdout" if test.n >= 2 else "bic"
+    G, c, n = train.gram, train.xty, max(train.n, 1)
+    size = G.shape[0]
+    steps = max(0, min(int(max_terms), size - 1, train.n - 2))
+
+    W = np.zeros((steps + 1, size))
+    u = np.zeros((steps + 1, c.shape[1]))
+    W[0] = G[0] / np.sqrt(n)
+    u[0] = c[0] / np.sqrt(n)
+    diag = np.diag(G).copy()
+    residual_var = diag - W[0] ** 2
+    residual_xty = c - np.outer(W[0], u[0])
+    sst = np.maximum(train.yty - u[0] ** 2, 1e-300)
+    available = residual_var > _COLLINEAR * np.maximum(diag, 1e-300)
+    available[0] = False
+
+    selected: List[int] = [0]
+    path: List[Dict[str, Any]] = []
+    best_score, best_step, stale = -np.inf, 0, 0
+    for k in range(1, steps + 1):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain = np.where(available, (residual_xty ** 2 / sst).sum(axis=1) / residual_var, -np.inf)
+        j = int(np.argmax(gain))
+        if not np.isfinite(gain[j]):
+            break
+
+        pivot = np.sqrt(residual_var[j])
+        W[k] = (G[j] - W[:k, j] @ W[:k]) / pivot
+        u[k] = residual_xty[j] / pivot
+        residual_var -= W[k] ** 2
+        residual_xty -= np.outer(W[k], u[k])
+        selected.append(j)
+        available[j] = False
+        available &= residual_var > _COLLINEAR * np.maximum(diag, 1e-300)
+
+        # W[:, selected] is the transpose of the Cholesky factor of X_S^T X_S
+        beta = solve_triangular(W[:k + 1, selected], u[:k + 1], lower=False)
+        rss = np.maximum(train.yty - (u[:k + 1] ** 2).sum(axis=0), 1e-300)
+        step = {"feature": j - 1, "train_r2": (1.0 - rss / sst).tolist()}
+        if criterion == "holdout":
+            step["holdout_r2"] = _r2(test, selected, beta)
+            score = float(np.mean(step["holdout_r2"]))
+        else:
+            step["bic"] = float(np.sum(n * np.log(rss / n)) + len(selected) * np.log(n) * len(rss))
+            score = -step["bic"]
+        path.append(step)
+
+        if score > best_score:
+            best_score, best_step, stale = score, k, 0
+        else:
+            stale += 1
+            if stale >= _PATIENCE:
+                break
+
+    return {
+        "selected": [j - 1 for j in selected[1:best_step + 1]],
+        "criterion": criterion,
+        "path": path,
+    }
+
+
+def compact_fit(train: NormalEquations, test: NormalEquations, poly: Optional[PolynomialExpansion], features: Sequence[int]):
+    """The model on only ``features`` (columns of the design ``poly`` produces,
+    or of the raw X when ``poly`` is None).
+
+    Returns ``(poly, train, test, coef, intercept, accuracies, holdout)``: an
+    expansion producing just those columns from the raw X, the restricted
+    statistics and ``solve_split`` on them.
+    """
+    features = sorted(features)
+    if poly is None:
+        n = len(train.shift)
+        poly = PolynomialExpansion(n, [(i,) for i in range(n)], n)
+    train, test = train.subset(features), test.subset(features)
+    return (poly.subset(features), train, test) + solve_split(train, test)
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+
+from backend.services.ml.chunked import (
+    FitInputError, batch_rows, cv_scores, fit_chunks, fold_ids, split_stats, solve_split,
+)
+from backend.services.ml.polynomial import plan_expansion
+from backend.services.ml.sklearn_fluent import req_details
+
+
+def chunked(frame, size):
+    return lambda: (frame.iloc[start:start + size] for start in range(0, len(frame), size))
+
+
+@pytest.fixture(scope="module")
+def sensors():
+    """Three noisy sensor readings driving two outputs, with a few gaps."""
+    rng = np.random.default_rng(7)
+    n = 900
+    frame = pd.DataFrame({
+        "temp": rng.normal(20, 5, n),
+        "humidity": rng.uniform(10, 90, n),
+        "wind": rng.gamma(2.0, 3.0, n),
+    })
+    frame["load"] = 1.5 * frame.temp - 0.2 * frame.humidity + 0.7 * frame.wind + 4 + rng.normal(0, 0.3, n)
+    frame["cost"] = -0.5 * frame.temp + 0.1 * frame.humidity + rng.normal(0, 0.1, n)
+    frame.loc[rng.choice(n, 40, replace=False), "humidity"] = np.nan
+    frame["load"] = frame["load"].astype(object)
+    frame.loc[rng.choice(n, 25, replace=False), "load"] = "n/a"
+    return frame
+
+
+def complete(frame, columns):
+    numeric = frame[columns].apply(pd.to_numeric, errors="coerce")
+    return numeric.dropna()
+
+
+def test_streamed_coefficients_match_a_least_squares_fit_of_all_rows(sensors):
+    x_cols, y_cols = ["temp", "humidity", "wind"], ["load", "cost"]
+    fit = fit_chunks(chunked(sensors, 128), x_cols, y_cols)
+
+    rows = complete(sensors, x_cols + y_cols)
+    reference = LinearRegression().fit(rows[x_cols], rows[y_cols])
+    np.testing.assert_allclose(fit["coef"], reference.coef_, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(fit["intercept"], reference.intercept_, rtol=1e-9, atol=1e-9)
+    assert fit["rows"] == len(rows)
+    assert fit["dropped_rows"] == len(sensors) - len(rows)
+
+
+def test_holdout_split_does_not_depend_on_the_chunk_size(sensors):
+    small = fit_chunks(chunked(sensors, 37), ["temp", "wind"], ["load"])
+    large = fit_chunks(chunked(sensors, 1000), ["temp", "wind"], ["load"])
+    assert small["test_stats"].n == large["test_stats"].n
+    np.testing.assert_allclose(small["accuracies"], large["accuracies"], rtol=1e-10)
+    np.testing.assert_allclose(small["coef"], large["coef"], rtol=1e-10)
+
+
+def test_streamed_polynomial_matches_the_in_memory_expansion(sensors):
+    x_cols = ["temp", "wind"]
+    fit = fit_chunks(chunked(sensors, 200), x_cols, ["load"], degree=2)
+
+    rows = complete(sensors, x_cols + ["load"])
+    poly = plan_expansion(2, 2)
+    train, test, _ = split_stats(rows[x_cols].to_numpy(), rows[["load"]].to_numpy(), poly)
+    coef, intercept, _, _ = solve_split(train, test)
+    assert fit["feature_names"] == poly.feature_names(x_cols)
+    np.testing.assert_allclose(fit["coef"], coef, rtol=1e-7, atol=1e-9)
+    np.testing.assert_allclose(fit["intercept"], intercept, rtol=1e-7)
+
+
+def test_a_column_empty_in_the_first_chunk_is_still_used():
+    rng = np.random.default_rng(11)
+    frame = pd.DataFrame({"a": rng.normal(size=300), "b": rng.normal(size=300)})
+    frame["y"] = 2 * frame.a - 3 * frame.b + 1
+    frame.loc[:99, "b"] = np.nan
+
+    fit = fit_chunks(chunked(frame, 100), ["a", "b"], ["y"], degree_search=False)
+    assert fit["x_columns"] == ["a", "b"]
+    np.testing.assert_allclose(fit["coef"], [[2.0, -3.0]], atol=1e-9)
+
+
+def test_a_target_without_numbers_is_rejected():
+    frame = pd.DataFrame({"x": [1.0, 2.0, 3.0], "y": ["", "-", "?"]})
+    with pytest.raises(FitInputError, match="Target column 'y'"):
+        fit_chunks(chunked(frame, 2), ["x"], ["y"])
+
+
+@pytest.mark.parametrize("curve, expected_family", [
+    (lambda x: 0.4 * x ** 2 - x + 3, "polynomial"),
+    (lambda x: 2.5 * np.log(x) + 1, "log"),
+    (lambda x: 1.2 * np.exp(0.35 * x), "exp"),
+])
+def test_single_feature_search_matches_req_details_in_sample(curve, expected_family):
+    # 40 rows: both sides score in-sample, so they see exactly the same rows
+    x = np.linspace(0.5, 9.5, 40)
+    y = curve(x) * (1 + 0.01 * np.sin(7 * x))
+    frame = pd.DataFrame({"x": x, "y": y})
+
+    streamed = fit_chunks(chunked(frame, 9), ["x"], ["y"])["details"]
+    memory = req_details(x.tolist(), y.tolist())
+    assert streamed["family"] == memory["family"] == expected_family
+    assert streamed["degree"] == memory["degree"]
+    np.testing.assert_allclose(streamed["coefficients"], memory["coefficients"], rtol=1e-8)
+    np.testing.assert_allclose(streamed["intercept"], memory["intercept"], rtol=1e-8)
+    assert streamed["accuracy"] == pytest.approx(memory["accuracy"], rel=1e-9)
+
+
+def test_downdated_fold_scores_match_refitting_each_fold():
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(240, 4))
+    Y = np.column_stack([X @ [1.0, -2.0, 0.5, 0.0], X[:, 0] * 3 - X[:, 3]]) + rng.normal(0, 0.5, (240, 2))
+    folds = 6
+
+    _, _, parts = split_stats(X, Y, cv_folds=folds)
+    means, stds = cv_scores(parts)
+
+    fold_of = fold_ids(batch_rows(0, len(X)), folds)
+    refit = np.array([
+        r2_score(Y[fold_of == f], LinearRegression().fit(X[fold_of != f], Y[fold_of != f]).predict(X[fold_of == f]),
+                 multioutput="raw_values")
+        for f in range(folds)
+    ])
+    np.testing.assert_allclose(means, refit.mean(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(stds, refit.std(axis=0), rtol=1e-7)
+
+
+def test_streamed_folds_match_in_memory_folds(sensors):
+    x_cols = ["temp", "wind"]
+    streamed = fit_chunks(chunked(sensors, 150), x_cols, ["cost"], cv_folds=4)
+    rows = complete(sensors, x_cols + ["cost"])
+    # Dropped rows shift the in-memory indices, so compare on the gap-free columns only
+    assert len(rows) == len(sensors)
+    _, _, parts = split_stats(rows[x_cols].to_numpy(), rows[["cost"]].to_numpy(), cv_folds=4)
+    np.testing.assert_allclose(streamed["cv"][0], cv_scores(parts)[0], rtol=1e-9)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+from sklearn.preprocessing import PolynomialFeatures
+
+from backend.services.ml.moments import PowerSums, fold_r2, power_matrix, scale_feature, unscale_coefficients
+
+
+@pytest.fixture
+def dose_response():
+    """A saturating dose-response curve sampled unevenly, as single-feature data tends to be."""
+    rng = np.random.default_rng(21)
+    dose = np.sort(rng.exponential(2.0, 150))
+    response = 10 * dose / (1.5 + dose) + rng.normal(0, 0.4, dose.size)
+    return dose, response
+
+
+@pytest.mark.parametrize("degree", [1, 2, 3])
+def test_downdated_fold_r2_matches_refitting_each_fold(dose_response, degree):
+    x, y = dose_response
+    u, _, _ = scale_feature(x)
+    y_centered = y - y.mean()
+    powers = power_matrix(u, 3)
+    fold_of = np.arange(len(x)) % 5
+    folds = [PowerSums.from_powers(powers[fold_of == f], y_centered[fold_of == f], 3) for f in range(5)]
+
+    expanded = PolynomialFeatures(degree, include_bias=False).fit_transform(x[:, None])
+    refit = [
+        r2_score(y[fold_of == f], LinearRegression().fit(expanded[fold_of != f], y[fold_of != f]).predict(expanded[fold_of == f]))
+        for f in range(5)
+    ]
+    np.testing.assert_allclose(fold_r2(folds, degree), refit, rtol=1e-8)
+
+
+def test_solution_in_powers_of_x_matches_a_direct_fit(dose_response):
+    x, y = dose_response
+    u, center, scale = scale_feature(x)
+    sums = PowerSums.from_powers(power_matrix(u, 3), y - y.mean(), 3)
+    intercept, coef = unscale_coefficients(sums.solve(3), center, scale, float(y.mean()))
+
+    direct = LinearRegression().fit(PolynomialFeatures(3, include_bias=False).fit_transform(x[:, None]), y)
+    np.testing.assert_allclose(coef, direct.coef_, rtol=1e-7)
+    assert intercept == pytest.approx(direct.intercept_, rel=1e-8)
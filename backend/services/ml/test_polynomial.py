@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import PolynomialFeatures
+
+from backend.services.ml.polynomial import ExpansionTooWide, expanded_width, plan_expansion
+
+COLUMNS = ["rpm", "torque", "oil_temp", "boost"]
+
+
+@pytest.fixture(scope="module")
+def engine_log():
+    """Readings on very different scales, so a misplaced column cannot hide behind a similar value."""
+    rng = np.random.default_rng(13)
+    return np.column_stack([
+        rng.uniform(800, 6500, 50),
+        rng.uniform(50, 400, 50),
+        rng.normal(95, 8, 50),
+        rng.uniform(0.0, 1.8, 50),
+    ])
+
+
+def sklearn_names(poly, columns):
+    return [name.replace(" ", "*") for name in poly.get_feature_names_out(columns)]
+
+
+@pytest.mark.parametrize("n_features, degree", [(1, 4), (2, 3), (3, 2), (4, 3), (4, 4)])
+def test_unpruned_expansion_matches_polynomial_features(engine_log, n_features, degree):
+    X = engine_log[:, :n_features]
+    columns = COLUMNS[:n_features]
+    reference = PolynomialFeatures(degree, include_bias=False).fit(X)
+
+    expansion = plan_expansion(n_features, degree)
+    assert expansion.pruned_terms == 0
+    assert expansion.n_output_features_ == reference.n_output_features_ == expanded_width(n_features, degree)
+    assert expansion.feature_names(columns) == sklearn_names(reference, columns)
+    np.testing.assert_allclose(expansion.transform(X), reference.transform(X), rtol=1e-12)
+
+
+def test_pruned_expansion_keeps_every_power_and_matching_columns(engine_log):
+    reference = PolynomialFeatures(3, include_bias=False).fit(engine_log)
+    full = dict(zip(sklearn_names(reference, COLUMNS), reference.transform(engine_log).T))
+
+    expansion = plan_expansion(4, 3, max_terms=20)
+    names = expansion.feature_names(COLUMNS)
+    assert len(names) == 20
+    assert expansion.pruned_terms == expanded_width(4, 3) - 20
+    powers = [c if p == 1 else f"{c}^{p}" for c in COLUMNS for p in (1, 2, 3)]
+    assert set(powers) <= set(names)
+
+    columns = expansion.transform(engine_log).T
+    for name, column in zip(names, columns):
+        np.testing.assert_allclose(column, full[name], rtol=1e-12)
+
+
+def test_subset_columns_match_the_full_expansion(engine_log):
+    expansion = plan_expansion(3, 3)
+    chosen = [17, 2, 9, 14]
+    subset = expansion.subset(chosen)
+    assert subset.feature_names(COLUMNS) == [expansion.feature_names(COLUMNS)[i] for i in sorted(chosen)]
+    np.testing.assert_allclose(subset.transform(engine_log[:, :3]), expansion.transform(engine_log[:, :3])[:, sorted(chosen)])
+
+
+def test_expansion_beyond_the_budget_is_rejected_without_pruning():
+    with pytest.raises(ExpansionTooWide, match="Select fewer X columns"):
+        plan_expansion(4, 3, max_terms=20, prune=False)
+    with pytest.raises(ExpansionTooWide):
+        plan_expansion(4, 3, max_terms=11)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+
+from backend.services.ml.chunked import split_stats
+from backend.services.ml.regularized import RidgePath, solve_regularized
+
+
+@pytest.fixture(scope="module")
+def collinear():
+    """Two near-duplicate predictors plus noise columns, the case ridge exists for."""
+    rng = np.random.default_rng(5)
+    base = rng.normal(size=(180, 1))
+    X = np.hstack([base, base + rng.normal(0, 0.05, (180, 1)), rng.normal(size=(180, 3)) * [1.0, 10.0, 0.1]])
+    Y = np.column_stack([
+        3 * X[:, 0] + 0.2 * X[:, 2] + rng.normal(0, 0.5, 180),
+        -X[:, 1] + 5 + rng.normal(0, 0.2, 180),
+    ])
+    return X, Y
+
+
+def sklearn_ridge(X, Y, alpha):
+    """sklearn's Ridge on the standardised features, mapped back to the original units."""
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    model = Ridge(alpha=alpha).fit((X - mean) / std, Y)
+    coef = model.coef_ / std
+    return coef, model.intercept_ - coef @ mean
+
+
+@pytest.mark.parametrize("alpha", [1e-3, 0.5, 40.0])
+def test_fixed_alpha_matches_sklearn_ridge(collinear, alpha):
+    X, Y = collinear
+    train, test, _ = split_stats(X, Y)
+    coef, intercept, _, _, info = solve_regularized(train, test, "ridge", alpha)
+
+    expected_coef, expected_intercept = sklearn_ridge(X, Y, alpha)
+    np.testing.assert_allclose(coef, expected_coef, rtol=1e-7, atol=1e-9)
+    np.testing.assert_allclose(intercept, expected_intercept, rtol=1e-7)
+    assert info["criterion"] == "fixed"
+
+
+def test_every_alpha_on_the_path_comes_from_one_decomposition(collinear):
+    X, Y = collinear
+    train, test, _ = split_stats(X, Y)
+    full = train + test
+    path = RidgePath(full)
+    for alpha in path.alphas(5):
+        coef, intercept = full.coefficients(path.beta(np.full(2, alpha)))
+        expected_coef, expected_intercept = sklearn_ridge(X, Y, alpha)
+        np.testing.assert_allclose(coef, expected_coef, rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(intercept, expected_intercept, rtol=1e-6, atol=1e-8)
+
+
+def test_gcv_choice_is_the_ridge_solution_at_the_chosen_alpha(collinear):
+    X, Y = collinear
+    train, test, _ = split_stats(X, Y)
+    coef, intercept, _, _, info = solve_regularized(train, test, "ridge")
+    assert info["criterion"] == "gcv"
+    for t, alpha in enumerate(info["alphas"]):
+        expected_coef, expected_intercept = sklearn_ridge(X, Y[:, t], alpha)
+        np.testing.assert_allclose(coef[t], expected_coef, rtol=1e-6, atol=1e-8)
+        assert intercept[t] == pytest.approx(expected_intercept, rel=1e-6)
@@ -0,0 +1,201 @@
+"""
+Matplotlib renderings for the analysis endpoints.
+
+These run on the render pool (see ``core.workers``), possibly in worker
+processes, so they only take plain arrays and return encoded images:
+``model_plot`` returns the buffer it encoded into, which the endpoint sends
+through ``getbuffer()`` without copying the bytes. Each
+render builds its own ``Figure`` on an Agg canvas and styles every artist
+from the constants below; nothing goes through pyplot or changes global
+rcParams, so renders in parallel threads do not share state.
+
+Stored models are drawn by ``model_plot`` for ``GET /models/{model_id}/plot``
+from one panel helper per chart; /analyze-manual, which stores no model,
+still returns its chart inline as a base64 PNG. ``series`` holds the
+downsampled numbers behind the same panels for client-side charts.
+
+Scatter panels of more than ``PLOT_DENSITY_MIN_POINTS`` points are drawn as
+a 2D histogram instead: the points are binned with ``np.histogram2d`` and
+only the bins are rasterized, on a log colour scale.
+"""
+import base64
+import io
+from typing import Any, Dict
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+from .series import MAX_IMPORTANCE_BARS, model_curve, top_terms
+from ...core.settings import PLOT_DENSITY_BINS, PLOT_DENSITY_MIN_POINTS, PLOT_WEBP_QUALITY
+
+PLOT_KINDS = ("overview", "fit", "prediction", "distribution", "importance")
+PLOT_FORMATS = {"png": "image/png", "webp": "image/webp", "svg": "image/svg+xml"}
+
+# Dark theme, passed to each artist instead of set through rcParams
+_FIGURE_FACE = '#0a0a0a'
+_AXES_FACE = '#1a1a1a'
+_FOREGROUND = 'white'
+_TEXT = {'color': _FOREGROUND}
+_GRID = {'alpha': 0.3}
+_DATA = {'color': '#3b82f6'}
+_MODEL = {'color': '#f59e0b', 'linewidth': 2}
+_LABEL_BOX = {'boxstyle': 'round', 'facecolor': _AXES_FACE, 'alpha': 0.8}
+
+
+def _figure(panels: int, figsize):
+    """A figure with ``panels`` axes side by side, drawn on its own Agg canvas."""
+    fig = Figure(figsize=figsize, facecolor=_FIGURE_FACE)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(1, panels, squeeze=False)[0]
+
+
+def _figure_buffer(fig: Figure, fmt: str = 'png', dpi: int = 150) -> io.BytesIO:
+    """The figure encoded as ``fmt`` into a new buffer (WebP is lossy at ``PLOT_WEBP_QUALITY``)."""
+    fig.tight_layout()
+    img_buffer = io.BytesIO()
+    options = {'pil_kwargs': {'quality': PLOT_WEBP_QUALITY}} if fmt == 'webp' else {}
+    fig.savefig(img_buffer, format=fmt, facecolor=_FIGURE_FACE, dpi=dpi, bbox_inches='tight', **options)
+    return img_buffer
+
+
+def _encode_figure(fig: Figure, fmt: str = 'png', dpi: int = 150) -> str:
+    return base64.b64encode(_figure_buffer(fig, fmt, dpi).getbuffer()).decode()
+
+
+def _style(ax) -> None:
+    ax.set_facecolor(_AXES_FACE)
+    ax.tick_params(colors=_FOREGROUND)
+    for spine in ax.spines.values():
+        spine.set_color(_FOREGROUND)
+
+
+def _dense(n: int, density=None) -> bool:
+    """Whether ``n`` points are drawn as a density; ``density`` True/False forces it."""
+    return n > PLOT_DENSITY_MIN_POINTS if density is None else bool(density)
+
+
+def _draw_density(ax, x, y, label: str = 'Rows per bin') -> None:
+    """Counts of the points in ``PLOT_DENSITY_BINS`` x ``PLOT_DENSITY_BINS`` cells; empty cells are blank."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    finite = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[finite], y[finite], bins=PLOT_DENSITY_BINS)
+    counts = np.ma.masked_equal(counts.T, 0)
+    image = ax.imshow(
+        counts, origin='lower', aspect='auto', interpolation='nearest', cmap='viridis',
+        extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+        norm=LogNorm(vmin=1, vmax=max(float(counts.max()), 1.0)) if counts.count() else None,
+    )
+    bar = ax.figure.colorbar(image, ax=ax, fraction=0.046, pad=0.02)
+    bar.set_label(label, **_TEXT)
+    bar.ax.tick_params(colors=_FOREGROUND, which='both')
+    bar.outline.set_edgecolor(_FOREGROUND)
+
+
+def _draw_fit(ax, x, y, xs, ys, x_label: str, y_label: str, title: str = 'Data & Model Fit', density=None) -> None:
+    """Scatter of the data joined in x order (or its density), with the model curve ``ys`` over ``xs``."""
+    if _dense(len(x), density):
+        _draw_density(ax, x, y)
+    else:
+        ax.scatter(x, y, alpha=0.8, s=50, label='Data', **_DATA)
+        if len(x) >= 2:
+            order = np.argsort(x, kind='stable')
+            ax.plot(np.asarray(x)[order], np.asarray(y)[order], color='#60a5fa', alpha=0.6, linewidth=1)
+    ax.plot(xs, ys, label='Model', **_MODEL)
+    ax.set_xlabel(x_label, **_TEXT)
+    ax.set_ylabel(y_label, **_TEXT)
+    ax.set_title(title, **_TEXT)
+    ax.grid(True, **_GRID)
+    _style(ax)
+
+
+def _draw_distribution(ax, y, y_label: str) -> None:
+    ax.hist(y, bins=20, alpha=0.7, color='#10b981', edgecolor=_FOREGROUND)
+    ax.set_xlabel(y_label, **_TEXT)
+    ax.set_ylabel('Frequency', **_TEXT)
+    ax.set_title('Target Variable Distribution', **_TEXT)
+    ax.grid(True, **_GRID)
+    _style(ax)
+
+
+def _draw_importance(ax, coef_t, feature_names, target: str) -> None:
+    """Coefficient magnitudes, coloured by sign; only the largest of wide expansions."""
+    coef_t = np.asarray(coef_t, dtype=float)
+    importance = np.abs(coef_t)
+    shown = top_terms(coef_t)
+    title = f"Feature Importance ({target})"
+    if len(coef_t) > MAX_IMPORTANCE_BARS:
+        title = f"Top {MAX_IMPORTANCE_BARS} of {len(coef_t)} Terms ({target})"
+    colors = [_DATA['color'] if coef_t[i] >= 0 else '#ef4444' for i in shown]
+    ax.barh([feature_names[i] for i in shown], importance[shown], color=colors, alpha=0.8)
+    ax.set_xlabel('Coefficient Magnitude', **_TEXT)
+    ax.set_title(title, **_TEXT)
+    ax.grid(True, axis='x', **_GRID)
+    _style(ax)
+
+
+def _draw_prediction(ax, y_true, y_hat, accuracy: float, target: str, density=None) -> None:
+    """Predicted against actual values (or their density) around the identity line."""
+    if _dense(len(y_true), density):
+        _draw_density(ax, y_true, y_hat)
+    else:
+        ax.scatter(y_true, y_hat, alpha=0.7, s=30, edgecolors=_FOREGROUND, linewidth=0.5, **_DATA)
+    finite = np.isfinite(y_hat)
+    min_v = float(min(np.min(y_true), np.min(y_hat[finite]) if finite.any() else np.min(y_true)))
+    max_v = float(max(np.max(y_true), np.max(y_hat[finite]) if finite.any() else np.max(y_true)))
+    margin = (max_v - min_v) * 0.05
+    ax.plot([min_v - margin, max_v + margin], [min_v - margin, max_v + margin], linestyle='--', **_MODEL)
+    ax.text(0.05, 0.95, f'R² = {accuracy:.3f}', transform=ax.transAxes, bbox=_LABEL_BOX, fontsize=12, **_TEXT)
+    ax.set_xlabel(f'Actual {target}', **_TEXT)
+    ax.set_ylabel(f'Predicted {target}', **_TEXT)
+    ax.set_title('Prediction Accuracy', **_TEXT)
+    ax.grid(True, **_GRID)
+    _style(ax)
+    ax.set_aspect('equal', adjustable='box')
+
+
+def _panels(kind: str, data: Dict[str, Any]):
+    if kind == "overview":
+        return ("fit", "distribution") if data.get("curve") is not None else ("importance", "prediction")
+    return (kind,)
+
+
+def model_plot(kind: str, data: Dict[str, Any], dpi: int = 150, fmt: str = 'png', density=None) -> io.BytesIO:
+    """One chart of a stored model's target, encoded as ``fmt`` into the returned buffer.
+
+    ``data`` holds the ``target`` name, a row sample of it (``y``) with the
+    model's predictions (``y_hat``), the target's ``coef`` and ``feature_names``,
+    its ``accuracy`` and, for models of one base feature, that feature's sample
+    ``x``, its ``x_label`` and the model ``curve`` as ``(xs, ys)``. ``overview``
+    is the data & fit and distribution panels for single-feature models and
+    the importance and prediction panels otherwise. ``density`` True/False
+    forces or disables density rendering of the scatter panels.
+    """
+    panels = _panels(kind, data)
+    fig, axes = _figure(len(panels), (15, 6) if len(panels) > 1 else (10, 6))
+    target = data["target"]
+    for ax, panel in zip(axes, panels):
+        if panel == "fit":
+            xs, ys = data["curve"]
+            _draw_fit(ax, data["x"], data["y"], xs, ys, data["x_label"], target, density=density)
+        elif panel == "distribution":
+            _draw_distribution(ax, data["y"], target)
+        elif panel == "importance":
+            _draw_importance(ax, data["coef"], data["feature_names"], target)
+        else:
+            _draw_prediction(ax, data["y"], data["y_hat"], data["accuracy"], target, density)
+    return _figure_buffer(fig, fmt, dpi)
+
+
+def manual_plot(x_data, y_data, details, fmt: str = 'png', dpi: int = 150) -> str:
+    fig, (ax,) = _figure(1, (10, 6))
+    if isinstance(x_data[0], list):
+        x_plot = [x[0] for x in x_data]
+        x_label = 'X (First Dimension)'
+    else:
+        x_plot = x_data
+        x_label = 'X'
+    xs = np.linspace(min(x_plot), max(x_plot), 200)
+    _draw_fit(ax, x_plot, y_data, xs, model_curve(details, xs), x_label, 'Y', 'Manual Data Analysis & Model Fit')
+    return _encode_figure(fig, fmt, dpi)
@@ -0,0 +1,195 @@
+"""
+Downsampled plot series for charts drawn by the client.
+
+Instead of an image, ``plot_data`` responses carry the numbers behind each
+chart panel, bounded by a point budget however many rows were fitted:
+
+- the data line sorted by x, reduced either with LTTB (largest triangle
+  three buckets, which keeps the points that shape the line) or with min/max
+  bucketing (the extremes of every bucket, which keeps spikes);
+- predicted against actual values, reduced the same way along the actual axis;
+- the model curve evaluated on an even grid;
+- histogram bins of the target from ``np.histogram``;
+- the largest coefficients.
+
+Everything but the LTTB bucket walk is vectorized; the walk is one numpy
+step per output point.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..ml.families import FAMILIES, curve
+from ...core.settings import PLOT_DATA_MAX_POINTS, PLOT_DATA_POINTS
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+# Wide polynomial expansions have thousands of terms; only the largest are charted
+MAX_IMPORTANCE_BARS = 40
+CURVE_POINTS = 200
+HISTOGRAM_BINS = 20
+
+
+def model_curve(details, xs):
+    """The fitted single-feature model of ``req_details`` evaluated at ``xs``."""
+    coeffs = details['coefficients']
+    intercept = details['intercept']
+    if details.get('family') in FAMILIES:
+        return curve(details['family'], coeffs[0], intercept, xs)
+    if details['is_polynomial']:
+        ys = np.full_like(xs, intercept, dtype=float)
+        for i, c in enumerate(coeffs):
+            ys = ys + c * (xs ** (i + 1))
+        return ys
+    if len(coeffs) > 0:
+        return intercept + coeffs[0] * xs
+    return np.full_like(xs, intercept, dtype=float)
+
+
+def top_terms(coef_t: np.ndarray) -> np.ndarray:
+    """Indices of the ``MAX_IMPORTANCE_BARS`` largest coefficients, in term order."""
+    if len(coef_t) <= MAX_IMPORTANCE_BARS:
+        return np.arange(len(coef_t))
+    return np.sort(np.argsort(np.abs(coef_t))[::-1][:MAX_IMPORTANCE_BARS])
+
+
+def series_options(points: Optional[int], method: Optional[str]):
+    """Validated ``(points, method)``; raises ``ValueError`` with a message for the client."""
+    method = (method or "lttb").lower()
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError("downsample must be one of: " + ", ".join(DOWNSAMPLE_METHODS))
+    if points is not None and not 10 <= points <= PLOT_DATA_MAX_POINTS:
+        raise ValueError(f"plot_points must be between 10 and {PLOT_DATA_MAX_POINTS}")
+    return int(points or PLOT_DATA_POINTS), method
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of ``points`` rows of the x-sorted series chosen by largest triangle three buckets.
+
+    The first and last rows are kept; the rows between are split into
+    ``points - 2`` buckets and each bucket keeps the row forming the largest
+    triangle with the row kept before it and the mean of the next bucket.
+    """
+    n = len(x)
+    if n <= points:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    next_x = np.append(mean_x[1:], x[n - 1])
+    next_y = np.append(mean_y[1:], y[n - 1])
+    keep = np.empty(points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the lowest and highest y in each of ``points // 2`` equal row buckets, in x order."""
+    n = len(x)
+    if n <= points:
+        return np.arange(n)
+    bucket = np.arange(n) * max(points // 2, 1) // n
+    order = np.lexsort((y, bucket))
+    starts = np.flatnonzero(np.diff(bucket[order], prepend=-1))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def _values(a) -> List[Optional[float]]:
+    """JSON-safe floats; non-finite values (e.g. a curve outside its domain) become null."""
+    a = np.asarray(a, dtype=float)
+    return [float(v) if np.isfinite(v) else None for v in a]
+
+
+def downsample(x, y, points: int, method: str = "lttb") -> Dict[str, List[Optional[float]]]:
+    """At most about ``points`` of the (x, y) pairs, sorted by x."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    rows = (lttb if method == "lttb" else minmax)(x, y, points)
+    return {"x": _values(x[rows]), "y": _values(y[rows])}
+
+
+def histogram(y, bins: int = HISTOGRAM_BINS) -> Dict[str, List[float]]:
+    y = np.asarray(y, dtype=float)
+    counts, edges = np.histogram(y[np.isfinite(y)], bins=bins)
+    return {"edges": _values(edges), "counts": counts.tolist()}
+
+
+def plot_inputs(stored: Dict[str, Any], t: int) -> Dict[str, Any]:
+    """Chart inputs for target ``t`` of a stored model, with predictions of its current coefficients.
+
+    ``stored`` needs the model's ``plot`` sample, ``linear``, ``poly``,
+    ``targets``, ``feature_names``, ``base_feature_names`` and ``accuracies``.
+    Models of one base feature also get the sample ``x`` and the model
+    ``curve`` as ``(xs, ys)``; ``curve`` is None otherwise.
+    """
+    X, Y = stored["plot"]["X"], stored["plot"]["Y"]
+    lr, poly = stored["linear"], stored["poly"]
+
+    def predict(rows):
+        return np.asarray(lr.predict(poly.transform(rows) if poly is not None else rows)).reshape(len(rows), -1)[:, t]
+
+    data = {
+        "target": stored["targets"][t],
+        "y": Y[:, t],
+        "y_hat": predict(X),
+        "coef": np.atleast_2d(lr.coef_)[t],
+        "feature_names": stored["feature_names"],
+        "accuracy": stored["accuracies"][t],
+        "curve": None,
+    }
+    if X.shape[1] == 1 and len(X):
+        xs = np.linspace(X[:, 0].min(), X[:, 0].max(), CURVE_POINTS)
+        data.update({"x": X[:, 0], "x_label": stored["base_feature_names"][0], "curve": (xs, predict(xs[:, None]))})
+    return data
+
+
+def target_series(data: Dict[str, Any], points: int, method: str = "lttb") -> Dict[str, Any]:
+    """The series of every chart panel for ``plot_inputs`` of one target."""
+    prediction = downsample(data["y"], data["y_hat"], points, method)
+    shown = top_terms(np.asarray(data["coef"], dtype=float))
+    series = {
+        "target": data["target"],
+        "rows": int(len(data["y"])),
+        "accuracy": float(data["accuracy"]),
+        "prediction": {"actual": prediction["x"], "predicted": prediction["y"]},
+        "histogram": histogram(data["y"]),
+        "importance": {
+            "terms": [data["feature_names"][i] for i in shown],
+            "coefficients": _values(np.asarray(data["coef"], dtype=float)[shown]),
+            "total_terms": int(len(data["coef"])),
+        },
+    }
+    if data["curve"] is not None:
+        xs, ys = data["curve"]
+        series["data"] = downsample(data["x"], data["y"], points, method)
+        series["curve"] = {"x": _values(xs), "y": _values(ys)}
+    return series
+
+
+def model_series(stored: Dict[str, Any], points: int, method: str = "lttb") -> List[Dict[str, Any]]:
+    """``target_series`` of every target of a stored model."""
+    return [target_series(plot_inputs(stored, t), points, method) for t in range(len(stored["targets"]))]
+
+
+def manual_series(x_data: Sequence, y_data: Sequence[float], details, points: int, method: str = "lttb") -> Dict[str, Any]:
+    """Data, model curve and histogram series for /analyze-manual (on the first x dimension)."""
+    x = np.array([v[0] if isinstance(v, list) else v for v in x_data], dtype=float)
+    y = np.asarray(y_data, dtype=float)
+    xs = np.linspace(x.min(), x.max(), CURVE_POINTS)
+    return {
+        "rows": int(len(y)),
+        "accuracy": float(details["accuracy"]),
+        "data": downsample(x, y, points, method),
+        "curve": {"x": _values(xs), "y": _values(model_curve(details, xs))},
+        "histogram": histogram(y),
+    }
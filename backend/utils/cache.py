@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class BoundedLRU:
+    """Thread-safe LRU mapping bounded by entry count and by an approximate byte budget.
+
+    Every value is stored with the size it was inserted with. When either bound is
+    exceeded the least recently used entries are evicted and ``on_evict`` is called
+    with their key and value (e.g. to remove spooled files).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int = 0) -> bool:
+        """Insert ``value``; returns False when it alone exceeds the byte budget."""
+        nbytes = max(0, int(nbytes))
+        evicted = []
+        with self._lock:
+            if self.max_bytes and nbytes > self.max_bytes:
+                return False
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+                if old[0] is not value:
+                    evicted.append((key, old[0]))
+            self._data[key] = (value, nbytes)
+            self._bytes += nbytes
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                old_key, (old_value, old_bytes) = self._data.popitem(last=False)
+                self._bytes -= old_bytes
+                self.evictions += 1
+                evicted.append((old_key, old_value))
+        self._notify(evicted)
+        return True
+
+    def resize(self, key: Hashable, nbytes: int) -> None:
+        """Update the recorded size of an entry that grew or shrank in place."""
+        evicted = []
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return
+            self._bytes += int(nbytes) - item[1]
+            self._data[key] = (item[0], int(nbytes))
+            self._data.move_to_end(key)
+            while len(self._data) > 1 and self.max_bytes and self._bytes > self.max_bytes:
+                old_key, (old_value, old_bytes) = self._data.popitem(last=False)
+                self._bytes -= old_bytes
+                self.evictions += 1
+                evicted.append((old_key, old_value))
+        self._notify(evicted)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return default
+            self._bytes -= item[1]
+        self._notify([(key, item[0])])
+        return item[0]
+
+    def _notify(self, evicted) -> None:
+        if self._on_evict is None:
+            return
+        for key, value in evicted:
+            try:
+                self._on_evict(key, value)
+            except Exception:
+                pass
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": int(self._bytes),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
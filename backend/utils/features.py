@@ -37,3 +37,18 @@ def expand_with_feature_names(base_values: List[float], feature_names: Optional[
             product *= (base_val ** power)
         expanded.append(product)
     return expanded
+
+
+def format_functions(targets: List[str], feature_names: List[str], coef, intercepts) -> List[str]:
+    """Display equations such as ``y(x) = 2.0*a +3.0*b + 1.0``, one per target."""
+    functions: List[str] = []
+    for t in range(len(targets)):
+        terms = []
+        for i, fname in enumerate(feature_names):
+            c = round(float(coef[t][i]), 4)
+            sign = '+' if c >= 0 and i > 0 else ''
+            terms.append(f"{sign}{c}*{fname}")
+        b = round(float(intercepts[t]), 4)
+        b_str = f"+ {abs(b)}" if b >= 0 else f"- {abs(b)}"
+        functions.append(f"{targets[t]}(x) = {' '.join(terms)} {b_str}")
+    return functions
@@ -25,14 +25,23 @@ interface ModelData {
   intercept?: number
   is_polynomial?: boolean
   degree?: number
+  family?: string
   multi_output?: boolean
   model_id?: string
 }
 
+// Single-feature fits may pick a transformed family instead of a polynomial
+const FAMILY_LABELS: Record<string, string> = {
+  log: 'Logarithmic',
+  reciprocal: 'Reciprocal',
+  exp: 'Exponential',
+  power: 'Power',
+}
+
 interface ExtendedAnalysisResult {
   function: string
   accuracy: string
-  visualization: string
+  visualization?: string
   data_points: number
   x_column?: string
   y_column?: string
@@ -44,6 +53,10 @@ interface ExtendedAnalysisResult {
     target: string
     image: string
   }>
+  plots?: Array<{
+    target: string
+    url: string
+  }>
 }
 
 interface PredictionResponse {
@@ -63,8 +76,15 @@ export function AnalysisResults({ result, isAnalyzing }: AnalysisResultsProps) {
     ? `${parseFloat(String(accuracyRaw).replace('%', '')).toFixed(1)}%`
     : '—'
   const modelDegree = extendedResult?.model?.degree ?? 1
-  const modelLabel = extendedResult?.model?.is_polynomial ? `Polynomial (deg ${modelDegree})` : 'Linear'
+  const modelFamily = extendedResult?.model?.family
+  const modelLabel = modelFamily && FAMILY_LABELS[modelFamily]
+    ? FAMILY_LABELS[modelFamily]
+    : extendedResult?.model?.is_polynomial ? `Polynomial (deg ${modelDegree})` : 'Linear'
   const targetCount = extendedResult?.model?.target_names?.length || 1
+  // Plots of stored models are fetched on demand as WebP; older responses embed PNGs
+  const targetImages = extendedResult?.plots
+    ? extendedResult.plots.map((p) => ({ target: p.target, src: `${backendUrl}${p.url}&format=webp` }))
+    : extendedResult?.target_visualizations?.map((tv) => ({ target: tv.target, src: `data:image/png;base64,${tv.image}` }))
 
   const handlePredict = async () => {
     const extendedResult = result as ExtendedAnalysisResult
@@ -108,6 +128,7 @@ export function AnalysisResults({ result, isAnalyzing }: AnalysisResultsProps) {
         intercept: extendedResult.model?.intercepts ?? extendedResult.model?.intercept ?? 0,
         is_polynomial: extendedResult.model?.is_polynomial ?? false,
         degree: extendedResult.model?.degree ?? 1,
+        family: extendedResult.model?.family,
         multi_output: extendedResult.model?.multi_output ?? false,
         feature_names: featureNames,
         model_id: extendedResult.model?.model_id,
@@ -304,26 +325,26 @@ export function AnalysisResults({ result, isAnalyzing }: AnalysisResultsProps) {
         </CardContent>
       </Card>
 
-      {extendedResult.target_visualizations ? (
+      {targetImages ? (
         <Card className="border-zinc-200 dark:border-zinc-800 bg-white/50 dark:bg-zinc-950/50 backdrop-blur-xl">
           <CardHeader className="border-b border-zinc-200 dark:border-zinc-800">
             <CardTitle className="text-zinc-900 dark:text-white">Data Visualization</CardTitle>
           </CardHeader>
           <CardContent>
-            <Tabs defaultValue={extendedResult.target_visualizations?.[0]?.target || '0'} className="w-full">
+            <Tabs defaultValue={targetImages[0]?.target || '0'} className="w-full">
               <TabsList className="flex flex-wrap">
-                {extendedResult.target_visualizations.map((tv) => (
+                {targetImages.map((tv) => (
                   <TabsTrigger key={tv.target} value={tv.target} className="mr-1 mb-1">
                     {tv.target}
                   </TabsTrigger>
                 ))}
               </TabsList>
-              {extendedResult.target_visualizations.map((tv) => (
+              {targetImages.map((tv) => (
                 <TabsContent key={tv.target} value={tv.target}>
                   <div className="flex justify-center">
                     {/* eslint-disable-next-line @next/next/no-img-element */}
                     <img
-                      src={`data:image/png;base64,${tv.image}`}
+                      src={tv.src}
                       alt={`Visualization for ${tv.target}`}
                       className="max-w-full h-auto rounded-lg border"
                     />
@@ -20,11 +20,18 @@ interface FileUploadProps {
 }
 
 interface FileInfo {
+  dataset_id?: string | null
   filename: string
   shape: [number, number]
   columns: string[]
   numeric_columns: string[]
   head: unknown[]
+  profile?: {
+    mode: 'sampled' | 'full'
+    sampled: boolean
+    sample_size: number
+    rows_estimated: boolean
+  } | null
 }
 
 export function FileUpload({ onAnalysisComplete, isAnalyzing, setIsAnalyzing }: FileUploadProps) {
@@ -51,12 +58,12 @@ export function FileUpload({ onAnalysisComplete, isAnalyzing, setIsAnalyzing }:
     const file = acceptedFiles[0]
     if (!file) return
 
-    const validTypes = ['.csv', '.xlsx', '.xls', '.json']
+    const validTypes = ['.csv', '.xlsx', '.xls', '.json', '.parquet', '.pq', '.feather', '.arrow', '.ipc', '.npy', '.npz', '.gz', '.bz2', '.xz', '.zst', '.zip']
     const fileExtension = '.' + file.name.split('.').pop()?.toLowerCase()
     
     if (!validTypes.includes(fileExtension)) {
       toast.error("Invalid file type", {
-        description: "Please upload a CSV, XLSX, or JSON file.",
+        description: "Please upload a CSV, XLSX, JSON, Parquet, Feather/Arrow, NPY or NPZ file (optionally gzip/bz2/xz/zstd/zip compressed).",
       })
       return
     }
@@ -132,16 +139,35 @@ export function FileUpload({ onAnalysisComplete, isAnalyzing, setIsAnalyzing }:
     }
 
     setIsAnalyzing(true)
-    try {
+    const buildForm = (useDatasetId: boolean) => {
       const formData = new FormData()
-      formData.append('file', uploadedFile)
+      // Reference the already-parsed upload when the server returned an id
+      if (useDatasetId && fileInfo?.dataset_id) {
+        formData.append('dataset_id', fileInfo.dataset_id)
+      } else {
+        formData.append('file', uploadedFile)
+      }
       formData.append('x_columns', JSON.stringify(selectedXColumns))
       formData.append('y_columns', JSON.stringify(selectedYColumns))
       formData.append('poly_degree', String(polyDegree))
+      return formData
+    }
 
-      const response = await axios.post(`${backendUrl}/analyze-data`, formData, {
+    try {
+      const post = (formData: FormData) => axios.post(`${backendUrl}/analyze-data`, formData, {
         headers: { 'Content-Type': 'multipart/form-data' },
       })
+      let response
+      try {
+        response = await post(buildForm(true))
+      } catch (error: unknown) {
+        // The server evicted the cached dataset; fall back to sending the file again
+        if (fileInfo?.dataset_id && axios.isAxiosError(error) && error.response?.status === 404) {
+          response = await post(buildForm(false))
+        } else {
+          throw error
+        }
+      }
 
       if (response.data.success) {
         onAnalysisComplete(response.data)
@@ -168,6 +194,11 @@ export function FileUpload({ onAnalysisComplete, isAnalyzing, setIsAnalyzing }:
       'text/csv': ['.csv'],
       'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'],
       'application/json': ['.json'],
+      'application/vnd.apache.parquet': ['.parquet', '.pq'],
+      'application/vnd.apache.arrow.file': ['.feather', '.arrow', '.ipc'],
+      'application/octet-stream': ['.npy', '.npz', '.bz2', '.xz', '.zst'],
+      'application/gzip': ['.gz'],
+      'application/zip': ['.zip'],
     },
     multiple: false,
   })
@@ -304,7 +335,10 @@ export function FileUpload({ onAnalysisComplete, isAnalyzing, setIsAnalyzing }:
               </div>
               <div>
                 <p className="font-semibold text-zinc-900 dark:text-white">{fileInfo.filename}</p>
-                <p className="text-xs text-zinc-500 dark:text-zinc-400">{fileInfo.shape[0]} rows • {fileInfo.shape[1]} columns</p>
+                <p className="text-xs text-zinc-500 dark:text-zinc-400">
+                  {fileInfo.profile?.rows_estimated ? '~' : ''}{fileInfo.shape[0]} rows • {fileInfo.shape[1]} columns
+                  {fileInfo.profile?.sampled && ` • types inferred from ${fileInfo.profile.sample_size} sampled rows`}
+                </p>
               </div>
             </div>
             <Button variant="ghost" size="sm" onClick={reset} className="text-zinc-500 hover:text-red-600 hover:bg-red-50 dark:hover:bg-red-950/20">
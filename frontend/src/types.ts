@@ -1,7 +1,7 @@
 export interface AnalysisResult {
   function: string
   accuracy: string
-  visualization: string
+  visualization?: string
   data_points: number
   x_column?: string
   y_column?: string
@@ -13,6 +13,7 @@ export interface AnalysisResult {
     intercept?: number
     is_polynomial?: boolean
     degree?: number
+    family?: string
     multi_output?: boolean
     model_id?: string
   }
@@ -23,5 +24,9 @@ export interface AnalysisResult {
     target: string
     image: string
   }>
+  plots?: Array<{
+    target: string
+    url: string
+  }>
 }
 